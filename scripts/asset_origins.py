@@ -0,0 +1,147 @@
+"""
+Cached listings of the source PDF folders (asset origins).
+
+Each section that publishes PDFs reads them from its folder under
+ASSETS_ROOT (see build_config.py). On a synced or network folder, listing
+it and stat()ing every file is slow, so each origin is read with a single
+os.scandir() pass the first time it's needed, and the listing (names,
+sizes, mtimes) is shared by everything in the build: the section's
+fingerprint in build-site.py, the section script looking up PDFs by name,
+and AssetSync deciding what to copy.
+
+Content hashes are kept in ORIGINS_PATH with the size and mtime they were
+computed for, so a PDF is only read again when it changes. Call save() at
+the end of a build to keep them.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from build_config import ASSET_ORIGINS, ASSETS_ROOT, CACHE_DIR
+from build_manifest import hash_file
+
+
+ORIGINS_PATH = CACHE_DIR / 'asset-origins.json'
+
+_root = ASSETS_ROOT
+# Origin folder -> file name -> os.stat_result, from this build's scans
+_scans = {}
+# Origin folder -> file name -> [size, mtime_ns, sha256] (persisted)
+_hashes = None
+_changed = False
+# Section pages are built in threads (see section_engine.py)
+_lock = threading.Lock()
+
+
+def configure(root=None):
+    """
+    Start a new build, optionally reading PDFs from another root folder
+    (e.g. a local mirror of the Dropbox archive).
+    """
+    global _root
+    if root is not None:
+        _root = Path(root)
+    _scans.clear()
+
+
+def origin(section):
+    """Source PDF folder of a section."""
+    return _root / ASSET_ORIGINS[section]
+
+
+def scan(section):
+    """
+    File name -> os.stat_result for every file in the section's origin.
+
+    The folder is read once per build; later calls reuse the listing.
+    """
+    folder = str(origin(section))
+    with _lock:
+        listing = _scans.get(folder)
+    if listing is None:
+        # Read outside the lock, so sections in other folders are not held
+        # up; if two threads read the same folder, the first listing wins
+        with os.scandir(folder) as entries:
+            listing = {entry.name: entry.stat() for entry in entries if entry.is_file()}
+        with _lock:
+            listing = _scans.setdefault(folder, listing)
+    return listing
+
+
+def paths(section):
+    """File name -> full path for every file in the section's origin."""
+    folder = origin(section)
+    return {name: os.path.join(folder, name) for name in scan(section)}
+
+
+def stat(path):
+    """os.stat() of a file, answered from a scanned listing when possible."""
+    folder, name = os.path.split(str(path))
+    listing = _scans.get(folder, {})
+    if name in listing:
+        return listing[name]
+    return os.stat(path)
+
+
+def _load_hashes():
+    global _hashes
+    with _lock:
+        if _hashes is None:
+            _hashes = {}
+            if ORIGINS_PATH.exists():
+                with open(ORIGINS_PATH, 'r', encoding='utf-8') as f:
+                    _hashes = json.load(f)
+        return _hashes
+
+
+def _hash(folder, name, file_stat):
+    """Content hash of a scanned file, reused while its size and mtime match."""
+    global _changed
+    hashes = _load_hashes()
+    with _lock:
+        recorded = hashes.setdefault(folder, {})
+    entry = recorded.get(name)
+    if entry is None or entry[0] != file_stat.st_size or entry[1] != file_stat.st_mtime_ns:
+        entry = [file_stat.st_size, file_stat.st_mtime_ns, hash_file(os.path.join(folder, name))]
+        recorded[name] = entry
+        _changed = True
+    return entry[2]
+
+
+def file_hash(path):
+    """SHA-256 of a file, reusing the recorded hash for unchanged origin files."""
+    folder, name = os.path.split(str(path))
+    listing = _scans.get(folder, {})
+    if name in listing:
+        return _hash(folder, name, listing[name])
+    return hash_file(path)
+
+
+def fingerprint(section):
+    """
+    Hash of the names and contents of every file in the section's origin,
+    as a 'data:' input for BuildManifest.fingerprint().
+    """
+    folder = str(origin(section))
+    listing = scan(section)
+    digest = hashlib.sha256()
+    for name in sorted(listing):
+        digest.update(f'{name}:{_hash(folder, name, listing[name])}\0'.encode('utf-8'))
+    return f'data:{digest.hexdigest()}'
+
+
+def save():
+    """Persist content hashes computed during this build."""
+    global _hashes, _changed
+    if not _changed:
+        return
+    # Keep only files that were there in this build's scans
+    _hashes = {folder: {name: entry for name, entry in recorded.items() if name in _scans[folder]}
+               for folder, recorded in _load_hashes().items() if folder in _scans}
+    ORIGINS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(ORIGINS_PATH, 'w', encoding='utf-8') as f:
+        json.dump(_hashes, f, indent=2, sort_keys=True, ensure_ascii=False)
+    _changed = False
@@ -0,0 +1,256 @@
+"""
+Skip-unchanged copying of section PDFs into docs/assets/<section>/.
+
+Each section keeps a small manifest in the build cache recording, for every
+published file, the source it came from and that source's size, mtime and
+(optionally) content hash. A file is only copied again when its source
+changes. Files left in the destination folder that no CSV row references
+any more are reported as orphans.
+
+Files can be published with one of several strategies:
+- copy: a regular byte-for-byte copy (the default)
+- hardlink: a second directory entry for the source file
+- reflink: a copy-on-write clone (APFS, Btrfs, XFS)
+- symlink: a link to the source, for fast local builds. Run materialize()
+  before committing, since GitHub Pages cannot follow links into Dropbox.
+hardlink and reflink fall back to a copy when the source is on another
+device or the filesystem does not support them.
+
+Scanned PDFs that have been OCR'd (see pdf_ocr.py) are published from the
+OCR'd copy instead of the original, and, in builds that optimize PDFs (see
+pdf_optimize.py), from the optimized copy of that.
+"""
+
+import ctypes
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import asset_origins
+import pdf_ocr
+import pdf_optimize
+from build_config import CACHE_DIR, DOCS_DIR
+from build_manifest import hash_file
+from build_profile import count
+
+
+STRATEGIES = ('copy', 'hardlink', 'reflink', 'symlink')
+
+# Linux ioctl request number for cloning a file (FICLONE)
+FICLONE = 0x40049409
+
+# Build-wide options, set by build-site.py through configure()
+_options = {
+    'verify_hash': False,
+    'strategy': 'copy',
+}
+
+
+def configure(verify_hash=None, strategy=None):
+    """
+    Set build-wide asset sync options.
+
+    Args:
+        verify_hash: Also compare content hashes, for sources whose mtimes
+            cannot be trusted (e.g. restored or re-synced folders)
+        strategy: How files are published, one of STRATEGIES
+    """
+    if verify_hash is not None:
+        _options['verify_hash'] = verify_hash
+    if strategy is not None:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown asset strategy {strategy!r}, expected one of {STRATEGIES}")
+        _options['strategy'] = strategy
+
+
+def _reflink(source, destination):
+    """Clone source to destination (copy-on-write). Raises OSError if unsupported."""
+    if sys.platform == 'darwin':
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.clonefile(os.fsencode(source), os.fsencode(destination), 0) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(destination))
+        return
+
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(f"reflinks are not supported on {sys.platform}")
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def publish_file(source, destination, strategy='copy'):
+    """
+    Publish source at destination using the given strategy.
+
+    The new file is created next to the destination and then renamed over
+    it, so an existing hardlink or symlink to the source is replaced rather
+    than written through.
+
+    Returns:
+        str: The strategy actually used ('copy' after a fallback)
+    """
+    destination = Path(destination)
+    temp_path = destination.with_name(f'.{destination.name}.tmp')
+    if temp_path.exists() or temp_path.is_symlink():
+        temp_path.unlink()
+
+    used = strategy
+    try:
+        if strategy == 'hardlink':
+            os.link(source, temp_path)
+        elif strategy == 'reflink':
+            _reflink(source, temp_path)
+        elif strategy == 'symlink':
+            os.symlink(os.path.abspath(source), temp_path)
+        else:
+            used = 'copy'
+            shutil.copyfile(source, temp_path)
+    except OSError:
+        if used == 'copy':
+            raise
+        # Different device, or the filesystem can't link/clone: copy instead
+        used = 'copy'
+        if temp_path.exists():
+            temp_path.unlink()
+        shutil.copyfile(source, temp_path)
+
+    os.replace(temp_path, destination)
+    return used
+
+
+def materialize(root=DOCS_DIR / 'assets'):
+    """
+    Replace every symlink under root with a real copy of its target.
+
+    Use after a build with the 'symlink' strategy, before committing docs/.
+
+    Returns:
+        int: Number of links replaced
+    """
+    replaced = 0
+    for path in sorted(Path(root).rglob('*')):
+        if path.is_symlink():
+            publish_file(os.path.realpath(path), path, 'copy')
+            replaced += 1
+    return replaced
+
+
+class AssetSync:
+    """Publishes one section's source files, copying only new or changed ones."""
+
+    def __init__(self, section, destination, verify_hash=None, strategy=None):
+        self.section = section
+        self.destination = Path(destination)
+        self.verify_hash = _options['verify_hash'] if verify_hash is None else verify_hash
+        self.strategy = _options['strategy'] if strategy is None else strategy
+        self.manifest_path = CACHE_DIR / 'assets' / f'{section}.json'
+
+        self.entries = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+        self.referenced = set()
+        self.copied = 0
+        self.skipped = 0
+        self.fallbacks = 0
+
+    def sync(self, source, filename):
+        """
+        Make sure docs/assets/<section>/<filename> is a copy of source.
+
+        Args:
+            source: Path to the original file (e.g. in Dropbox)
+            filename: Name of the published file in the destination folder
+
+        Returns:
+            str: Path to the published file
+        """
+        source = pdf_optimize.published_source(pdf_ocr.published_source(source))
+        destination = self.destination / filename
+        self.referenced.add(filename)
+
+        stat = asset_origins.stat(source)
+        entry = self.entries.get(filename)
+
+        if self._is_current(entry, source, stat, destination):
+            self.skipped += 1
+            count('assets_unchanged')
+        else:
+            if publish_file(source, destination, self.strategy) != self.strategy:
+                self.fallbacks += 1
+            entry = None
+            self.copied += 1
+            count('assets_published')
+            count('asset_bytes_published', stat.st_size)
+
+        if entry is None or entry['source'] != str(source):
+            entry = {'source': str(source)}
+        entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, strategy=self.strategy)
+        if self.verify_hash and 'sha256' not in entry:
+            # Read the source itself: its recorded hash assumes an unchanged mtime
+            entry['sha256'] = hash_file(source)
+        self.entries[filename] = entry
+
+        return str(destination)
+
+    def _is_current(self, entry, source, stat, destination):
+        """True if the published file is known to match the source."""
+        if entry is not None and entry.get('strategy', 'copy') != self.strategy:
+            return False
+        if self.strategy != 'symlink' and destination.is_symlink():
+            # Left over from a symlink build
+            return False
+
+        try:
+            published = os.stat(destination)
+        except FileNotFoundError:
+            return False
+        if published.st_size != stat.st_size:
+            return False
+        if self.strategy in ('hardlink', 'symlink') and published.st_ino == stat.st_ino:
+            # Already a link to the source itself
+            return published.st_dev == stat.st_dev
+
+        if (entry is None or entry['source'] != str(source) or
+                (self.verify_hash and 'sha256' not in entry)):
+            # Not copied by us yet (e.g. first run on an existing checkout),
+            # or no hash recorded: adopt the file if its contents match
+            source_hash = hash_file(source) if self.verify_hash else asset_origins.file_hash(source)
+            return source_hash == hash_file(destination)
+
+        if self.verify_hash:
+            # Catches sources whose contents changed but whose mtime did not,
+            # so never the hash cached by size and mtime
+            return entry.get('sha256') == hash_file(source)
+
+        return entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+
+    def orphans(self):
+        """Files in the destination folder that no row referenced this build."""
+        if not self.destination.exists():
+            return []
+        return sorted(path.name for path in self.destination.iterdir()
+                      if path.is_file() and path.name not in self.referenced)
+
+    def finish(self, log=print):
+        """Save the manifest and report what was copied and any orphans."""
+        self.entries = {name: entry for name, entry in self.entries.items()
+                        if name in self.referenced}
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True, ensure_ascii=False)
+
+        log(f"  Assets: {self.copied} published ({self.strategy}), {self.skipped} unchanged")
+        if self.fallbacks:
+            log(f"  ⚠ {self.fallbacks} file(s) could not use {self.strategy}, copied instead")
+
+        orphans = self.orphans()
+        if orphans:
+            log(f"  ⚠ {len(orphans)} file(s) in {self.destination} not referenced by any row:")
+            for name in orphans:
+                log(f"    - {name}")
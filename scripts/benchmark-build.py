@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Benchmark the whole build pipeline on synthetic archives.
+
+For each scale (number of documents), this:
+1. Copies scripts/ into a temporary workspace
+2. Generates CSVs with the shapes of the real ones, and placeholder PDFs in
+   a mirror of the Dropbox archive (see synthetic_archive.py)
+3. Runs build-site.py --profile against the mirror (--assets-root) twice:
+   a cold build, then an --incremental rebuild with nothing changed
+4. Appends per-stage wall/CPU time, throughput, peak memory and output
+   sizes, tagged with the current commit, to a JSON Lines results file
+
+Results for the same scale from an earlier commit are printed alongside,
+so a regression shows up as the stage whose time grew.
+
+Usage:
+    python3 benchmark-build.py                     # 1k, 10k and 100k documents
+    python3 benchmark-build.py --scales 1000 10000 --workers 0
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import document_registry
+import synthetic_archive
+from build_config import ROOT_DIR, SCRIPTS_DIR
+
+
+SCALES = (1000, 10000, 100000)
+RESULTS_PATH = ROOT_DIR / 'benchmarks' / 'results.jsonl'
+
+
+def git_commit():
+    """Short hash of HEAD, with '+dirty' if scripts/ has uncommitted changes."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--', 'scripts'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{commit}+dirty' if status.strip() else commit
+
+
+def prepare_workspace(workspace, documents, seed):
+    """Copy the build scripts into workspace and generate a synthetic archive there."""
+    shutil.copytree(SCRIPTS_DIR, workspace / 'scripts',
+                    ignore=shutil.ignore_patterns('__pycache__', '*.pyc'))
+    (workspace / 'docs').mkdir()
+    synthetic_archive.generate(workspace, documents, seed=seed)
+
+
+def run_build(workspace, name, args):
+    """Run build-site.py in the workspace and return its profile."""
+    profile = workspace / f'profile-{name}.json'
+    log = workspace / f'build-{name}.log'
+    with open(log, 'w', encoding='utf-8') as f:
+        result = subprocess.run([sys.executable, 'build-site.py', '--profile', str(profile), *args],
+                                cwd=workspace / 'scripts', stdout=f, stderr=subprocess.STDOUT)
+    if result.returncode != 0:
+        print(log.read_text(encoding='utf-8')[-3000:])
+        raise RuntimeError(f"{name} build failed (log: {log})")
+    with open(profile, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def summarize_run(profile, section_sizes, documents):
+    """Per-stage numbers from a build profile, with documents/second throughput."""
+    stages = {}
+    for record in profile['stages']:
+        name = record['name']
+        # Section rows process their own documents; the others all of them
+        handled = section_sizes.get(name.split(':', 1)[-1], 0) if name.startswith('section:') else documents
+        if record.get('skipped'):
+            handled = 0
+        stages[name] = {
+            'wall': record['wall'],
+            'cpu': record['cpu'],
+            'child_cpu': record['child_cpu'],
+            'peak_rss_mb': record['peak_rss_mb'],
+            'docs_per_s': round(handled / record['wall'], 1) if record['wall'] and handled else None,
+            'skipped': record.get('skipped', False),
+            'counters': record['counters'],
+        }
+    total = profile['total']
+    return {
+        'wall': total['wall'],
+        'cpu': total['cpu'],
+        'child_cpu': total['child_cpu'],
+        'peak_rss_mb': total['peak_rss_mb'],
+        'peak_child_rss_mb': total['peak_child_rss_mb'],
+        'docs_per_s': round(documents / total['wall'], 1) if total['wall'] else None,
+        'stages': stages,
+    }
+
+
+def tree_size(paths):
+    """Number of files and total bytes."""
+    sizes = [path.stat().st_size for path in paths if path.is_file()]
+    return {'files': len(sizes), 'bytes': sum(sizes)}
+
+
+def output_sizes(workspace):
+    """Sizes of everything the build wrote."""
+    docs = workspace / 'docs'
+    search = list((docs / 'search').glob('*'))
+    return {
+        'pages': tree_size(docs.glob('*.html')),
+        'documents': tree_size((docs / 'documents').glob('*.html')),
+        'search': tree_size([path for path in search if path.suffix == '.json']),
+        'search_gz': tree_size([path for path in search if path.suffix == '.gz']),
+        'search_br': tree_size([path for path in search if path.suffix == '.br']),
+        'sitemap': tree_size(docs.glob('sitemap*.xml')),
+        'assets': tree_size((docs / 'assets').rglob('*.pdf')),
+        'registry': tree_size([workspace / 'data' / path.name
+                               for path in document_registry.FORMATS.values()]),
+    }
+
+
+def benchmark(documents, workers, seed, keep, workdir, registry_format='json'):
+    """Build a synthetic archive of the given size and return its results record."""
+    workspace = Path(tempfile.mkdtemp(prefix=f'cjs-benchmark-{documents}-', dir=workdir))
+    try:
+        started = time.perf_counter()
+        prepare_workspace(workspace, documents, seed)
+        generate_seconds = time.perf_counter() - started
+        print(f"  Generated synthetic archive in {generate_seconds:.1f}s")
+
+        build_args = ['--workers', str(workers), '--registry-format', registry_format,
+                      '--assets-root', str(workspace / 'sources')]
+        cold = run_build(workspace, 'cold', build_args)
+        print(f"  Cold build: {cold['total']['wall']:.1f}s")
+        warm = run_build(workspace, 'warm', build_args + ['--incremental'])
+        print(f"  Incremental rebuild: {warm['total']['wall']:.1f}s")
+
+        registry_name = document_registry.FORMATS[registry_format].name
+        section_sizes = {}
+        for doc in document_registry.iter_registry(workspace / 'data' / registry_name):
+            section_sizes[doc['section']] = section_sizes.get(doc['section'], 0) + 1
+        document_count = sum(section_sizes.values())
+
+        return {
+            'scale': documents,
+            'documents': document_count,
+            'sections': section_sizes,
+            'registry_format': registry_format,
+            'runs': {
+                'cold': summarize_run(cold, section_sizes, document_count),
+                'warm': summarize_run(warm, section_sizes, document_count),
+            },
+            'output': output_sizes(workspace),
+            'generate_seconds': round(generate_seconds, 2),
+        }
+    finally:
+        if keep:
+            print(f"  Workspace kept at {workspace}")
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+
+def previous_result(results_path, scale, commit):
+    """The latest earlier result for this scale from a different commit."""
+    if not results_path.exists():
+        return None
+    previous = None
+    with open(results_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            if result['scale'] == scale and result['commit'] != commit:
+                previous = result
+    return previous
+
+
+def print_comparison(result, previous):
+    """Per-stage cold-build table, with the previous commit's times if any."""
+    cold = result['runs']['cold']
+    before = previous['runs']['cold']['stages'] if previous else {}
+    print(f"\n  {'Stage':<28} {'Wall s':>8} {'Docs/s':>9} {'RSS MB':>8}", end='')
+    print(f" {'Was s':>8} {'Change':>8}" if previous else '')
+    for name, stage in cold['stages'].items():
+        line = (f"  {name:<28} {stage['wall']:>8.2f} {stage['docs_per_s'] or 0:>9.0f} "
+                f"{stage['peak_rss_mb'] or 0:>8.1f}")
+        if name in before:
+            was = before[name]['wall']
+            change = f"{(stage['wall'] - was) / was * 100:+.0f}%" if was else ''
+            line += f" {was:>8.2f} {change:>8}"
+        print(line)
+    print(f"  {'Total':<28} {cold['wall']:>8.2f} {cold['docs_per_s'] or 0:>9.0f} "
+          f"{cold['peak_rss_mb'] or 0:>8.1f}", end='')
+    if previous:
+        was = previous['runs']['cold']['wall']
+        print(f" {was:>8.2f} {(cold['wall'] - was) / was * 100:>+7.0f}%")
+    else:
+        print()
+
+    output = result['output']
+    print(f"\n  Output: {output['documents']['files']} document pages "
+          f"({output['documents']['bytes'] / 1e6:.1f} MB), search "
+          f"{output['search']['bytes'] / 1e6:.1f} MB ({output['search_gz']['bytes'] / 1e6:.1f} MB gzip), "
+          f"{output['sitemap']['files']} sitemap file(s), {output['assets']['files']} PDFs")
+    print(f"  Incremental rebuild: {result['runs']['warm']['wall']:.2f}s")
+    if previous:
+        print(f"  (compared with {previous['commit']}, {previous['date']})")
+
+
+def main(scales=SCALES, workers=1, seed=0, results_path=RESULTS_PATH, keep=False, workdir=None,
+         registry_format='json'):
+    """
+    Benchmark the build at each scale and append the results.
+
+    Args:
+        scales: Document counts to benchmark
+        workers: --workers passed to build-site.py (0 = one per CPU)
+        seed: Seed for the synthetic data
+        results_path: JSON Lines file the results are appended to
+        keep: Keep the temporary workspaces for inspection
+        workdir: Directory for the workspaces (default: the system temp dir)
+        registry_format: --registry-format passed to build-site.py
+    """
+    commit = git_commit()
+    results_path = Path(results_path)
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+
+    for scale in scales:
+        print(f"\n{'='*60}")
+        print(f"Benchmarking {scale:,} documents...")
+        print(f"{'='*60}\n")
+
+        result = {
+            'commit': commit,
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'workers': workers,
+            'seed': seed,
+        }
+        result.update(benchmark(scale, workers, seed, keep, workdir, registry_format))
+
+        print_comparison(result, previous_result(results_path, scale, commit))
+        with open(results_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(result, sort_keys=True) + '\n')
+
+    print(f"\n✅ Results appended to {results_path}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the site build on synthetic archives.')
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SCALES),
+                        help='numbers of documents to benchmark (default: 1000 10000 100000)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes for build-site.py (0 = one per CPU)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed for the synthetic data')
+    parser.add_argument('--results', default=str(RESULTS_PATH),
+                        help='JSON Lines file to append results to (default: benchmarks/results.jsonl)')
+    parser.add_argument('--keep', action='store_true',
+                        help='keep the generated workspaces')
+    parser.add_argument('--workdir',
+                        help='directory for the temporary workspaces')
+    parser.add_argument('--registry-format', choices=sorted(document_registry.FORMATS), default='json',
+                        help='document registry format for build-site.py')
+    args = parser.parse_args()
+    main(scales=args.scales, workers=args.workers, seed=args.seed, results_path=args.results,
+         keep=args.keep, workdir=args.workdir, registry_format=args.registry_format)
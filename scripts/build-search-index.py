@@ -2,59 +2,372 @@
 """
 Build search index from document registry for MiniSearch.
 
-This script creates a JSON file optimized for client-side search using MiniSearch.
+This script indexes the documents at build time and writes the serialized
+MiniSearch index, so the browser only has to call MiniSearch.loadJSON()
+instead of tokenizing the whole corpus with addAll() on every page load.
+
+The index is split into one shard per section (docs/search/<section>.json)
+plus a small manifest (docs/search/manifest.json). Pages load the shards
+for their own section first, and the rest only when the visitor widens
+the search to the whole archive.
+
+Shards use a compact positional encoding of MiniSearch's serialized index
+(see encode_shard), which base-template.html expands again before calling
+MiniSearch.loadJS(). The start of each document's PDF text (see pdf_text.py)
+is searchable too, but not stored. Every file also gets precompressed .gz and, when the
+brotli package is installed, .br siblings (see precompress.py), compressed
+again only when the file changes.
 """
 
+import gzip
 import json
+import zlib
 from pathlib import Path
 
+from document_registry import iter_registry
+from minisearch_index import MiniSearchIndex
+from output_writer import write_bytes
+from pdf_text import excerpt_for
+from precompress import is_stale, write_siblings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+SEARCH_DIR = Path('../docs/search')
+MANIFEST_FILE = 'manifest.json'
+
+# Index from before the search was split into shards
+LEGACY_INDEX = Path('../docs/search-index.json')
+
+# Version of the compact shard format, checked by base-template.html
+SHARD_VERSION = 1
+
+# Stored fields kept in each shard's document rows, in row order. 'section'
+# is stored once per shard, and 'url' is derived from the slug.
+SHARD_COLUMNS = ['slug', 'title', 'description', 'category', 'date']
+
+# Stored fields whose values are replaced by an index into a per-shard list
+DICTIONARY_COLUMNS = ['category']
+
+# Characters of each document's PDF text that are searchable. The whole
+# text would make the shards many times larger for the browser to fetch.
+SEARCH_TEXT_LENGTH = 1000
+
+# Search results show the first 150 characters of the description, plus
+# '...' when it is longer, so one more character keeps that check working
+STORED_DESCRIPTION_LENGTH = 151
+
+# Section page for each section (see SECTION_CONFIG in generate-document-pages.py)
+SECTION_PAGES = {
+    'cqc-reports': 'cqc-reports.html',
+    'cqc-media': 'cqc-media.html',
+    'cqc-publications': 'cqc-publications.html',
+    'savp': 'special-advisor.html',
+    'blackman': 'blackman.html',
+    'otoole': 'otoole.html',
+    'otoole-timeline': 'otoole-timeline.html',
+}
+
+# Overview pages that introduce several sections
+OVERVIEW_PAGES = {
+    'cqc.html': ['cqc-reports', 'cqc-media', 'cqc-publications'],
+    'court-monitor.html': ['blackman', 'otoole', 'otoole-timeline'],
+}
+
+
+def search_document(doc):
+    """Create the search document for one registry entry."""
+    # MiniSearch will search title, description, category, source and text
+    return {
+        'id': f"{doc['section']}-{doc['slug']}",
+        'title': doc['title'],
+        'description': doc.get('description', ''),
+        'category': doc.get('category', ''),
+        'date': doc.get('date', ''),
+        'section': doc['section'],
+        'source': doc.get('source', ''),
+        'text': excerpt_for(doc.get('file_path'), SEARCH_TEXT_LENGTH),
+        'url': doc['document_url']  # URL to the landing page
+    }
+
+
+def section_pages(section):
+    """Pages (relative to docs/) on which a section's shard is searched first."""
+    pages = [SECTION_PAGES.get(section, f'{section}.html')]
+    pages.extend(page for page, sections in OVERVIEW_PAGES.items() if section in sections)
+    return pages
+
+
+def document_url(doc_id):
+    """Landing page URL for a search document ID (see get_document_url)."""
+    return f'documents/{doc_id}.html'
+
+
+def encode_shard(section, index):
+    """
+    Encode one section's MiniSearch index compactly.
+
+    Compared with MiniSearch's own toJSON() output:
+    - field names are listed once and documents are rows of values
+    - the section is stored once, and categories as indexes into a list
+    - document IDs and URLs are rebuilt from the slug
+    - stored descriptions are cut to what the results list shows
+    - each term's postings are [field, documents, field, documents, ...],
+      where documents are gaps from the previous document number, or
+      [gap, frequency] pairs for terms that occur more than once
+
+    Args:
+        section: Section shared by every document in the index
+        index: MiniSearchIndex of that section's documents
+
+    Returns:
+        dict: JSON-serializable shard
+    """
+    serialized = index.to_json()
+    prefix = f'{section}-'
+    dictionaries = {column: [] for column in DICTIONARY_COLUMNS}
+    positions = {column: {} for column in DICTIONARY_COLUMNS}
+
+    documents = []
+    urls = {}
+    for short_id, doc_id in serialized['documentIds'].items():
+        stored = serialized['storedFields'][short_id]
+        if stored['section'] != section or not doc_id.startswith(prefix):
+            raise ValueError(f"Document {doc_id} does not belong in the {section} shard")
+        if stored['url'] != document_url(doc_id):
+            urls[short_id] = stored['url']
+
+        row = []
+        for column in SHARD_COLUMNS:
+            if column == 'slug':
+                value = doc_id[len(prefix):]
+            else:
+                value = stored.get(column, '')
+            if column == 'description':
+                value = value[:STORED_DESCRIPTION_LENGTH]
+            if column in positions:
+                if value not in positions[column]:
+                    positions[column][value] = len(dictionaries[column])
+                    dictionaries[column].append(value)
+                value = positions[column][value]
+            row.append(value)
+        documents.append(row)
+
+    terms = []
+    for term, fields in serialized['index']:
+        entry = [term]
+        for field_id, postings in sorted(fields.items()):
+            encoded = []
+            previous = 0
+            for short_id, freq in sorted(postings.items()):
+                gap = short_id - previous
+                encoded.append(gap if freq == 1 else [gap, freq])
+                previous = short_id
+            entry.extend([field_id, encoded])
+        terms.append(entry)
+
+    return {
+        'version': SHARD_VERSION,
+        'section': section,
+        'fields': index.fields,
+        'columns': SHARD_COLUMNS,
+        'dictionaries': dictionaries,
+        'documents': documents,
+        'urls': urls,
+        'fieldLength': [serialized['fieldLength'][short_id] for short_id in range(len(documents))],
+        'averageFieldLength': serialized['averageFieldLength'],
+        'index': terms,
+    }
+
 
-def main():
-    """Build search index from document registry."""
+def compressed_sizes(data):
+    """Sizes of data (bytes) raw, gzipped and, if available, brotli-compressed."""
+    sizes = {'raw': len(data), 'gzip': len(gzip.compress(data, 9, mtime=0))}
+    if brotli is not None:
+        sizes['brotli'] = len(brotli.compress(data))
+    return sizes
 
-    # Load document registry
-    registry_path = Path('../data/document-registry.json')
-    with open(registry_path, 'r', encoding='utf-8') as f:
-        documents = json.load(f)
 
-    # Build search index
-    search_index = []
+class StreamedSizes:
+    """compressed_sizes() of data written piece by piece, without keeping it."""
 
+    def __init__(self):
+        self.sizes = {'raw': 0, 'gzip': 0}
+        # wbits=31: a gzip stream, the same size as gzip.compress()
+        self.compressors = {'gzip': zlib.compressobj(9, zlib.DEFLATED, 31)}
+        if brotli is not None:
+            self.sizes['brotli'] = 0
+            self.compressors['brotli'] = brotli.Compressor()
+
+    def write(self, data):
+        self.sizes['raw'] += len(data)
+        self.sizes['gzip'] += len(self.compressors['gzip'].compress(data))
+        if 'brotli' in self.compressors:
+            self.sizes['brotli'] += len(self.compressors['brotli'].process(data))
+
+    def finish(self):
+        """Flush the compressors and return the sizes."""
+        self.sizes['gzip'] += len(self.compressors['gzip'].flush())
+        if 'brotli' in self.compressors:
+            self.sizes['brotli'] += len(self.compressors['brotli'].finish())
+        return self.sizes
+
+
+def legacy_index_piece(search_doc, first):
+    """One entry of the indent=2 search-index.json list pages used to fetch."""
+    # That index had no PDF text
+    search_doc = {field: value for field, value in search_doc.items() if field != 'text'}
+    entry = json.dumps(search_doc, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+    return ('[\n  ' if first else ',\n  ') + entry
+
+
+def write_json(path, data):
+    """
+    Write deterministic compact JSON, and its precompressed siblings if it
+    changed (or they are missing).
+
+    Returns:
+        bytes: The encoded JSON
+    """
+    encoded = json.dumps(data, ensure_ascii=False, sort_keys=True,
+                         separators=(',', ':')).encode('utf-8')
+    if write_bytes(path, encoded) or is_stale(path):
+        write_siblings(path, encoded)
+    return encoded
+
+
+def write_shard(section, index):
+    """
+    Write a section's shard (with its precompressed siblings).
+
+    Returns:
+        tuple: (manifest entry for the shard, encoded shard bytes)
+    """
+    filename = f'{section}.json'
+    encoded = write_json(SEARCH_DIR / filename, encode_shard(section, index))
+    entry = {
+        'file': f'search/{filename}',
+        'documents': len(index),
+        'bytes': len(encoded),
+        'pages': section_pages(section),
+        'prefix': f'documents/{section}-',
+    }
+    return entry, encoded
+
+
+def update_sections(documents, sections):
+    """
+    Rebuild the shards of some sections only, keeping the others.
+
+    For serve-site.py, after a section's documents change: skips the size
+    report, and expects a full index (main()) to have been built before.
+
+    Args:
+        documents: Registry entries (dicts) of all sections
+        sections: Sections whose shards to rebuild
+    """
+    shards = {section: MiniSearchIndex() for section in sections}
     for doc in documents:
-        # Create search document
-        # MiniSearch will search title, description, and category by default
-        search_doc = {
-            'id': f"{doc['section']}-{doc['slug']}",
-            'title': doc['title'],
-            'description': doc.get('description', ''),
-            'category': doc.get('category', ''),
-            'date': doc.get('date', ''),
-            'section': doc['section'],
-            'source': doc.get('source', ''),
-            'url': doc['document_url']  # URL to the landing page
-        }
-
-        search_index.append(search_doc)
-
-    # Save search index
-    output_path = Path('../docs/search-index.json')
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(search_index, f, indent=2, ensure_ascii=False)
+        if doc['section'] in shards:
+            shards[doc['section']].add(search_document(doc))
+
+    with open(SEARCH_DIR / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    for section, index in shards.items():
+        if len(index):
+            manifest['shards'][section] = write_shard(section, index)[0]
+        else:
+            manifest['shards'].pop(section, None)
+    write_json(SEARCH_DIR / MANIFEST_FILE, manifest)
+
+
+def format_sizes(sizes):
+    """Format the dict returned by compressed_sizes for the size report."""
+    return ', '.join(f'{sizes[kind] / 1024:.1f} KB {kind}' for kind in sizes)
+
+
+def main(documents=None):
+    """
+    Build search index shards from document registry.
+
+    Args:
+        documents: Registry entries (dicts), as build-site.py passes them;
+            streamed from the document registry when run on its own
+    """
+
+    # Stream the document registry
+    if documents is None:
+        documents = iter_registry()
+
+    # Index each section's documents the way the MiniSearch client would,
+    # measuring the single index pages used to fetch along the way
+    shards = {}
+    legacy_sizes = StreamedSizes()
+    indexed = 0
+    for doc in documents:
+        search_doc = search_document(doc)
+        if search_doc['section'] not in shards:
+            shards[search_doc['section']] = MiniSearchIndex()
+        shards[search_doc['section']].add(search_doc)
+        legacy_sizes.write(legacy_index_piece(search_doc, first=not indexed).encode('utf-8'))
+        indexed += 1
+    legacy_sizes.write(b'\n]' if indexed else b'[]')
+
+    # Save one compact index per section
+    SEARCH_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = {'version': SHARD_VERSION, 'shards': {}}
+    shard_sizes = {}
+    serialized_sizes = {}
+    for section in sorted(shards):
+        serialized_sizes[section] = compressed_sizes(
+            json.dumps(shards[section].to_json(), ensure_ascii=False,
+                       separators=(',', ':')).encode('utf-8'))
+        manifest['shards'][section], encoded = write_shard(section, shards[section])
+        shard_sizes[section] = compressed_sizes(encoded)
+
+    # Remove shards of sections that no longer exist, and the old single index
+    for path in SEARCH_DIR.iterdir():
+        name = path.name.split('.')[0]
+        if path.name.startswith(MANIFEST_FILE) or name in shards:
+            continue
+        path.unlink()
+    for path in (LEGACY_INDEX, Path(f'{LEGACY_INDEX}.gz'), Path(f'{LEGACY_INDEX}.br')):
+        if path.exists():
+            path.unlink()
+
+    output_path = SEARCH_DIR / MANIFEST_FILE
+    manifest_size = compressed_sizes(write_json(output_path, manifest))
 
     print(f"{'='*60}")
     print(f"Search index created!")
     print(f"{'='*60}")
-    print(f"Total searchable documents: {len(search_index)}")
-    print(f"Index saved to: {output_path}")
+    print(f"Total searchable documents: {indexed}")
+    print(f"Index saved to: {SEARCH_DIR}/")
 
     # Show breakdown by section
-    sections = {}
-    for doc in search_index:
-        sections[doc['section']] = sections.get(doc['section'], 0) + 1
-
     print(f"\nDocuments by section:")
-    for section, count in sorted(sections.items()):
-        print(f"  {section}: {count}")
+    for section, shard in manifest['shards'].items():
+        print(f"  {section}: {shard['documents']} ({format_sizes(shard_sizes[section])})")
+
+    # Compare with the single indent=2 document list pages used to fetch
+    legacy_size = legacy_sizes.finish()
+    serialized_size = {kind: sum(sizes[kind] for sizes in serialized_sizes.values())
+                       for kind in manifest_size}
+    total_size = {kind: manifest_size[kind] + sum(sizes[kind] for sizes in shard_sizes.values())
+                  for kind in manifest_size}
+    print(f"\nSize report:")
+    print(f"  Previous search-index.json: {format_sizes(legacy_size)}")
+    print(f"  Shards as MiniSearch JSON:  {format_sizes(serialized_size)}")
+    print(f"  Manifest + all shards:      {format_sizes(total_size)}")
+    if shard_sizes:
+        largest = max(shard_sizes, key=lambda section: shard_sizes[section]['raw'])
+        print(f"  Largest shard ({largest}): {format_sizes(shard_sizes[largest])}")
+    print(f"  Change ({'/'.join(total_size)}): " +
+          ', '.join(f'{(total_size[kind] - legacy_size[kind]) / legacy_size[kind]:+.0%}'
+                    for kind in total_size))
 
 
 if __name__ == '__main__':
@@ -3,16 +3,51 @@
 Master build script for CJS Archive site.
 
 This script:
-1. Runs all CSV-to-HTML conversion scripts
-2. Collects Document objects from each script
+1. Builds all CSV-backed section pages (see section_engine.py), several
+   at once
+2. Collects Document objects from each section
 3. Saves a master document registry as JSON
+4. Hands the documents straight to the landing page, search index and
+   sitemap stages (those scripts only read the registry when run alone)
+5. Writes precompressed .gz/.br siblings of the pages that changed (pages
+   are minified as they are written, see output_writer.write_html)
+
+With --incremental, stages whose inputs are unchanged since the last build
+(see build_manifest.py) are skipped. Stages that do run only rewrite the
+files whose contents changed (see output_writer.py).
+
+With --profile, per-stage wall time, CPU time, peak memory and counters
+(see build_profile.py) are printed and saved as JSON.
 """
 
+import argparse
 import importlib.util
-import json
+import time
 from dataclasses import asdict
 from pathlib import Path
 
+import asset_origins
+import asset_sync
+import build_profile
+import document_registry
+import output_writer
+import pdf_ocr
+import pdf_optimize
+import pdf_text
+import precompress
+import section_engine
+import slug_registry
+from build_config import ASSET_ORIGINS, CACHE_DIR, DOCS_DIR
+from build_manifest import BuildManifest, hash_bytes
+from document_schema import Document
+from section_config import SECTION_PAGES
+from worker_pool import batched, default_workers, run_batches
+
+
+# Code every section page is built with (see section_engine.py)
+SECTION_ENGINE_INPUTS = ['section_engine.py', 'section_config.py', 'section-table.html', 'date_utils.py',
+                         'slug_registry.py']
+
 
 def import_module(name, filepath):
     """Import a module from a file path (handles hyphenated filenames)."""
@@ -22,105 +57,292 @@ def import_module(name, filepath):
     return module
 
 
-def main():
-    """Build entire site and generate document registry."""
-
-    # List of all page generation scripts with their parameters
-    scripts = [
-        {
-            'name': 'cqc-reports',
-            'file': 'cqc-reports.py',
-            'args': ['../data/cqc-reports.csv', '../data/cqc-reports-matching.csv',
-                     'cqc-reports-content.html', '../docs/cqc-reports.html']
-        },
-        {
-            'name': 'savp',
-            'file': 'savp-csv-to-table.py',
-            'args': ['../data/savp.csv', 'savp-content.html', '../docs/special-advisor.html']
-        },
-        {
-            'name': 'blackman',
-            'file': 'blackman-csv-to-table.py',
-            'args': ['../data/blackman.csv', 'blackman-content.html', '../docs/blackman.html']
-        },
-        {
-            'name': 'otoole',
-            'file': 'otoole-csv-to-table.py',
-            'args': ['../data/otoole.csv', 'otoole-content.html', '../docs/otoole.html']
-        },
-        {
-            'name': 'otoole-timeline',
-            'file': 'otoole-timeline-csv-to-table.py',
-            'args': ['../data/otoole-timeline.csv', 'otoole-timeline-content.html',
-                     '../docs/otoole-timeline.html']
-        },
-        {
-            'name': 'cqc-media',
-            'file': 'cqc-media-csv-to-table.py',
-            'args': ['../data/CQC-Coverage.csv', 'cqc-media-content.html', '../docs/cqc-media.html']
-        },
-        {
-            'name': 'cqc-publications',
-            'file': 'cqc-publications-csv-to-table.py',
-            'args': ['../data/CQC-Publications.csv', 'cqc-publications-content.html',
-                     '../docs/cqc-publications.html']
-        }
-    ]
-
-    all_documents = []
+def main(incremental=False, workers=1, verify_assets=False, asset_strategy='copy',
+         materialize_assets=False, ocr=False, optimize_pdfs=False, pdf_dpi=None, profile=None,
+         chrome_trace=None, trace_memory=False, registry_format='json', assets_root=None,
+         brotli_quality=precompress.BROTLI_QUALITY):
+    """
+    Build entire site and generate document registry.
+
+    Args:
+        incremental: Skip stages whose inputs are unchanged since the last build
+        workers: Number of worker processes for parallel stages (1 = serial)
+        verify_assets: Compare content hashes, not just size/mtime, before
+            skipping an unchanged PDF copy
+        asset_strategy: How PDFs are published (copy, hardlink, reflink, symlink)
+        materialize_assets: Replace symlinked PDFs with real copies at the end
+        ocr: OCR published PDFs with little or no text before publishing
+        optimize_pdfs: Linearize the PDFs (needs qpdf) and publish the
+            optimized copies
+        pdf_dpi: With optimize_pdfs, also downsample PDF images above this
+            resolution (needs Ghostscript)
+        profile: Path to save the per-stage profile as JSON (and print a summary)
+        chrome_trace: Path to save the stages as a Chrome trace event file
+        trace_memory: Also record each stage's peak Python heap size
+            (tracemalloc; slows the build down)
+        registry_format: 'json' for data/document-registry.json, 'jsonl' for
+            data/document-registry.jsonl (one document per line, streamed by
+            the standalone downstream scripts)
+        assets_root: Folder to read source PDFs from instead of the configured
+            ASSETS_ROOT (e.g. a local mirror of the Dropbox archive)
+        brotli_quality: Brotli quality (0-11) of the precompressed .br pages
+    """
+    build_profile.enable(trace_memory=trace_memory)
+
+    asset_sync.configure(verify_hash=verify_assets, strategy=asset_strategy)
+    asset_origins.configure(root=assets_root)
+
+    manifest = BuildManifest.load()
+    if not incremental:
+        manifest.reset()
+    elif manifest.invalidated:
+        print("Template, document schema or page output code changed, rebuilding everything.\n")
+
+    # Set when any stage actually runs, so the sitemap picks up new mtimes
+    rebuilt = False
 
     print("Generating static pages...\n")
 
-    # Generate static pages first (index, cqc, court-monitor)
-    generate_static = import_module('generate_static_pages', 'generate-static-pages.py')
-    generate_static.main()
+    with build_profile.stage('static-pages') as timing:
+        # Generate static pages first (index, cqc, court-monitor)
+        generate_static = import_module('generate_static_pages', 'generate-static-pages.py')
+        fingerprint = manifest.fingerprint(
+            ['generate-static-pages.py'] + [page['content_file'] for page in generate_static.PAGES])
+        if manifest.is_fresh('static-pages', fingerprint):
+            print("  ⏭ Unchanged, skipping")
+            timing['skipped'] = True
+        else:
+            output_writer.begin_stage()
+            generate_static.main()
+            print(f"  {output_writer.stage_report()}")
+            manifest.record('static-pages', fingerprint, [page['output'] for page in generate_static.PAGES])
+            rebuilt = True
+
+    if ocr:
+        print("\nRunning OCR on scanned PDFs...\n")
+
+        with build_profile.stage('ocr'):
+            # OCR'd copies are published in place of the originals (see pdf_ocr.py)
+            if pdf_text.is_available() and pdf_ocr.is_available():
+                # The originals this build's sections publish, so OCR'd copies
+                # are found by their hash when the sections publish them below
+                originals = section_engine.source_pdfs()
+                candidates = pdf_ocr.find_candidates(originals, workers=workers, hasher=manifest.file_hash)
+                counts = pdf_ocr.ocr_pdfs(candidates, workers=workers)
+                print(f"  {len(candidates)} PDF(s) need OCR: {counts['done']} OCR'd, "
+                      f"{counts['cached']} already done, {counts['failed']} failed")
+            else:
+                print("  ⚠ OCR needs ocrmypdf and pdftotext, skipping")
+
+    if optimize_pdfs:
+        print("\nOptimizing PDFs...\n")
+
+        with build_profile.stage('optimize-pdfs'):
+            # Optimized copies are published in place of the originals (see pdf_optimize.py)
+            if pdf_optimize.is_available():
+                if pdf_dpi is not None and not pdf_optimize.can_downsample():
+                    print("  ⚠ Downsampling needs Ghostscript (gs), only linearizing")
+                    pdf_dpi = None
+                pdf_optimize.configure(enabled=True, dpi=pdf_dpi)
+                # The PDFs this build's sections publish (and their OCR'd copies)
+                candidates = pdf_optimize.find_candidates(section_engine.source_pdfs(),
+                                                          hasher=manifest.file_hash)
+
+                def report(done, total, path, status, record):
+                    name = f"{Path(path).parent.name}/{Path(path).name[:60]}"
+                    if status == 'done':
+                        print(f"  ✅ {name}: {pdf_optimize.format_savings(record['source_size'], record['size'])}")
+                    elif status == 'failed':
+                        print(f"  ❌ {name}: failed")
+
+                counts = pdf_optimize.optimize_pdfs(candidates, dpi=pdf_dpi, workers=workers, progress=report)
+                print(f"  {len(candidates)} PDF(s): {counts['done']} optimized, "
+                      f"{counts['cached']} already done, {counts['failed']} failed")
+                if counts['source_bytes']:
+                    print(f"  Total: {pdf_optimize.format_savings(counts['source_bytes'], counts['bytes'])}")
+                if counts['failed']:
+                    print(f"  ⚠ Error messages are in {pdf_optimize.OPTIMIZED_DIR}/*.error")
+            else:
+                print("  ⚠ PDF optimization needs qpdf, skipping")
 
     print("\nBuilding site pages and collecting documents...\n")
 
-    for script_info in scripts:
-        print(f"Running {script_info['name']}...")
+    with build_profile.stage('sections') as timing:
+        # Section -> its documents, reused from the last run or rebuilt below
+        section_documents = {}
+        # Sections to rebuild -> their input fingerprints
+        stale = {}
+        for section in SECTION_PAGES:
+            # Inputs: the engine and config, the CSV(s) and content template, and
+            # source PDFs (and their OCR'd and optimized copies, and which of the
+            # latter are published). The source folder listing is shared with the
+            # engine (see asset_origins.py)
+            inputs = SECTION_ENGINE_INPUTS + section_engine.section_inputs(section)
+            if section in ASSET_ORIGINS:
+                inputs.extend([asset_origins.fingerprint(section), pdf_ocr.OCR_DIR, pdf_optimize.OPTIMIZED_DIR,
+                               pdf_optimize.setting()])
+            fingerprint = manifest.fingerprint(inputs)
 
-        # Import the module
-        module = import_module(script_info['name'], script_info['file'])
+            if manifest.is_fresh(f"section:{section}", fingerprint):
+                # Reuse the documents recorded by the last run
+                section_documents[section] = [Document(**doc) for doc in manifest.stage_data(f"section:{section}")]
+                print(f"⏭ {section}: unchanged, reusing {len(section_documents[section])} documents")
+                build_profile.record(f"section:{section}", time.perf_counter(), 0, skipped=True)
+            else:
+                stale[section] = fingerprint
 
-        # Call main() and collect documents
-        documents = module.main(*script_info['args'])
-        all_documents.extend(documents)
+        if stale:
+            # Build the changed sections together (see section_engine.py)
+            output_writer.begin_stage()
+            for section, documents, messages, seconds in section_engine.build_sections(stale):
+                print(f"\nRunning {section}...")
+                for message in messages:
+                    print(f"  {message}")
+                manifest.record(f"section:{section}", stale[section],
+                                [SECTION_PAGES[section]['output'], section_engine.table_path(section)],
+                                [asdict(doc) for doc in documents])
+                section_documents[section] = documents
+                print(f"  ✅ Generated {len(documents)} documents in {seconds:.2f}s")
+            print(f"\n  {output_writer.stage_report()}")
+            rebuilt = True
+        else:
+            timing['skipped'] = True
 
-        print(f"  ✅ Generated {len(documents)} documents\n")
+        all_documents = [doc for section in SECTION_PAGES for doc in section_documents[section]]
 
-    # Save document registry as JSON
-    registry_path = Path('../data/document-registry.json')
+    # Save document registry as JSON (or JSON Lines)
+    with build_profile.stage('registry'):
+        registry_path = document_registry.registry_path(registry_format)
 
-    # Convert Document objects to dictionaries for JSON serialization
-    registry_data = [asdict(doc) for doc in all_documents]
+        # Convert Document objects to dictionaries for JSON serialization
+        registry_data = [asdict(doc) for doc in all_documents]
+        registry_json = document_registry.dumps(registry_data, registry_format)
+        registry_hash = f"data:{hash_bytes(registry_json.encode('utf-8'))}"
 
-    with open(registry_path, 'w', encoding='utf-8') as f:
-        json.dump(registry_data, f, indent=2, ensure_ascii=False)
+        fingerprint = manifest.fingerprint([registry_hash])
+        if not manifest.is_fresh('registry', fingerprint):
+            output_writer.write_text(registry_path, registry_json)
+            document_registry.remove_other_formats(registry_format)
+            manifest.record('registry', fingerprint, [registry_path])
+            rebuilt = True
+
+    print(f"\n{'='*60}")
+    print(f"Extracting PDF text...")
+    print(f"{'='*60}\n")
+
+    with build_profile.stage('pdf-text') as timing:
+        # Extract the text of published PDFs for the landing pages and search
+        # index (see pdf_text.text_for). Results are cached by PDF content hash.
+        if pdf_text.is_available():
+            results = pdf_text.extract_documents(all_documents, workers=workers,
+                                                 hasher=manifest.file_hash)
+            extracted = sum(1 for result in results if not result.cached)
+            low_text = sum(1 for result in results if result.text is not None and not result.has_text)
+            failed = sum(1 for result in results if result.text is None)
+            print(f"  {len(results)} PDFs: {extracted} extracted, {len(results) - extracted} cached")
+            if low_text:
+                print(f"  ⚠ {low_text} PDF(s) with little/no text (run check-pdf-text.py for a list)")
+            if failed:
+                print(f"  ⚠ {failed} PDF(s) could not be extracted")
+        else:
+            print("⚠ pdftotext not found, skipping (install poppler-utils)")
+            timing['skipped'] = True
 
     print(f"\n{'='*60}")
     print(f"Generating document landing pages...")
     print(f"{'='*60}\n")
 
-    # Generate document landing pages
-    generate_pages = import_module('generate_document_pages', 'generate-document-pages.py')
-    generate_pages.main()
+    with build_profile.stage('document-pages') as timing:
+        # Generate document landing pages
+        # The PDF text index records each PDF's content hash, so it changes with the excerpts
+        fingerprint = manifest.fingerprint([registry_hash, 'generate-document-pages.py', 'pdf_text.py',
+                                            pdf_text.TEXT_INDEX_PATH])
+        if manifest.is_fresh('document-pages', fingerprint):
+            print("⏭ Registry unchanged, skipping")
+            timing['skipped'] = True
+        else:
+            generate_pages = import_module('generate_document_pages', 'generate-document-pages.py')
+            output_writer.begin_stage()
+            generate_pages.main(workers=workers, documents=registry_data)
+            print(f"  {output_writer.stage_report()}")
+            manifest.record('document-pages', fingerprint,
+                            [Path('../docs') / doc.document_url for doc in all_documents])
+            rebuilt = True
 
     print(f"\n{'='*60}")
     print(f"Building search index...")
     print(f"{'='*60}\n")
 
-    # Build search index
-    build_search = import_module('build_search_index', 'build-search-index.py')
-    build_search.main()
+    with build_profile.stage('search-index') as timing:
+        # Build search index
+        fingerprint = manifest.fingerprint([registry_hash, 'build-search-index.py', 'minisearch_index.py',
+                                            'pdf_text.py', pdf_text.TEXT_INDEX_PATH])
+        if manifest.is_fresh('search-index', fingerprint):
+            print("⏭ Registry unchanged, skipping")
+            timing['skipped'] = True
+        else:
+            build_search = import_module('build_search_index', 'build-search-index.py')
+            output_writer.begin_stage()
+            build_search.main(documents=registry_data)
+            print(f"  {output_writer.stage_report()}")
+            manifest.record('search-index', fingerprint, sorted(Path('../docs/search').glob('*.json')))
+            rebuilt = True
 
     print(f"\n{'='*60}")
     print(f"Generating sitemap...")
     print(f"{'='*60}\n")
 
-    # Generate sitemap
-    generate_sitemap = import_module('generate_sitemap', 'generate-sitemap.py')
-    generate_sitemap.generate_sitemap()
+    with build_profile.stage('sitemap') as timing:
+        # Generate sitemap (lastmod comes from output contents, so rerun if anything was rebuilt)
+        fingerprint = manifest.fingerprint([registry_hash, 'generate-sitemap.py'])
+        if not rebuilt and manifest.is_fresh('sitemap', fingerprint):
+            print("⏭ Nothing changed, skipping")
+            timing['skipped'] = True
+        else:
+            generate_sitemap = import_module('generate_sitemap', 'generate-sitemap.py')
+            output_writer.begin_stage()
+            generate_sitemap.generate_sitemap(hasher=manifest.file_hash, documents=registry_data)
+            print(f"   {output_writer.stage_report()}")
+            manifest.record('sitemap', fingerprint, ['../docs/sitemap.xml'])
+
+    print(f"\n{'='*60}")
+    print(f"Precompressing pages...")
+    print(f"{'='*60}\n")
+
+    with build_profile.stage('precompress') as timing:
+        # Compress the pages (and section tables) that changed since their
+        # .gz/.br siblings were written, and report what minification saved
+        to_compress = precompress.stale_files()
+        removed = precompress.remove_orphans()
+        output_writer.begin_stage()
+        batches = run_batches(precompress.compress_files, batched(to_compress, 50), workers, brotli_quality)
+        results = [result for batch in batches for result in batch]
+
+        sections_by_path = {str((DOCS_DIR / doc.document_url).resolve()): doc.section for doc in all_documents}
+        for section, config in SECTION_PAGES.items():
+            sections_by_path[str(Path(config['output']).resolve())] = section
+            sections_by_path[str(section_engine.table_path(section).resolve())] = section
+        html_sizes = output_writer.html_sizes()
+        for line in precompress.report(html_sizes, results, lambda path: sections_by_path.get(path, 'pages')):
+            print(f"  {line}")
+        if removed:
+            print(f"  Removed {removed} sibling(s) of deleted files")
+        if to_compress:
+            print(f"  Compression: {precompress.settings(brotli_quality)}")
+            print(f"  {output_writer.stage_report()}")
+        else:
+            print("  ⏭ All precompressed files up to date")
+            timing['skipped'] = not html_sizes
+
+    manifest.save()
+    asset_origins.save()
+    slug_registry.save()
+    output_writer.save_hashes()
+
+    if materialize_assets:
+        with build_profile.stage('materialize-assets'):
+            count = asset_sync.materialize()
+        print(f"\nMaterialized {count} symlinked asset(s) as real files")
 
     print(f"\n{'='*60}")
     print(f"Build complete!")
@@ -137,6 +359,60 @@ def main():
     for section, count in sorted(sections.items()):
         print(f"  {section}: {count}")
 
+    if profile:
+        print(f"\n{'='*60}")
+        print(f"Build profile")
+        print(f"{'='*60}")
+        print('\n'.join(build_profile.report()))
+        Path(profile).parent.mkdir(parents=True, exist_ok=True)
+        build_profile.write_trace(profile)
+        print(f"\nProfile saved to: {profile}")
+    if chrome_trace:
+        build_profile.write_chrome_trace(chrome_trace)
+        print(f"Chrome trace saved to: {chrome_trace} (open in chrome://tracing or ui.perfetto.dev)")
+
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Build the CJS Archive site.')
+    parser.add_argument('--incremental', action='store_true',
+                        help='skip stages whose inputs are unchanged since the last build')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes for parallel stages (0 = one per CPU)')
+    parser.add_argument('--verify-assets', action='store_true',
+                        help='compare PDF content hashes before skipping unchanged copies')
+    parser.add_argument('--asset-strategy', choices=asset_sync.STRATEGIES, default='copy',
+                        help='how PDFs are published into docs/assets (default: copy)')
+    parser.add_argument('--materialize-assets', action='store_true',
+                        help='replace symlinked PDFs in docs/assets with real copies')
+    parser.add_argument('--ocr', action='store_true',
+                        help='OCR scanned PDFs (needs ocrmypdf) and publish the OCR\'d copies')
+    parser.add_argument('--optimize-pdfs', action='store_true',
+                        help='linearize PDFs for fast web view (needs qpdf) and publish the optimized copies')
+    parser.add_argument('--pdf-dpi', type=int, metavar='DPI',
+                        help='with --optimize-pdfs, also downsample images above DPI (needs Ghostscript)')
+    parser.add_argument('--profile', nargs='?', const=str(CACHE_DIR / 'build-profile.json'),
+                        metavar='PATH',
+                        help='print per-stage timings and memory, and save them as JSON '
+                             '(default: .build-cache/build-profile.json)')
+    parser.add_argument('--chrome-trace', metavar='PATH',
+                        help='save per-stage timings as a Chrome trace event file')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='also profile peak Python allocations per stage (slower)')
+    parser.add_argument('--registry-format', choices=sorted(document_registry.FORMATS), default='json',
+                        help='save the document registry as a JSON array (json, the default) '
+                             'or JSON Lines (jsonl)')
+    parser.add_argument('--assets-root', metavar='PATH',
+                        help='read source PDFs from this folder (a mirror of the Dropbox archive) '
+                             'instead of CJS_ASSETS_ROOT or the default')
+    parser.add_argument('--brotli-quality', type=int, choices=range(12), default=precompress.BROTLI_QUALITY,
+                        metavar='0-11',
+                        help=f'brotli quality of the precompressed .br pages (default: {precompress.BROTLI_QUALITY}; '
+                             '11 is smallest but much slower)')
+    args = parser.parse_args()
+    main(incremental=args.incremental, workers=args.workers or default_workers(),
+         verify_assets=args.verify_assets, asset_strategy=args.asset_strategy,
+         materialize_assets=args.materialize_assets, ocr=args.ocr,
+         optimize_pdfs=args.optimize_pdfs, pdf_dpi=args.pdf_dpi, profile=args.profile,
+         chrome_trace=args.chrome_trace, trace_memory=args.trace_memory,
+         registry_format=args.registry_format, assets_root=args.assets_root,
+         brotli_quality=args.brotli_quality)
@@ -0,0 +1,32 @@
+"""
+Shared build configuration for the CJS archive site.
+
+Keeps the directory layout used by the build helpers in one place so that
+caches and generated artifacts land in the same spot no matter which
+script is run.
+"""
+
+import os
+from pathlib import Path
+
+
+SCRIPTS_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPTS_DIR.parent
+DATA_DIR = ROOT_DIR / 'data'
+DOCS_DIR = ROOT_DIR / 'docs'
+
+# Machine-local build state (manifests, caches). Not committed.
+CACHE_DIR = ROOT_DIR / '.build-cache'
+
+# Folder holding every section's source PDFs (the Dropbox archive). Set
+# CJS_ASSETS_ROOT, or pass --assets-root to build-site.py, to build from a
+# local mirror with the same layout instead.
+ASSETS_ROOT = Path(os.environ.get('CJS_ASSETS_ROOT', '/Users/jsundram/Dropbox/Archive of CJS'))
+
+# Source PDF folder of each section that publishes PDFs, relative to ASSETS_ROOT
+ASSET_ORIGINS = {
+    'cqc-reports': 'CQC Reports',
+    'savp': 'Special Advisor',
+    'blackman': 'Court Monitor/Blackman Jones',
+    'otoole': "Court Monitor/O'Toole v. Cuomo",
+}
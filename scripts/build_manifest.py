@@ -0,0 +1,170 @@
+"""
+Build manifest for incremental site builds.
+
+Records, for every build stage, a fingerprint of the inputs it consumed
+(CSV files, content templates, source PDFs, ...) and the outputs it
+produced. A stage can be skipped when its input fingerprint is unchanged
+and all of its outputs still exist.
+
+Changing any of GLOBAL_INPUTS invalidates the whole manifest, forcing a
+full rebuild.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from build_config import CACHE_DIR, SCRIPTS_DIR
+from build_profile import count
+
+
+MANIFEST_PATH = CACHE_DIR / 'build-manifest.json'
+MANIFEST_VERSION = 1
+
+# Inputs shared by every stage: a change here means everything is stale.
+# Every page is rendered by template_engine.py and minified on the way out
+# (output_writer.write_html, html_minify.py).
+GLOBAL_INPUTS = [
+    SCRIPTS_DIR / 'base-template.html',
+    SCRIPTS_DIR / 'document_schema.py',
+    SCRIPTS_DIR / 'template_engine.py',
+    SCRIPTS_DIR / 'html_minify.py',
+    SCRIPTS_DIR / 'output_writer.py',
+]
+
+
+def hash_bytes(data):
+    """Return the hex SHA-256 digest of a bytes object."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    """Return the hex SHA-256 digest of a file, or '' if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+                count('bytes_hashed', len(chunk))
+    except FileNotFoundError:
+        return ''
+    count('files_hashed')
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Persistent map of stage name -> input fingerprint and outputs.
+
+    File hashes are memoized by (size, mtime) so that large inputs such as
+    source PDFs are only re-read when they actually change on disk.
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = Path(path)
+        self.stages = {}
+        self.file_hashes = {}
+        self.global_fingerprint = ''
+        self.invalidated = False
+
+    @classmethod
+    def load(cls, path=MANIFEST_PATH):
+        """
+        Load the manifest from disk.
+
+        If the manifest is missing, from an older version, or was built
+        against different GLOBAL_INPUTS, every stage is treated as stale.
+        """
+        manifest = cls(path)
+        data = {}
+        if manifest.path.exists():
+            with open(manifest.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+        manifest.file_hashes = data.get('file_hashes', {})
+        manifest.global_fingerprint = manifest.fingerprint(GLOBAL_INPUTS)
+
+        if (data.get('version') == MANIFEST_VERSION and
+                data.get('global_fingerprint') == manifest.global_fingerprint):
+            manifest.stages = data.get('stages', {})
+        else:
+            manifest.invalidated = bool(data)
+
+        return manifest
+
+    def reset(self):
+        """Forget all recorded stages (forces a full rebuild)."""
+        self.stages = {}
+
+    def save(self):
+        """Write the manifest to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'version': MANIFEST_VERSION,
+            'global_fingerprint': self.global_fingerprint,
+            'stages': self.stages,
+            'file_hashes': self.file_hashes,
+        }
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+    def file_hash(self, path):
+        """Hash a file, reusing the memoized digest if size and mtime match."""
+        key = str(Path(path).resolve())
+        try:
+            stat = os.stat(key)
+        except FileNotFoundError:
+            self.file_hashes.pop(key, None)
+            return ''
+
+        cached = self.file_hashes.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = hash_file(key)
+        self.file_hashes[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def fingerprint(self, inputs):
+        """
+        Combine the hashes of a list of inputs into one fingerprint.
+
+        Inputs may be file paths, directories (every file inside is hashed,
+        which is how source PDF folders are tracked), or already-computed
+        strings such as a hash of in-memory data prefixed with 'data:'.
+        """
+        digest = hashlib.sha256()
+        for item in inputs:
+            if isinstance(item, str) and item.startswith('data:'):
+                digest.update(item.encode('utf-8'))
+                digest.update(b'\0')
+                continue
+
+            path = Path(item)
+            if path.is_dir():
+                for entry in sorted(path.iterdir()):
+                    if entry.is_file():
+                        digest.update(f'{entry}:{self.file_hash(entry)}\0'.encode('utf-8'))
+            else:
+                digest.update(f'{path}:{self.file_hash(path)}\0'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def is_fresh(self, stage, fingerprint):
+        """True if the stage ran with this fingerprint and its outputs exist."""
+        record = self.stages.get(stage)
+        if not record or record['fingerprint'] != fingerprint:
+            return False
+        return all(Path(output).exists() for output in record['outputs'])
+
+    def record(self, stage, fingerprint, outputs, data=None):
+        """Record a completed stage, with optional data to reuse when skipped."""
+        self.stages[stage] = {
+            'fingerprint': fingerprint,
+            'outputs': [str(output) for output in outputs],
+            'data': data,
+        }
+
+    def stage_data(self, stage):
+        """Return the data saved with a stage's last run."""
+        return self.stages[stage].get('data')
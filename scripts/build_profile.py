@@ -0,0 +1,255 @@
+"""
+Per-stage timing, memory and counters for build-site.py.
+
+Wrap each build stage in stage(); the build records wall time, CPU time
+(of this process and of the worker processes and tools it waited for) and
+peak memory for it. Work timed separately, like sections built in threads,
+is added with record(). Code anywhere in the build can call count() to add to a
+named counter (dates parsed, files copied, bytes written, ...), and each
+stage records how much every counter grew while it ran.
+
+Peak memory is the process's peak RSS, which only ever grows, so a stage
+that raises it stands out. With enable(trace_memory=True), tracemalloc also
+records the peak Python heap size while each stage runs. That is precise but
+slows the build down noticeably.
+
+write_trace() saves everything as JSON, and write_chrome_trace() as a trace
+event file for chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Counter totals for this process since it started (or last handed them back)
+_counters = {}
+_lock = threading.Lock()
+
+# Finished stages, in the order they ended
+_stages = []
+# Stages currently running, innermost last
+_open = []
+
+_started = time.perf_counter()
+_started_at = datetime.now().isoformat(timespec='seconds')
+_trace_memory = False
+
+
+def enable(trace_memory=False):
+    """Start timing the build from now, optionally tracing Python allocations."""
+    global _started, _started_at, _trace_memory
+    _started = time.perf_counter()
+    _started_at = datetime.now().isoformat(timespec='seconds')
+    _trace_memory = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def count(name, amount=1):
+    """Add amount to the named counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def take_counters():
+    """Return and reset this process's counters, for a worker to hand back."""
+    with _lock:
+        counters = dict(_counters)
+        _counters.clear()
+    return counters
+
+
+def merge_counters(counters):
+    """Add counters returned by take_counters() in a worker process."""
+    for name, amount in counters.items():
+        count(name, amount)
+
+
+def _peak_rss_mb(who):
+    """Peak resident set size in MB (RUSAGE_SELF, or the largest RUSAGE_CHILDREN)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _cpu_times():
+    times = os.times()
+    return times.user + times.system, times.children_user + times.children_system
+
+
+def _propagate_traced_peak(peak):
+    """Fold a traced-memory peak into every open stage, then start a new peak."""
+    for record in _open:
+        record['_traced_peak'] = max(record['_traced_peak'], peak)
+    tracemalloc.reset_peak()
+
+
+@contextmanager
+def stage(name):
+    """
+    Record timing, memory and counters for a build stage.
+
+    Stages can nest. Yields the stage's record; set record['skipped'] = True
+    when the stage found nothing to do (e.g. an unchanged incremental stage).
+    """
+    tracing = _trace_memory and tracemalloc.is_tracing()
+    if tracing:
+        _propagate_traced_peak(tracemalloc.get_traced_memory()[1])
+
+    with _lock:
+        counters_before = dict(_counters)
+    cpu_before, child_cpu_before = _cpu_times()
+    start = time.perf_counter()
+
+    record = {'name': name, 'depth': len(_open), '_traced_peak': 0}
+    _open.append(record)
+    try:
+        yield record
+    finally:
+        wall = time.perf_counter() - start
+        cpu, child_cpu = _cpu_times()
+        _open.pop()
+
+        record.update(
+            start=round(start - _started, 4),
+            wall=round(wall, 4),
+            cpu=round(cpu - cpu_before, 3),
+            child_cpu=round(child_cpu - child_cpu_before, 3),
+            peak_rss_mb=_peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        )
+        traced_peak = record.pop('_traced_peak')
+        if tracing:
+            traced_peak = max(traced_peak, tracemalloc.get_traced_memory()[1])
+            record['peak_traced_mb'] = round(traced_peak / (1024 * 1024), 2)
+            _propagate_traced_peak(traced_peak)
+
+        with _lock:
+            record['counters'] = {key: value - counters_before.get(key, 0)
+                                  for key, value in sorted(_counters.items())
+                                  if value != counters_before.get(key, 0)}
+        _stages.append(record)
+
+
+def record(name, start, wall, cpu=0.0, skipped=False, tid=0):
+    """
+    Record a stage timed by the caller, such as one of several running in
+    threads inside the current stage(). Counters and child CPU time cannot
+    be split between threads, so they stay with the enclosing stage.
+
+    Args:
+        start: time.perf_counter() when it started
+        wall: Seconds it took
+        cpu: CPU seconds of the thread that ran it (see time.thread_time())
+        skipped: It found nothing to do
+        tid: Thread to show it on in the Chrome trace
+    """
+    entry = {
+        'name': name,
+        'depth': len(_open),
+        'start': round(start - _started, 4),
+        'wall': round(wall, 4),
+        'cpu': round(cpu, 3),
+        'child_cpu': 0.0,
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        'counters': {},
+    }
+    if skipped:
+        entry['skipped'] = True
+    if tid:
+        entry['tid'] = tid
+    with _lock:
+        _stages.append(entry)
+
+
+def trace():
+    """The whole profile as a JSON-serializable dict."""
+    cpu, child_cpu = _cpu_times()
+    with _lock:
+        counters = dict(sorted(_counters.items()))
+    return {
+        'started': _started_at,
+        'total': {
+            'wall': round(time.perf_counter() - _started, 4),
+            'cpu': round(cpu, 3),
+            'child_cpu': round(child_cpu, 3),
+            'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+            'peak_child_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+            'counters': counters,
+        },
+        'stages': sorted(_stages, key=lambda record: record['start']),
+    }
+
+
+def write_trace(path):
+    """Save trace() as JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(trace(), f, indent=2)
+        f.write('\n')
+
+
+def write_chrome_trace(path):
+    """Save the stages in Chrome's trace event format."""
+    pid = os.getpid()
+    events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+               'args': {'name': 'build-site.py'}}]
+    for record in trace()['stages']:
+        args = {key: value for key, value in record.items()
+                if key not in ('name', 'depth', 'start', 'wall', 'counters', 'tid')}
+        args.update(record['counters'])
+        events.append({
+            'name': record['name'],
+            'ph': 'X',
+            'pid': pid,
+            'tid': record.get('tid', 0),
+            'ts': int(record['start'] * 1e6),
+            'dur': int(record['wall'] * 1e6),
+            'args': args,
+        })
+        if record['peak_rss_mb'] is not None:
+            events.append({
+                'name': 'peak RSS (MB)',
+                'ph': 'C',
+                'pid': pid,
+                'ts': int((record['start'] + record['wall']) * 1e6),
+                'args': {'rss': record['peak_rss_mb']},
+            })
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def report():
+    """Lines of a per-stage summary table for the console."""
+    data = trace()
+    memory = any('peak_traced_mb' in record for record in data['stages'])
+    header = f"{'Stage':<36} {'Wall s':>8} {'CPU s':>7} {'Child s':>8} {'RSS MB':>8}"
+    if memory:
+        header += f" {'Py MB':>7}"
+    lines = [header, '-' * len(header)]
+    for record in data['stages']:
+        name = '  ' * record['depth'] + record['name'] + (' (skipped)' if record.get('skipped') else '')
+        line = (f"{name[:36]:<36} {record['wall']:>8.3f} {record['cpu']:>7.2f} "
+                f"{record['child_cpu']:>8.2f} {record['peak_rss_mb'] or 0:>8.1f}")
+        if memory:
+            line += f" {record.get('peak_traced_mb', 0):>7.2f}"
+        lines.append(line)
+    total = data['total']
+    lines.append('-' * len(header))
+    lines.append(f"{'Total':<36} {total['wall']:>8.3f} {total['cpu']:>7.2f} "
+                 f"{total['child_cpu']:>8.2f} {total['peak_rss_mb'] or 0:>8.1f}")
+    if total['counters']:
+        lines.append('')
+        lines.extend(f"{name}: {value:,}" for name, value in total['counters'].items())
+    return lines
@@ -3,49 +3,24 @@
 Check which PDFs have searchable text content
 Requires: pdftotext (from poppler-utils)
 Install on macOS: brew install poppler
+
+Text is extracted in parallel and cached by PDF content hash (see
+pdf_text.py), so only new or changed PDFs are extracted again.
 """
-import subprocess
+import argparse
 import sys
 from pathlib import Path
 
+import pdf_text
+
 DOCS_DIR = Path(__file__).parent.parent / "docs"
-MIN_TEXT_LENGTH = 100  # Minimum characters to consider PDF as having text
-
-
-def check_pdftotext_installed():
-    """Check if pdftotext is available"""
-    try:
-        result = subprocess.run(['which', 'pdftotext'],
-                              capture_output=True, text=True)
-        return result.returncode == 0
-    except:
-        return False
-
-
-def extract_text(pdf_path):
-    """Extract text from PDF using pdftotext"""
-    try:
-        result = subprocess.run(
-            ['pdftotext', str(pdf_path), '-'],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        if result.returncode == 0:
-            return result.stdout
-        return None
-    except subprocess.TimeoutExpired:
-        return None
-    except Exception as e:
-        print(f"Error processing {pdf_path.name}: {e}")
-        return None
-
-
-def check_pdfs():
+
+
+def check_pdfs(workers=None, retry_errors=False):
     """Check all PDFs for searchable text"""
 
     # Check if pdftotext is installed
-    if not check_pdftotext_installed():
+    if not pdf_text.is_available():
         print("❌ ERROR: pdftotext not found!")
         print("\nTo install on macOS:")
         print("  brew install poppler")
@@ -56,8 +31,7 @@ def check_pdfs():
     print("Checking PDFs for searchable text...\n")
 
     # Collect all PDFs
-    pdfs = list(DOCS_DIR.glob("assets/**/*.pdf"))
-    total = len(pdfs)
+    pdfs = sorted(DOCS_DIR.glob("assets/**/*.pdf"))
 
     results = {
         'has_text': [],
@@ -65,23 +39,31 @@ def check_pdfs():
         'errors': []
     }
 
-    for i, pdf_path in enumerate(sorted(pdfs), 1):
-        rel_path = pdf_path.relative_to(DOCS_DIR)
-        print(f"[{i}/{total}] Checking: {rel_path.parent.name}/{pdf_path.name[:60]}...")
+    def report(done, total, result):
+        rel_path = Path(result.path).relative_to(DOCS_DIR)
+        status = " (cached)" if result.cached else ""
+        print(f"[{done}/{total}] Checked: {rel_path.parent.name}/{rel_path.name[:60]}{status}")
 
-        text = extract_text(pdf_path)
+    extracted = pdf_text.extract_texts(pdfs, workers=workers, retry_errors=retry_errors,
+                                       progress=report)
 
-        if text is None:
-            results['errors'].append(rel_path)
-        elif len(text.strip()) < MIN_TEXT_LENGTH:
+    for result in extracted:
+        rel_path = Path(result.path).relative_to(DOCS_DIR)
+        if result.text is None:
+            results['errors'].append((rel_path, result.error))
+        elif not result.has_text:
             results['no_text'].append(rel_path)
         else:
             results['has_text'].append(rel_path)
 
+    total = len(pdfs)
+    cached = sum(1 for result in extracted if result.cached)
+
     # Print summary
     print("\n" + "="*80)
     print("SUMMARY")
     print("="*80)
+    print(f"\n{total - cached} PDF(s) extracted, {cached} from cache")
     print(f"\n✅ PDFs with searchable text: {len(results['has_text'])}/{total}")
 
     if results['no_text']:
@@ -92,8 +74,9 @@ def check_pdfs():
 
     if results['errors']:
         print(f"\n❌ Errors processing ({len(results['errors'])}):")
-        for pdf in results['errors']:
-            print(f"   - {pdf}")
+        for pdf, error in results['errors']:
+            print(f"   - {pdf}: {error}")
+        print("   (Failures are cached; run with --retry-errors to try them again)")
 
     # Final recommendation
     print("\n" + "="*80)
@@ -108,5 +91,11 @@ def check_pdfs():
 
 
 if __name__ == "__main__":
-    success = check_pdfs()
+    parser = argparse.ArgumentParser(description='Check which PDFs have searchable text.')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='pdftotext processes to run at once (0 = one per CPU)')
+    parser.add_argument('--retry-errors', action='store_true',
+                        help='extract again PDFs whose last extraction failed')
+    args = parser.parse_args()
+    success = check_pdfs(workers=args.workers or None, retry_errors=args.retry_errors)
     sys.exit(0 if success else 1)
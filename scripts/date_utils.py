@@ -3,10 +3,144 @@ Date parsing utilities for CSV-to-HTML scripts.
 
 Provides consistent date parsing across all scripts, ensuring that dates
 remain stable regardless of when the build script is run.
+
+The formats that actually appear in data/*.csv (M/D/YYYY, M/D/YY, MM/YYYY,
+Mon-YY, Mon-YYYY, "Month YYYY", YYYY) are handled by strict compiled patterns.
+Anything else falls back to dateparser, which is slow to import and to
+call. Results are memoized, so every section script in one build shares
+the same cache.
 """
 
-import dateparser
+import re
 from datetime import datetime
+from functools import lru_cache
+
+from build_profile import count
+
+
+# Fixed base so that missing days default to the 1st of the month
+RELATIVE_BASE = datetime(2000, 1, 1)
+
+MONTHS = {
+    'jan': 1, 'january': 1,
+    'feb': 2, 'february': 2,
+    'mar': 3, 'march': 3,
+    'apr': 4, 'april': 4,
+    'may': 5,
+    'jun': 6, 'june': 6,
+    'jul': 7, 'july': 7,
+    'aug': 8, 'august': 8,
+    'sep': 9, 'sept': 9, 'september': 9,
+    'oct': 10, 'october': 10,
+    'nov': 11, 'november': 11,
+    'dec': 12, 'december': 12,
+}
+
+# M/D/YYYY or M/D/YY
+NUMERIC_DATE = re.compile(r'([0-9]{1,2})/([0-9]{1,2})/([0-9]{4}|[0-9]{2})')
+# MM/YYYY
+NUMERIC_MONTH_YEAR = re.compile(r'([0-9]{1,2})/([0-9]{4})')
+# Mon-YY, Mon-YYYY, "Month YYYY" (the CSV exports use non-breaking spaces)
+NAMED_MONTH_YEAR = re.compile(r'([A-Za-z]+)(?:-|\s+)([0-9]{4}|[0-9]{2})')
+# YYYY
+YEAR_ONLY = re.compile(r'[0-9]{4}')
+
+
+def _expand_year(year):
+    """Expand a two-digit year the way dateparser does (69-99 -> 19xx)."""
+    return year + 1900 if year >= 69 else year + 2000
+
+
+def _parse_known_format(date_str):
+    """
+    Parse the date formats used in our CSVs without dateparser.
+
+    Returns None for anything that is not an exact match, or whose meaning
+    under dateparser is not obvious, so the caller can fall back.
+    """
+    try:
+        return _known_format_date(date_str.strip())
+    except ValueError:
+        # Out of datetime's range (e.g. year 0)
+        return None
+
+
+def _known_format_date(text):
+    """_parse_known_format(), raising ValueError for dates datetime cannot hold."""
+    match = NUMERIC_DATE.fullmatch(text)
+    if match:
+        month, day, year = (int(group) for group in match.groups())
+        if len(match.group(3)) == 2:
+            year = _expand_year(year)
+        return datetime(year, month, day)
+
+    match = NUMERIC_MONTH_YEAR.fullmatch(text)
+    if match:
+        month, year = (int(group) for group in match.groups())
+        if 1 <= month <= 12:
+            return datetime(year, month, RELATIVE_BASE.day)
+        return None
+
+    match = NAMED_MONTH_YEAR.fullmatch(text)
+    if match:
+        month = MONTHS.get(match.group(1).lower())
+        year = int(match.group(2))
+        if month is None:
+            return None
+        if len(match.group(2)) == 2:
+            # dateparser reads "Jul-05" as July 5th (of RELATIVE_BASE's year),
+            # so only two-digit values that cannot be a day are years here.
+            if year <= 31:
+                return None
+            year = _expand_year(year)
+        return datetime(year, month, RELATIVE_BASE.day)
+
+    if YEAR_ONLY.fullmatch(text):
+        return datetime(int(text), RELATIVE_BASE.month, RELATIVE_BASE.day)
+
+    return None
+
+
+@lru_cache(maxsize=None)
+def parse_date(date_str):
+    """
+    Parse a date string from one of our CSVs.
+
+    Tries the strict fast-path formats first and falls back to dateparser
+    (with RELATIVE_BASE) for anything else. Results are memoized.
+
+    Args:
+        date_str: Date string in various formats (M/D/YYYY, MM/YYYY, Mon-YY, etc.)
+
+    Returns:
+        datetime or None: Parsed date, or None if it could not be parsed
+
+    Examples:
+        >>> parse_date("Jul-92")
+        datetime.datetime(1992, 7, 1, 0, 0)
+    """
+    count('dates_parsed')
+    parsed = _parse_known_format(date_str)
+    if parsed is None:
+        count('dates_parsed_by_dateparser')
+        # Imported lazily: importing dateparser alone takes longer than
+        # parsing every date we have on the fast path
+        import dateparser
+        parsed = dateparser.parse(date_str, settings={'RELATIVE_BASE': RELATIVE_BASE})
+    return parsed
+
+
+def date_sort_key(date_str):
+    """
+    Sort key for ordering CSV rows by date.
+
+    Dates without a day (Mon-YY, MM/YYYY, ...) sort after full dates on the
+    1st of the same month. That is the order the pages had when sorting used
+    the build day as the default day, but it no longer depends on when the
+    build runs. Dates that cannot be parsed sort last.
+    """
+    parsed = parse_date(date_str)
+    return (parsed is None, parsed or datetime.min, not NUMERIC_DATE.fullmatch(date_str.strip()))
 
 
 def format_date_iso(date_str):
@@ -32,8 +166,7 @@ def format_date_iso(date_str):
         "1992-07-01"
     """
     try:
-        # Use fixed RELATIVE_BASE to ensure day defaults to 1st of month
-        parsed = dateparser.parse(date_str, settings={'RELATIVE_BASE': datetime(2000, 1, 1)})
+        parsed = parse_date(date_str)
         if parsed:
             return parsed.strftime('%Y-%m-%d')
         return date_str
@@ -61,11 +194,32 @@ def format_date_month_year(date_str):
         "December 2019"
     """
     try:
-        # Use fixed RELATIVE_BASE to ensure day defaults to 1st of month
-        parsed = dateparser.parse(date_str, settings={'RELATIVE_BASE': datetime(2000, 1, 1)})
+        parsed = parse_date(date_str)
         if parsed:
             return parsed.strftime("%B %Y")
         return date_str
     except (ValueError, AttributeError):
         print(f"error parsing: {date_str}")
         return date_str
+
+
+def iso_date(date_str):
+    """
+    Converts a date to YYYY-MM-DD for sorting and filtering, whatever format
+    the page displays it in.
+
+    Args:
+        date_str: Date string in various formats (M/D/YYYY, MM/YYYY, Mon-YY, etc.)
+
+    Returns:
+        str: Date in YYYY-MM-DD format, or "" if parsing fails
+
+    Examples:
+        >>> iso_date("Jul-92")
+        "1992-07-01"
+    """
+    try:
+        parsed = parse_date(date_str)
+    except (ValueError, AttributeError):
+        return ""
+    return parsed.strftime('%Y-%m-%d') if parsed else ""
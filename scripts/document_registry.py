@@ -0,0 +1,70 @@
+"""
+Reading and writing the document registry.
+
+build-site.py saves every Document it collects to data/ in one of two
+formats:
+- json: document-registry.json, a single indented JSON array (the default)
+- jsonl: document-registry.jsonl, JSON Lines with one document per line
+
+iter_registry() yields the entries of either one as dicts. JSON Lines are
+parsed one line at a time, so consumers that process documents as they
+arrive (generate-document-pages.py, build-search-index.py,
+generate-sitemap.py) never hold the whole registry in memory. A JSON array
+has to be parsed in full before its first entry is available.
+"""
+
+import json
+
+from build_config import DATA_DIR
+
+
+FORMATS = {
+    'json': DATA_DIR / 'document-registry.json',
+    'jsonl': DATA_DIR / 'document-registry.jsonl',
+}
+
+
+def registry_path(registry_format=None):
+    """
+    Path of the registry in the given format, or of whichever one exists.
+
+    Only one format is kept at a time (see dumps()/remove_other_formats()),
+    so without a format the JSON Lines file wins if both are present.
+    """
+    if registry_format is not None:
+        return FORMATS[registry_format]
+    if FORMATS['jsonl'].exists():
+        return FORMATS['jsonl']
+    return FORMATS['json']
+
+
+def iter_registry(path=None):
+    """
+    Yield registry entries (dicts) in registry order.
+
+    Args:
+        path: Registry file; the format follows its suffix (default:
+            registry_path())
+    """
+    path = registry_path() if path is None else path
+    with open(path, 'r', encoding='utf-8') as f:
+        if str(path).endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def dumps(documents, registry_format='json'):
+    """Serialize registry entries (dicts) in the given format."""
+    if registry_format == 'jsonl':
+        return ''.join(json.dumps(doc, ensure_ascii=False) + '\n' for doc in documents)
+    return json.dumps(list(documents), indent=2, ensure_ascii=False)
+
+
+def remove_other_formats(registry_format):
+    """Delete registries left over in formats other than this one."""
+    for other, path in FORMATS.items():
+        if other != registry_format and path.exists():
+            path.unlink()
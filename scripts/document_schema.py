@@ -133,127 +133,3 @@ def get_document_url(section: str, slug: str) -> str:
     """
     return f'documents/{section}-{slug}.html'
 
-
-def ensure_unique_slug(slug: str, section: str, existing_slugs: set) -> str:
-    """
-    Ensure slug is unique by adding numeric suffix if needed.
-
-    Args:
-        slug: The proposed slug
-        section: The section identifier
-        existing_slugs: Set of already-used "{section}-{slug}" combinations
-
-    Returns:
-        Unique slug (may have suffix added)
-    """
-    full_slug = f"{section}-{slug}"
-    if full_slug not in existing_slugs:
-        return slug
-
-    # Add numeric suffix
-    original_slug = slug
-    counter = 2
-    while f"{section}-{slug}" in existing_slugs:
-        slug = f"{original_slug}-{counter}"
-        counter += 1
-
-    return slug
-
-
-# CSV Column Mapping Functions
-
-def map_cqc_reports_row(row: dict, url: str, file_path: str = "") -> Document:
-    """Map CQC Reports CSV row to Document."""
-    return Document(
-        title=row['Title'].strip(),
-        section='cqc-reports',
-        url=url,
-        date=row['Date'],  # Will be formatted by caller
-        description=row['Description'],
-        category=row['Category'],
-        file_path=file_path
-    )
-
-
-def map_savp_row(row: dict) -> Document:
-    """Map SAVP CSV row to Document."""
-    url = row['URL']
-    file_path = ""
-
-    # If URL is "PDF", it will be set by caller
-    if url == 'PDF':
-        file_path = f"assets/savp/{generate_slug(row['Title'])}.pdf"
-
-    return Document(
-        title=row['Title'],
-        section='savp',
-        url=url,
-        date=row['Date'],  # Will be formatted by caller
-        description=row['Description'],
-        category=row['Type'],
-        file_path=file_path
-    )
-
-
-def map_blackman_row(row: dict, url: str, file_path: str) -> Document:
-    """Map Blackman CSV row to Document."""
-    return Document(
-        title=row['Document'].strip(),
-        section='blackman',
-        url=url,
-        date=row['Date'],  # Will be formatted by caller
-        description=row['Description'],
-        category='Court Monitor Report',
-        file_path=file_path
-    )
-
-
-def map_otoole_row(row: dict, url: str, file_path: str) -> Document:
-    """Map O'Toole CSV row to Document."""
-    return Document(
-        title=row['Document'],
-        section='otoole',
-        url=url,
-        date=row['Date'],  # Will be formatted by caller
-        description=row['Description'],
-        category='Court Monitor Report',
-        file_path=file_path
-    )
-
-
-def map_otoole_timeline_row(row: dict) -> Document:
-    """Map O'Toole Timeline CSV row to Document."""
-    return Document(
-        title=row['News Coverage'],
-        section='otoole-timeline',
-        url=row['URL'],
-        date=row['DATE'],  # Will be formatted by caller
-        description=row['ACTION'],
-        category='Timeline Event'
-    )
-
-
-def map_cqc_media_row(row: dict) -> Document:
-    """Map CQC Media Coverage CSV row to Document."""
-    return Document(
-        title=row['Title'],
-        section='cqc-media',
-        url=row['URL'],
-        date=row['Date'],  # Will be formatted by caller
-        description=row['Description'],
-        category=row['Media'],
-        source=row['Media']
-    )
-
-
-def map_cqc_publications_row(row: dict) -> Document:
-    """Map CQC Publications CSV row to Document."""
-    return Document(
-        title=row['Title'],
-        section='cqc-publications',
-        url=row['URL'],
-        date=row['Date'],  # Will be formatted by caller
-        description='',  # No description in this CSV
-        category='Publication',
-        source=row['Publication']
-    )
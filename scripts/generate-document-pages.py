@@ -1,12 +1,26 @@
 #!/usr/bin/env python3
 """
 Generate individual landing pages for each document from the document registry.
+
+Documents whose PDF has searchable text (see pdf_text.py) show an excerpt
+of it, which also serves as the meta description when the document has no
+description of its own.
+
+Pages can be rendered in parallel with --workers N; the output is identical
+to a serial run. Documents stream through in batches, so with a JSON Lines
+registry memory use does not grow with the number of documents.
 """
 
-import json
-import os
+import argparse
+from html import escape
 from pathlib import Path
 
+from document_registry import iter_registry
+from pdf_text import excerpt_for
+from output_writer import write_html
+from template_engine import page_template
+from worker_pool import batched, default_workers, run_batches
+
 
 # Map section IDs to their display names and page URLs
 SECTION_CONFIG = {
@@ -41,6 +55,10 @@ SECTION_CONFIG = {
 }
 
 
+# Characters of a PDF's text shown on its landing page
+EXCERPT_LENGTH = 600
+
+
 def truncate_description(text, max_length=155):
     """Truncate description for meta tag (Google shows ~155-160 characters)."""
     if len(text) <= max_length:
@@ -49,7 +67,13 @@ def truncate_description(text, max_length=155):
 
 
 def generate_document_page(doc, template):
-    """Generate HTML for a single document page."""
+    """
+    Generate HTML for a single document page.
+
+    Args:
+        doc: Document dict from the registry
+        template: Compiled page template (see main)
+    """
 
     section_info = SECTION_CONFIG.get(doc['section'], {
         'name': doc['section'].title(),
@@ -91,6 +115,15 @@ def generate_document_page(doc, template):
                 <p class="text-[#101419] text-base leading-relaxed">{doc['description']}</p>
               </div>'''
 
+    excerpt = excerpt_for(doc.get('file_path'), EXCERPT_LENGTH)
+    excerpt_html = ''
+    if excerpt:
+        excerpt_html = f'''
+              <div class="flex flex-col gap-2">
+                <p class="text-[#58728d] text-sm font-medium">From the document</p>
+                <p class="text-[#101419] text-base leading-relaxed">{escape(excerpt)}</p>
+              </div>'''
+
     # Build breadcrumb
     breadcrumb = f'''
         <div class="bg-white border-b border-solid border-b-[#e9edf1] px-10 py-3">
@@ -111,6 +144,7 @@ def generate_document_page(doc, template):
                 {metadata_html}
               </div>
               {description_html}
+              {excerpt_html}
               <div class="flex flex-col sm:flex-row gap-3">
                 <a href="{doc['url']}" target="_blank"
                    class="flex w-full sm:w-auto sm:min-w-[200px] sm:max-w-[400px] cursor-pointer items-center justify-center overflow-hidden rounded-full h-12 px-6 bg-[#1971c2] text-white text-base font-bold leading-normal tracking-[0.015em] hover:bg-[#1864ab] transition-colors">
@@ -126,33 +160,61 @@ def generate_document_page(doc, template):
         </div>'''
 
     # Create meta description
-    meta_description = doc.get('description', doc['title'])
+    meta_description = doc.get('description', doc['title']) or excerpt
     meta_description = truncate_description(meta_description)
 
     # Populate base template
-    html = template.replace('{meta_title}', doc['title'])
-    html = html.replace('{meta_description}', meta_description)
-    html = html.replace('{canonical_url}', doc['document_url'])
-    html = html.replace('{breadcrumb}', breadcrumb)
-    html = html.replace('{page_title}', '')  # No duplicate page title for document pages
-    html = html.replace('{content}', content)
-    html = html.replace('{path_prefix}', '../')
+    return template.render(
+        meta_title=doc['title'],
+        meta_description=meta_description,
+        canonical_url=doc['document_url'],
+        breadcrumb=breadcrumb,
+        content=content,
+    )
+
 
-    return html
+# Number of pages each worker renders before handing its writes back
+BATCH_SIZE = 50
 
 
-def main():
-    """Generate all document landing pages."""
+def write_document_pages(docs, template, output_dir):
+    """
+    Render a batch of document pages, then write them out together.
 
-    # Load document registry
-    registry_path = Path('../data/document-registry.json')
-    with open(registry_path, 'r', encoding='utf-8') as f:
-        documents = json.load(f)
+    Returns:
+        dict: Number of pages written per section, for the summary counts
+    """
+    pages = [(output_dir / doc['document_url'].split('/')[-1], generate_document_page(doc, template))
+             for doc in docs]
 
-    # Load base template
-    template_path = Path('base-template.html')
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template = f.read()
+    for output_path, html in pages:
+        write_html(output_path, html)
+
+    counts = {}
+    for doc in docs:
+        counts[doc['section']] = counts.get(doc['section'], 0) + 1
+    return counts
+
+
+def main(workers=1, documents=None):
+    """
+    Generate all document landing pages.
+
+    Args:
+        workers: Number of worker processes used to render pages (1 = serial)
+        documents: Registry entries (dicts), as build-site.py passes them;
+            streamed from the document registry when run on its own
+    """
+
+    # Stream the document registry
+    if documents is None:
+        documents = iter_registry()
+
+    # Compile base template once; these placeholders are the same on every page
+    template = page_template(
+        page_title='',  # No duplicate page title for document pages
+        path_prefix='../',
+    )
 
     # Create output directory
     output_dir = Path('../docs/documents')
@@ -160,27 +222,23 @@ def main():
 
     print(f"Generating document landing pages...\n")
 
+    # Render and write pages in batches, in parallel when workers > 1
+    batches = batched(documents, BATCH_SIZE)
+    results = run_batches(write_document_pages, batches, workers, template, output_dir)
+
     # Track by section for summary
     section_counts = {}
-
-    for doc in documents:
-        # Generate HTML
-        html = generate_document_page(doc, template)
-
-        # Write to file
-        output_path = output_dir / doc['document_url'].split('/')[-1]
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
-
-        # Track counts
-        section = doc['section']
-        section_counts[section] = section_counts.get(section, 0) + 1
+    for counts in results:
+        for section, count in counts.items():
+            section_counts[section] = section_counts.get(section, 0) + count
 
     print(f"{'='*60}")
     print(f"Document pages generated!")
     print(f"{'='*60}")
-    print(f"Total pages: {len(documents)}")
+    print(f"Total pages: {sum(section_counts.values())}")
     print(f"Output directory: {output_dir}")
+    if workers > 1:
+        print(f"Workers: {workers}")
 
     print(f"\nPages by section:")
     for section, count in sorted(section_counts.items()):
@@ -189,4 +247,8 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Generate document landing pages.')
+    parser.add_argument('--workers', type=int, default=1,
+                        help=f'worker processes for rendering (0 = one per CPU, {default_workers()} here)')
+    args = parser.parse_args()
+    main(workers=args.workers or default_workers())
@@ -1,19 +1,46 @@
 #!/usr/bin/env python3
 """
 Generate comprehensive sitemap including HTML pages, document landing pages, and PDFs
+
+lastmod is the date a URL's content last changed, not the file's mtime:
+data/sitemap-lastmod.json records a content hash and lastmod for every
+URL, and lastmod only moves forward when the page or PDF bytes change.
+Commit that file along with docs/.
+
+The XML is streamed to disk. While the whole site fits comfortably in one
+sitemap (SPLIT_URLS / SPLIT_BYTES, 90% of the protocol's 50,000 URL and
+50 MB limits), sitemap.xml lists every URL. Beyond that, sitemap.xml
+becomes a sitemap index pointing at sitemap-pages.xml,
+sitemap-documents.xml and sitemap-pdfs.xml, each split further into
+numbered parts as needed.
 """
-import os
 import json
-from datetime import datetime
+import xml.etree.ElementTree as ElementTree
+from datetime import date
 from pathlib import Path
 from html import escape
 
+from build_manifest import hash_file
+from document_registry import iter_registry, registry_path
+from output_writer import open_output, write_text
+
 # Base configuration
 SITE_URL = "https://clarencesundram.org"
 DOCS_DIR = Path(__file__).parent.parent / "docs"
 DATA_DIR = Path(__file__).parent.parent / "data"
 OUTPUT_FILE = DOCS_DIR / "sitemap.xml"
 
+# URL path -> content hash and lastmod, persisted between builds
+LASTMOD_FILE = DATA_DIR / "sitemap-lastmod.json"
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+# Sitemap protocol limits per file, and the point at which we split
+MAX_URLS = 50000
+MAX_BYTES = 50 * 1024 * 1024
+SPLIT_URLS = MAX_URLS * 9 // 10
+SPLIT_BYTES = MAX_BYTES * 9 // 10
+
 # Main HTML pages with their priorities
 HTML_PAGES = [
     ("index.html", 1.0, "monthly"),
@@ -29,100 +56,227 @@ HTML_PAGES = [
 ]
 
 
-def get_file_date(filepath):
-    """Get file modification date in YYYY-MM-DD format"""
-    timestamp = os.path.getmtime(filepath)
-    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
-
-
-def generate_sitemap():
-    """Generate complete sitemap with HTML pages, document landing pages, and PDFs"""
-
-    urls = []
-
-    # Add main HTML pages
-    print("Adding main HTML pages...")
-    for page, priority, changefreq in HTML_PAGES:
-        filepath = DOCS_DIR / page
-        if filepath.exists():
-            lastmod = get_file_date(filepath)
-            urls.append({
-                'loc': f"{SITE_URL}/{page}",
-                'lastmod': lastmod,
-                'priority': priority,
-                'changefreq': changefreq
-            })
-            print(f"  ✓ {page}")
-
-    # Add document landing pages from registry
-    print("\nAdding document landing pages...")
-    registry_path = DATA_DIR / "document-registry.json"
-    doc_count = 0
-    if registry_path.exists():
-        with open(registry_path, 'r', encoding='utf-8') as f:
-            documents = json.load(f)
-
-        for doc in documents:
+class LastmodTracker:
+    """Content-derived lastmod dates, persisted in LASTMOD_FILE."""
+
+    def __init__(self, path=LASTMOD_FILE, hasher=hash_file, today=None):
+        self.path = Path(path)
+        self.hasher = hasher
+        self.today = today or date.today().isoformat()
+        self.previous = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.previous = json.load(f)
+        self.seeded = {} if self.previous else previous_sitemap_lastmods()
+        self.current = {}
+        self.changed = 0
+
+    def lastmod(self, url_path, filepath):
+        """Return the lastmod for a URL, advancing it if the file's bytes changed."""
+        if url_path in self.current:
+            # Seen already (URLs are generated again for a sitemap index)
+            return self.current[url_path]['lastmod']
+        digest = self.hasher(filepath)
+        entry = self.previous.get(url_path)
+        if entry is None and url_path in self.seeded:
+            # First run with content tracking: keep the dates crawlers have seen
+            entry = {'sha256': digest, 'lastmod': self.seeded[url_path]}
+        if entry is None or entry['sha256'] != digest:
+            entry = {'sha256': digest, 'lastmod': self.today}
+            self.changed += 1
+        self.current[url_path] = entry
+        return entry['lastmod']
+
+    def save(self):
+        """Write the state for this build's URLs (URLs that disappeared are dropped)."""
+        if self.current == self.previous:
+            return
+        write_text(self.path, json.dumps(self.current, indent=2, sort_keys=True,
+                                         ensure_ascii=False) + '\n')
+
+
+def previous_sitemap_lastmods():
+    """Read URL path -> lastmod from the sitemap(s) currently in docs/."""
+    lastmods = {}
+    pending = [OUTPUT_FILE]
+    while pending:
+        sitemap = pending.pop()
+        if not sitemap.exists():
+            continue
+        loc = None
+        for _, element in ElementTree.iterparse(sitemap):
+            tag = element.tag.rsplit('}', 1)[-1]
+            if tag == 'loc':
+                loc = element.text.strip()
+            elif tag == 'lastmod' and loc:
+                lastmods[loc] = element.text.strip()
+            elif tag == 'sitemap' and loc:
+                pending.append(DOCS_DIR / loc[len(SITE_URL) + 1:])
+                loc = None
+    prefix = f"{SITE_URL}/"
+    return {loc[len(prefix):]: lastmod for loc, lastmod in lastmods.items()
+            if loc.startswith(prefix)}
+
+
+def url_xml(url):
+    """XML for one <url> entry, with its leading newline."""
+    return (f'\n  <url>'
+            f'\n    <loc>{escape(url["loc"])}</loc>'
+            f'\n    <lastmod>{url["lastmod"]}</lastmod>'
+            f'\n    <changefreq>{url["changefreq"]}</changefreq>'
+            f'\n    <priority>{url["priority"]}</priority>'
+            f'\n  </url>')
+
+
+def write_urlsets(name, urls, max_files=None):
+    """
+    Stream <url> entries into name.xml, name-2.xml, ...
+
+    A new file is started whenever the next entry would take the current
+    one past SPLIT_URLS or SPLIT_BYTES.
+
+    Args:
+        name: Base file name in docs/, without .xml
+        urls: Iterable of URL dicts
+        max_files: Give up (returning None) rather than write more files
+
+    Returns:
+        list: (path, lastmod) for each file written, lastmod being the
+            newest lastmod of its URLs; or None if max_files was exceeded
+    """
+    header = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">'.encode('utf-8')
+    footer = '\n</urlset>'.encode('utf-8')
+    written = []
+    urls = iter(urls)
+    url = next(urls, None)
+
+    while url is not None:
+        if max_files is not None and len(written) == max_files:
+            return None
+        part = f"{name}.xml" if not written else f"{name}-{len(written) + 1}.xml"
+        lastmod = ''
+        # Only replaces the file if its contents changed (see output_writer.py)
+        with open_output(DOCS_DIR / part) as f:
+            f.write(header)
+            count, size = 0, len(header)
+            while url is not None:
+                entry = url_xml(url).encode('utf-8')
+                if count and (count == SPLIT_URLS or size + len(entry) + len(footer) > SPLIT_BYTES):
+                    break
+                f.write(entry)
+                count += 1
+                size += len(entry)
+                lastmod = max(lastmod, url['lastmod'])
+                url = next(urls, None)
+            f.write(footer)
+        written.append((DOCS_DIR / part, lastmod))
+
+    return written
+
+
+def write_sitemap_index(sitemaps):
+    """Write sitemap.xml as an index of the given (path, lastmod) child sitemaps."""
+    parts = [f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">']
+    for path, lastmod in sitemaps:
+        parts.append('\n  <sitemap>')
+        parts.append(f'\n    <loc>{escape(SITE_URL + "/" + path.name)}</loc>')
+        parts.append(f'\n    <lastmod>{lastmod}</lastmod>')
+        parts.append('\n  </sitemap>')
+    parts.append('\n</sitemapindex>')
+    write_text(OUTPUT_FILE, ''.join(parts))
+
+
+def generate_sitemap(hasher=hash_file, documents=None):
+    """
+    Generate complete sitemap with HTML pages, document landing pages, and PDFs
+
+    Args:
+        hasher: Function returning a file's SHA-256 (build-site.py passes
+            BuildManifest.file_hash, which skips re-reading unchanged files)
+        documents: Registry entries (dicts); streamed from the document
+            registry when not given
+    """
+
+    tracker = LastmodTracker(hasher=hasher)
+    counts = {'pages': 0, 'documents': 0, 'pdfs': 0}
+
+    # URLs are generated as the XML is written, so no list of every URL is
+    # built. A group is generated again if the site needs a sitemap index.
+    def page_urls():
+        for page, priority, changefreq in HTML_PAGES:
+            filepath = DOCS_DIR / page
+            if filepath.exists():
+                yield {
+                    'loc': f"{SITE_URL}/{page}",
+                    'lastmod': tracker.lastmod(page, filepath),
+                    'priority': priority,
+                    'changefreq': changefreq
+                }
+
+    def document_urls():
+        for doc in (iter_registry() if documents is None else documents):
             doc_url = doc['document_url']
             filepath = DOCS_DIR / doc_url
             if filepath.exists():
-                lastmod = get_file_date(filepath)
-                urls.append({
+                yield {
                     'loc': f"{SITE_URL}/{doc_url}",
-                    'lastmod': lastmod,
+                    'lastmod': tracker.lastmod(doc_url, filepath),
                     'priority': 0.7,
                     'changefreq': 'monthly'
-                })
-                doc_count += 1
-
-        print(f"  ✓ Added {doc_count} document pages")
-    else:
-        print(f"  ⚠ Document registry not found at {registry_path}")
-
-    # Add PDFs
-    print("\nAdding PDF files...")
-    pdf_count = 0
-    for pdf_path in sorted(DOCS_DIR.glob("assets/**/*.pdf")):
-        # Get relative path from docs directory
-        rel_path = pdf_path.relative_to(DOCS_DIR)
-        # Convert to URL path
-        url_path = str(rel_path).replace(" ", "%20")
-
-        lastmod = get_file_date(pdf_path)
-        urls.append({
-            'loc': f"{SITE_URL}/{url_path}",
-            'lastmod': lastmod,
-            'priority': 0.6,
-            'changefreq': 'yearly'
-        })
-        pdf_count += 1
-
-    print(f"  ✓ Added {pdf_count} PDFs")
-
-    # Generate XML
-    print("\nGenerating sitemap XML...")
-    xml_lines = ['<?xml version="1.0" encoding="UTF-8"?>']
-    xml_lines.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
-
-    for url in urls:
-        xml_lines.append('  <url>')
-        xml_lines.append(f'    <loc>{escape(url["loc"])}</loc>')
-        xml_lines.append(f'    <lastmod>{url["lastmod"]}</lastmod>')
-        xml_lines.append(f'    <changefreq>{url["changefreq"]}</changefreq>')
-        xml_lines.append(f'    <priority>{url["priority"]}</priority>')
-        xml_lines.append('  </url>')
-
-    xml_lines.append('</urlset>')
-
-    # Write to file
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(xml_lines))
+                }
+
+    def pdf_urls():
+        for pdf_path in sorted(DOCS_DIR.glob("assets/**/*.pdf")):
+            # Get relative path from docs directory
+            rel_path = pdf_path.relative_to(DOCS_DIR)
+            # Convert to URL path
+            url_path = str(rel_path).replace(" ", "%20")
+
+            yield {
+                'loc': f"{SITE_URL}/{url_path}",
+                'lastmod': tracker.lastmod(url_path, pdf_path),
+                'priority': 0.6,
+                'changefreq': 'yearly'
+            }
+
+    sources = {'pages': page_urls, 'documents': document_urls, 'pdfs': pdf_urls}
+
+    def group_urls(group):
+        counts[group] = 0
+        for url in sources[group]():
+            counts[group] += 1
+            yield url
+
+    if documents is None and not registry_path().exists():
+        print(f"⚠ Document registry not found at {registry_path()}")
+        documents = []
+
+    # Generate XML: a single sitemap while everything fits, otherwise an index
+    print("Generating sitemap XML...")
+    all_urls = (url for group in sources for url in group_urls(group))
+    written = write_urlsets(OUTPUT_FILE.stem, all_urls, max_files=1)
+    if written is None:
+        written = []
+        for group in sources:
+            written.extend(write_urlsets(f"sitemap-{group}", group_urls(group)))
+        write_sitemap_index(written)
+
+    # Remove child sitemaps left over from an earlier, larger build
+    current = {path.name for path, _ in written}
+    for stale in DOCS_DIR.glob("sitemap-*.xml"):
+        if stale.name not in current:
+            stale.unlink()
+
+    tracker.save()
 
     print(f"\n✅ Sitemap generated: {OUTPUT_FILE}")
-    print(f"   Total URLs: {len(urls)}")
-    print(f"   - Main pages: {len(HTML_PAGES)}")
-    print(f"   - Document pages: {doc_count}")
-    print(f"   - PDFs: {pdf_count}")
+    if OUTPUT_FILE.name not in current:
+        print(f"   Sitemap index of {len(written)} sitemaps")
+    print(f"   Total URLs: {sum(counts.values())}")
+    print(f"   - Main pages: {counts['pages']}")
+    print(f"   - Document pages: {counts['documents']}")
+    print(f"   - PDFs: {counts['pdfs']}")
+    print(f"   Content changed since last sitemap: {tracker.changed} URL(s)")
 
 
 if __name__ == "__main__":
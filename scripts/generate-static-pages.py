@@ -5,6 +5,9 @@ Generate static pages (index, cqc, court-monitor) using base template and conten
 
 from pathlib import Path
 
+from output_writer import write_html
+from template_engine import page_template
+
 
 # Page configurations
 PAGES = [
@@ -46,34 +49,24 @@ PAGES = [
 def main():
     """Generate all static pages using base template and content files."""
 
-    # Load base template
-    template_path = Path('base-template.html')
-    with open(template_path, 'r', encoding='utf-8') as f:
-        base_template = f.read()
-
-    print("Generating static pages...\n")
-
     for page_config in PAGES:
-        # Load content file
-        content_path = Path(page_config['content_file'])
-        with open(content_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Populate base template
-        html = base_template.replace('{meta_title}', page_config['meta_title'])
-        html = html.replace('{meta_description}', page_config['meta_description'])
-        html = html.replace('{canonical_url}', page_config['canonical_url'])
-        html = html.replace('{breadcrumb}', '')  # No breadcrumb for static pages
-        html = html.replace('{page_title}', page_config['page_title'])
-        html = html.replace('{content}', content)
-        html = html.replace('{path_prefix}', './')
+        # Populate base template, with the content file in {content}
+        template = page_template(page_config['content_file'])
+        html = template.render(
+            meta_title=page_config['meta_title'],
+            meta_description=page_config['meta_description'],
+            canonical_url=page_config['canonical_url'],
+            breadcrumb='',  # No breadcrumb for static pages
+            page_title=page_config['page_title'],
+            path_prefix='./',
+        )
 
         # Write output file
         output_path = Path(page_config['output'])
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
-
-        print(f"✅ Generated {output_path.name}")
+        if write_html(output_path, html):
+            print(f"✅ Generated {output_path.name}")
+        else:
+            print(f"⏭ {output_path.name} unchanged")
 
     print(f"\n{'='*60}")
     print(f"Static pages generated with search functionality!")
@@ -81,4 +74,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # build-site.py prints its own heading before calling main()
+    print("Generating static pages...\n")
     main()
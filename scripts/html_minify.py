@@ -0,0 +1,211 @@
+"""
+Whitespace minification of generated HTML pages.
+
+The templates and table rows are indented for readability, and that
+indentation is repeated in every page and row. minify() removes it without
+changing what the browser renders:
+
+- whitespace between tags and in text collapses to one space, or to one
+  newline if it contained a line break (so pages still diff line by line)
+- whitespace between attributes collapses to one space; attribute values
+  are never touched
+- comments outside tags are dropped (conditional comments are kept)
+- <pre> and <textarea> contents are kept exactly
+- inline <script>: indentation, blank lines and whole-line // comments are
+  dropped. Lines are never joined (so automatic semicolon insertion is
+  unaffected), and whitespace inside strings, multi-line template literals
+  and block comments is kept
+- inline <style>: comments are dropped and whitespace collapsed
+
+Only HTML whitespace (space, tab, newline, carriage return, form feed)
+counts; non-breaking spaces are content.
+"""
+
+import re
+
+
+# Attribute values may contain '>' (and '<!--') if quoted. As in browsers,
+# only a quote right after '=' opens a value; a stray one is just a character.
+QUOTED_VALUE = r'''=[ \t\n\r\f]*(?:"[^"]*"|'[^']*')'''
+ATTRIBUTES = r'(?:' + QUOTED_VALUE + r'|[^>])*'
+# A comment, an element whose contents are not markup, or any other tag.
+# Matching all three in one pass means comment markers inside attribute
+# values, and tags inside comments, are never mistaken for either.
+TOKEN = re.compile(
+    r'(<!--.*?-->)'
+    r'|(<(pre|textarea|script|style)\b' + ATTRIBUTES + r'>)(.*?)(</\3\s*>)'
+    r'|<' + ATTRIBUTES + r'>',
+    re.IGNORECASE | re.DOTALL)
+TAG_END_SPACE = re.compile(r' (/?>)$')
+SPACE = re.compile(r'[ \t\n\r\f]+')
+QUOTED_OR_SPACE = re.compile(r'(' + QUOTED_VALUE + r')|[ \t\n\r\f]+')
+CSS_TOKEN = re.compile(r'''("[^"]*"|'[^']*')|/\*.*?\*/|[ \t\n\r\f]+''', re.DOTALL)
+
+# JavaScript tokens, enough to tell code from strings, comments, regular
+# expression and template literals. Strings may continue over an escaped
+# newline; regular expressions are told from divisions by the token before.
+JS_TOKEN = re.compile(r"""
+    (?P<code>[^\n"'`/{}]+)
+    | (?P<newline>\n)
+    | (?P<line_comment>//[^\n]*)
+    | (?P<comment>/\*.*?(?:\*/|\Z))
+    | (?P<string>"(?:[^"\\\n]|\\.)*"?|'(?:[^'\\\n]|\\.)*'?)
+    | (?P<other>.)
+    """, re.VERBOSE | re.DOTALL)
+JS_REGEX = re.compile(r'/(?:[^\\/\n\[]|\\[^\n]|\[(?:[^\]\\\n]|\\[^\n])*\]?)*/?')
+# The text of a template literal up to its end or next ${
+JS_TEMPLATE_TEXT = re.compile(r'(?:[^`\\$]|\\.|\$(?!\{))*', re.DOTALL)
+# After one of these (or at the start), '/' opens a regular expression
+REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_AFTER_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+                        'throw', 'case', 'do', 'else', 'yield', 'await'}
+LAST_WORD = re.compile(r'[A-Za-z0-9_$]+$')
+
+
+def _collapse(match):
+    return '\n' if '\n' in match.group() else ' '
+
+
+def minify_tag(tag):
+    """Collapse the whitespace between a tag's attributes."""
+    tag = QUOTED_OR_SPACE.sub(lambda match: match.group(1) or ' ', tag)
+    return TAG_END_SPACE.sub(r'\1', tag)
+
+
+def _regex_allowed(code):
+    """True if a '/' after code opens a regular expression literal."""
+    word = LAST_WORD.search(code)
+    return word.group() in REGEX_AFTER_KEYWORDS if word else code[-1] in REGEX_AFTER
+
+
+def _newlines_in_code(js):
+    """
+    For each newline in js, whether it is in code, rather than inside a
+    string, template literal or block comment.
+
+    Skips strings, comments and regular expression literals, so quotes and
+    backticks inside them are not taken for the start of a string, and
+    follows ${...} in template literals (which may hold further templates).
+    """
+    in_code = []
+    templates = []  # Brace depth outside each open ${...}
+    depth = 0       # Brace depth inside the innermost ${...}
+    last = ';'      # Code before the last token, to tell a regex literal from a division
+    position, end = 0, len(js)
+    while position < end:
+        match = JS_TOKEN.match(js, position)
+        kind, token = match.lastgroup, match.group()
+        position = match.end()
+        if kind == 'newline':
+            in_code.append(True)
+        elif kind in ('comment', 'string'):
+            in_code.extend([False] * token.count('\n'))
+            if kind == 'string':
+                last = token[0]
+        elif kind == 'code':
+            token = token.rstrip(' \t\r\f')
+            if token:
+                last = token
+        elif kind == 'other':
+            if token == '/' and _regex_allowed(last):
+                position = JS_REGEX.match(js, match.start()).end()
+            elif token == '`' or (token == '}' and templates and depth == 0):
+                if token == '`':
+                    templates.append(depth)
+                # Template text, up to its closing backtick or next ${...}
+                text = JS_TEMPLATE_TEXT.match(js, position)
+                in_code.extend([False] * text.group().count('\n'))
+                position = text.end()
+                if js.startswith('${', position):
+                    depth = 0
+                    position += 2
+                    token = '{'
+                else:
+                    depth = templates.pop()
+                    position += 1
+            elif token == '{' and templates:
+                depth += 1
+            elif token == '}' and templates:
+                depth -= 1
+            last = token
+    return in_code
+
+
+def minify_script(js):
+    """
+    Drop indentation, blank lines and whole-line comments from inline JavaScript.
+
+    Lines that start or end inside a string, template literal or block
+    comment keep their whitespace there.
+
+    Examples:
+        >>> minify_script("\\n    let tick = '`';  // closes with `\\n    let rest = 1;\\n")
+        "\\nlet tick = '`';  // closes with `\\nlet rest = 1;\\n"
+        >>> minify_script("\\n  let html = `<p>\\n    ${name}</p>`;\\n\\n  // done\\n")
+        '\\nlet html = `<p>\\n    ${name}</p>`;\\n'
+        >>> minify_script("\\n  if (/`/.test(s)) {\\n    s = s.replace(/`/g, '');\\n  }\\n")
+        "\\nif (/`/.test(s)) {\\ns = s.replace(/`/g, '');\\n}\\n"
+    """
+    in_code = _newlines_in_code(js)
+    lines = []
+    for line, starts_in_code, ends_in_code in zip(js.split('\n'), [True] + in_code, in_code + [True]):
+        if starts_in_code:
+            line = line.lstrip(' \t\r')
+            if not line or line.startswith('//'):
+                continue
+        if ends_in_code:
+            line = line.rstrip(' \t\r')
+        lines.append(line)
+    return '\n' + '\n'.join(lines) + '\n' if lines else ''
+
+
+def minify_style(css):
+    """Drop comments and collapse whitespace in inline CSS."""
+    css = CSS_TOKEN.sub(lambda match: match.group(1) or ('' if match.group().startswith('/*') else ' '), css)
+    return css.strip()
+
+
+def minify(html):
+    """
+    Return html with redundant whitespace and comments removed.
+
+    Examples:
+        >>> minify('<p title="a <!-- b -->">\\n  one <!-- note --> two\\n</p>')
+        '<p title="a <!-- b -->">\\none two\\n</p>'
+        >>> minify('<meta content="a "b" c">\\n  <script src="x.js"></script>')
+        '<meta content="a "b" c">\\n<script src="x.js"></script>'
+        >>> minify('<!--[if IE]><p>Old</p><![endif]-->')
+        '<!--[if IE]><p>Old</p><![endif]-->'
+    """
+    parts = []
+    text = []  # Text since the last tag, less any comments in it
+    position = 0
+
+    def flush(end):
+        text.append(html[position:end])
+        parts.append(SPACE.sub(_collapse, ''.join(text)))
+        text.clear()
+
+    for match in TOKEN.finditer(html):
+        comment, open_tag, name, body, close_tag = match.groups()
+        if comment is not None:
+            if comment.startswith('<!--['):
+                # Conditional comment
+                flush(match.start())
+                parts.append(comment)
+            else:
+                text.append(html[position:match.start()])
+        elif open_tag is not None:
+            flush(match.start())
+            name = name.lower()
+            if name == 'script':
+                body = minify_script(body)
+            elif name == 'style':
+                body = minify_style(body)
+            parts.append(minify_tag(open_tag) + body + close_tag)
+        else:
+            flush(match.start())
+            parts.append(minify_tag(match.group()))
+        position = match.end()
+    flush(len(html))
+    return ''.join(parts)
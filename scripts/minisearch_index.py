@@ -0,0 +1,153 @@
+"""
+Build MiniSearch indexes at build time.
+
+MiniSearchIndex mirrors what MiniSearch 6.3.0 does in the browser when
+documents are added with addAll(), and serializes the result in the format
+MiniSearch.loadJSON() reads (serializationVersion 2). The page then only has
+to deserialize the index instead of tokenizing every document on load.
+
+The fields, stored fields and tokenization must match the options the page
+passes to loadJSON (see base-template.html), otherwise queries are processed
+differently from the indexed terms.
+"""
+
+import re
+import sys
+import unicodedata
+from functools import lru_cache
+
+
+SERIALIZATION_VERSION = 2
+
+# Options shared with the MiniSearch client in base-template.html
+FIELDS = ['title', 'description', 'category', 'source', 'text']
+STORE_FIELDS = ['title', 'description', 'category', 'date', 'section', 'url']
+
+
+@lru_cache(maxsize=None)
+def _separator_pattern():
+    """
+    Compile MiniSearch's default separator, /[\\n\\r\\p{Z}\\p{P}]+/u.
+
+    Python's re has no \\p{...} classes, so the character class is built
+    from the Unicode database: every separator (Z*) and punctuation (P*)
+    code point, written as ranges.
+    """
+    ranges = []
+    for code in range(sys.maxunicode + 1):
+        if unicodedata.category(chr(code))[0] in 'ZP':
+            if ranges and ranges[-1][1] == code - 1:
+                ranges[-1][1] = code
+            else:
+                ranges.append([code, code])
+
+    parts = ['\\n\\r']
+    for start, end in ranges:
+        parts.append(re.escape(chr(start)))
+        if end > start:
+            parts.append('-' + re.escape(chr(end)))
+    return re.compile('[' + ''.join(parts) + ']+')
+
+
+def tokenize(text):
+    """Split text the way MiniSearch's default tokenize does."""
+    return _separator_pattern().split(text)
+
+
+def process_term(term):
+    """Normalize a term the way MiniSearch's default processTerm does."""
+    return term.lower()
+
+
+class MiniSearchIndex:
+    """An inverted index serialized in MiniSearch's toJSON() format."""
+
+    def __init__(self, fields=FIELDS, store_fields=STORE_FIELDS, id_field='id'):
+        self.fields = list(fields)
+        self.store_fields = list(store_fields)
+        self.id_field = id_field
+        self.field_ids = {field: index for index, field in enumerate(self.fields)}
+
+        self.document_ids = {}
+        self.seen_ids = set()
+        self.field_length = {}
+        self.average_field_length = []
+        self.stored_fields = {}
+        # term -> field id -> short document id -> term frequency
+        self.index = {}
+
+    def __len__(self):
+        return len(self.document_ids)
+
+    def add(self, document):
+        """
+        Index one document, as MiniSearch.add() would.
+
+        Raises:
+            ValueError: If the document has no ID or its ID is already indexed
+        """
+        doc_id = document.get(self.id_field)
+        if doc_id is None:
+            raise ValueError(f'Document does not have ID field "{self.id_field}"')
+        if doc_id in self.seen_ids:
+            raise ValueError(f"Duplicate document ID {doc_id}")
+
+        short_id = len(self.document_ids)
+        self.document_ids[short_id] = doc_id
+        self.seen_ids.add(doc_id)
+
+        self.stored_fields[short_id] = {field: document[field]
+                                        for field in self.store_fields
+                                        if field in document}
+
+        lengths = self.field_length.setdefault(short_id, [])
+        for field in self.fields:
+            value = document.get(field)
+            if value is None:
+                continue
+
+            field_id = self.field_ids[field]
+            tokens = tokenize(str(value))
+
+            # MiniSearch counts distinct tokens (including empty ones) as the
+            # field length, and keeps a running average per field
+            while len(lengths) <= field_id:
+                lengths.append(None)
+            lengths[field_id] = len(set(tokens))
+            while len(self.average_field_length) <= field_id:
+                self.average_field_length.append(0)
+            average = self.average_field_length[field_id]
+            self.average_field_length[field_id] = (average * short_id + lengths[field_id]) / (short_id + 1)
+
+            for token in tokens:
+                term = process_term(token)
+                if not term:
+                    continue
+                postings = self.index.setdefault(term, {}).setdefault(field_id, {})
+                postings[short_id] = postings.get(short_id, 0) + 1
+
+    def add_all(self, documents):
+        """Index every document in order."""
+        for document in documents:
+            self.add(document)
+
+    def to_json(self):
+        """
+        Return the index as the plain object MiniSearch's toJSON() produces.
+
+        Dictionary keys are document and field IDs, which JSON turns into
+        strings exactly as JavaScript's Object.fromEntries() does. Terms are
+        sorted so the output is stable between builds.
+        """
+        return {
+            'documentCount': len(self.document_ids),
+            'nextId': len(self.document_ids),
+            'documentIds': self.document_ids,
+            'fieldIds': self.field_ids,
+            'fieldLength': self.field_length,
+            'averageFieldLength': self.average_field_length,
+            'storedFields': self.stored_fields,
+            'dirtCount': 0,
+            'index': [[term, self.index[term]] for term in sorted(self.index)],
+            'serializationVersion': SERIALIZATION_VERSION,
+        }
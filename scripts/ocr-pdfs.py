@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+OCR the scanned PDFs that check-pdf-text.py flags
+Requires: ocrmypdf (with tesseract) and pdftotext (from poppler-utils)
+Install on macOS: brew install ocrmypdf poppler
+
+PDFs are OCR'd in parallel and the results cached by content hash (see
+pdf_ocr.py). Interrupting the run is safe: finished files are kept and the
+next run continues with the rest. The next build-site.py run publishes the
+OCR'd copies in place of the originals.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pdf_ocr
+import pdf_text
+import section_engine
+
+
+def ocr_scanned_pdfs(workers=None, timeout=pdf_ocr.TIMEOUT, retry_errors=False):
+    """OCR every source PDF the sections publish that has little or no text"""
+
+    if not (pdf_text.is_available() and pdf_ocr.is_available()):
+        print("❌ ERROR: ocrmypdf and pdftotext are required!")
+        print("\nTo install on macOS:")
+        print("  brew install ocrmypdf poppler")
+        print("\nTo install on Ubuntu/Debian:")
+        print("  sudo apt-get install ocrmypdf poppler-utils")
+        sys.exit(1)
+
+    print("Finding PDFs without searchable text...\n")
+    # The source PDFs the sections publish, whose hashes publishing looks OCR'd copies up by
+    pdfs = section_engine.source_pdfs()
+    candidates = pdf_ocr.find_candidates(pdfs, workers=workers)
+    print(f"{len(candidates)} of {len(pdfs)} PDF(s) need OCR\n")
+
+    def report(done, total, candidate, status):
+        rel_path = Path(candidate.path)
+        labels = {'done': "✅ OCR'd", 'cached': '⏭ Already done', 'failed': '❌ Failed'}
+        print(f"[{done}/{total}] {labels[status]}: {rel_path.parent.name}/{rel_path.name[:60]}")
+
+    counts = pdf_ocr.ocr_pdfs(candidates, workers=workers, timeout=timeout,
+                              retry_errors=retry_errors, progress=report)
+
+    print("\n" + "="*80)
+    print(f"OCR'd: {counts['done']}, already done: {counts['cached']}, failed: {counts['failed']}")
+    if counts['failed']:
+        print(f"Error messages are in {pdf_ocr.OCR_DIR}/*.error "
+              "(run with --retry-errors to try again)")
+    if counts['done']:
+        print("Run build-site.py to publish the OCR'd PDFs.")
+    print("="*80)
+
+    return counts['failed'] == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OCR scanned PDFs that have no searchable text.")
+    parser.add_argument('--workers', type=int, default=0,
+                        help='ocrmypdf processes to run at once (0 = one per CPU)')
+    parser.add_argument('--timeout', type=int, default=pdf_ocr.TIMEOUT,
+                        help='seconds allowed per PDF')
+    parser.add_argument('--retry-errors', action='store_true',
+                        help='OCR again PDFs whose last attempt failed')
+    args = parser.parse_args()
+    success = ocr_scanned_pdfs(workers=args.workers or None, timeout=args.timeout,
+                               retry_errors=args.retry_errors)
+    sys.exit(0 if success else 1)
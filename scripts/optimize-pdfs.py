@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Linearize the site's PDFs for fast web view, optionally downsampling images
+Requires: qpdf (and Ghostscript for --dpi)
+Install on macOS: brew install qpdf ghostscript
+
+PDFs are optimized in parallel and the results cached by content hash (see
+pdf_optimize.py). Interrupting the run is safe: finished files are kept and
+the next run continues with the rest. build-site.py --optimize-pdfs (with
+the same --pdf-dpi) publishes the optimized copies in place of the originals.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pdf_optimize
+import section_engine
+
+
+def optimize_published_pdfs(dpi=None, workers=None, timeout=pdf_optimize.TIMEOUT, retry_errors=False):
+    """Optimize every source PDF the sections publish"""
+
+    if not pdf_optimize.is_available():
+        print("❌ ERROR: qpdf is required!")
+        print("\nTo install on macOS:")
+        print("  brew install qpdf ghostscript")
+        print("\nTo install on Ubuntu/Debian:")
+        print("  sudo apt-get install qpdf ghostscript")
+        sys.exit(1)
+    if dpi is not None and not pdf_optimize.can_downsample():
+        print("❌ ERROR: Ghostscript (gs) is required for --dpi")
+        sys.exit(1)
+
+    candidates = pdf_optimize.find_candidates(section_engine.source_pdfs())
+    print(f"{len(candidates)} PDF(s)\n")
+
+    def report(done, total, path, status, record):
+        name = f"{Path(path).parent.name}/{Path(path).name[:60]}"
+        if status == 'done':
+            print(f"[{done}/{total}] ✅ {name}: {pdf_optimize.format_savings(record['source_size'], record['size'])}")
+        elif status == 'cached':
+            print(f"[{done}/{total}] ⏭ Already done: {name}")
+        else:
+            print(f"[{done}/{total}] ❌ Failed: {name}")
+
+    counts = pdf_optimize.optimize_pdfs(candidates, dpi=dpi, workers=workers, timeout=timeout,
+                                        retry_errors=retry_errors, progress=report)
+
+    print("\n" + "="*80)
+    print(f"Optimized: {counts['done']}, already done: {counts['cached']}, failed: {counts['failed']}")
+    if counts['source_bytes']:
+        print(f"All PDFs: {pdf_optimize.format_savings(counts['source_bytes'], counts['bytes'])}")
+    if counts['failed']:
+        print(f"Error messages are in {pdf_optimize.OPTIMIZED_DIR}/*.error "
+              "(run with --retry-errors to try again)")
+    if counts['done']:
+        dpi_option = f" --pdf-dpi {dpi}" if dpi is not None else ""
+        print(f"Run build-site.py --optimize-pdfs{dpi_option} to publish the optimized PDFs.")
+    print("="*80)
+
+    return counts['failed'] == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Linearize (and optionally downsample) the site's PDFs.")
+    parser.add_argument('--dpi', type=int,
+                        help='also downsample images above this resolution (needs Ghostscript)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='PDFs to optimize at once (0 = one per CPU)')
+    parser.add_argument('--timeout', type=int, default=pdf_optimize.TIMEOUT,
+                        help='seconds allowed per tool run')
+    parser.add_argument('--retry-errors', action='store_true',
+                        help='optimize again PDFs whose last attempt failed')
+    args = parser.parse_args()
+    success = optimize_published_pdfs(dpi=args.dpi, workers=args.workers or None, timeout=args.timeout,
+                                      retry_errors=args.retry_errors)
+    sys.exit(0 if success else 1)
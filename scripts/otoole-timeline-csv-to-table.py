@@ -1,102 +1,17 @@
-import csv
-from document_schema import Document, ensure_unique_slug
-from date_utils import format_date_iso
-
 """
-for otoole.csv, which was generated by:
+Generates otoole-timeline.html from otoole-timeline.csv.
+
+otoole-timeline.csv was generated by:
 1. opening "Website SAVP.xlsx" in the Dropbox folder
 2. editing with Numbers on mac (sigh)
 3. exporting to csv.
-"""
-
-
-def main(data_file, content_file, output_file):
-    """
-    Generate HTML page from CSV and return Document objects.
-
-    Args:
-        data_file: Path to CSV file
-        content_file: Path to content template HTML file
-        output_file: Path to output HTML file
-
-    Returns:
-        list[Document]: List of all documents processed
-    """
-    documents = []
-    html_rows = []
-    existing_slugs = set()
-
-    with open(data_file, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            date = format_date_iso(row['DATE'])
-            action = row['ACTION']
-            title = row['News Coverage']
-            url = row['URL']
-
-            # Create Document object
-            doc = Document(
-                title=title,
-                section='otoole-timeline',
-                url=url,
-                date=date,
-                description=action,
-                category='Timeline Event'
-            )
 
-            # Ensure unique slug
-            doc.slug = ensure_unique_slug(doc.slug, doc.section, existing_slugs)
-            existing_slugs.add(f"{doc.section}-{doc.slug}")
-            doc.document_url = f'documents/{doc.section}-{doc.slug}.html'
-
-            documents.append(doc)
-
-            # Generate HTML row
-            html_rows.append(f"""
-            <tr class="border-t border-t-[#d3dbe4]">
-              <td class="align-top px-4 py-2 w-[150px] text-[#58728d] text-sm font-normal leading-normal">
-                {date}
-              </td>
-              <td class="align-top px-4 py-2 w-[600px] text-[#58728d] text-sm font-normal leading-normal">
-                {action}
-              </td>
-              <td class="align-top px-4 py-2 w-[200px] text-[#101419] text-sm font-normal leading-normal">
-                <a href="./{doc.document_url}" class="underline hover:text-blue-600">{title.upper()}</a>
-              </td>
-            </tr>
-            """)
-
-    # Output the combined HTML
-    rows_html = "\n".join(html_rows)
-
-    # Load content template
-    with open(content_file) as f:
-        content_template = f.read()
-
-    # Populate content template with rows
-    content = content_template.replace('{rows}', rows_html)
-
-    # Load base template
-    with open('base-template.html') as f:
-        template = f.read()
-
-    # Populate template
-    html = template.replace('{meta_title}', "O'Toole v. Cuomo - Timeline")
-    html = html.replace('{meta_description}', "Timeline of events and actions in O'Toole v. Cuomo with related news coverage.")
-    html = html.replace('{canonical_url}', 'otoole-timeline.html')
-    html = html.replace('{breadcrumb}', '')
-    html = html.replace('{page_title}', "O'Toole v. Cuomo - Timeline")
-    html = html.replace('{content}', content)
-    html = html.replace('{path_prefix}', './')
-
-    # Save result
-    with open(output_file, 'w') as f:
-        f.write(html)
-        print(f"✅ HTML written to {output_file}")
+The page itself is described in section_config.py and built by
+section_engine.py, like every other section.
+"""
 
-    # Return documents for registry
-    return documents
+import section_engine
 
 
 if __name__ == '__main__':
-    main('../data/otoole-timeline.csv', 'otoole-timeline-content.html', '../docs/otoole-timeline.html')
+    section_engine.main(['otoole-timeline'])
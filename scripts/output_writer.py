@@ -0,0 +1,250 @@
+"""
+Write-if-changed output files for every generator.
+
+Generated files in docs/ and data/ are only replaced when their contents
+actually change, so unchanged pages keep their mtime, git status stays
+fast, and nothing is rewritten needlessly. New contents go to a temporary
+file next to the target and are renamed over it, so a page is never left
+half-written.
+
+To decide whether a file changed, the hash of the new contents is compared
+with the hash recorded when the file was last written (valid while the
+file's size and mtime are unchanged). Without a recorded hash, the
+existing bytes are compared directly.
+
+Counts of files written and skipped are kept per build stage; see
+begin_stage() and stage_report().
+
+HTML pages go through write_html(), which minifies them first (see
+html_minify.py), so the comparison is always between final bytes.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from build_config import CACHE_DIR
+from build_profile import count
+from html_minify import minify
+
+
+HASHES_PATH = CACHE_DIR / 'output-hashes.json'
+
+# Output path -> [size, mtime_ns, sha256] as last written
+_hashes = None
+# Entries recorded by this process, to be saved or passed back to the parent
+_recorded = {}
+_lock = threading.Lock()
+# Held while HASHES_PATH is read, so sections built in threads load it once
+_load_lock = threading.Lock()
+
+# Files written and skipped since begin_stage()
+_counts = {'written': 0, 'skipped': 0}
+
+# HTML output path -> [bytes before, bytes after minification], this build
+_html_sizes = {}
+
+
+def _load_hashes():
+    global _hashes
+    if _hashes is None:
+        with _load_lock:
+            if _hashes is None:
+                hashes = {}
+                if HASHES_PATH.exists():
+                    with open(HASHES_PATH, 'r', encoding='utf-8') as f:
+                        hashes = json.load(f)
+                _hashes = hashes
+    return _hashes
+
+
+def _is_current(path, entry):
+    """True if the file at path still has the size and mtime entry was recorded for."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    return entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns
+
+
+def save_hashes():
+    """
+    Persist the recorded output hashes (the build calls this at the end).
+
+    Entries for files that were deleted, or changed by something else since
+    they were recorded, can never be used again and are dropped.
+    """
+    global _hashes
+    hashes = _load_hashes()
+    current = {path: entry for path, entry in hashes.items() if _is_current(path, entry)}
+    if not _recorded and len(current) == len(hashes):
+        return
+    _hashes = hashes = current
+    HASHES_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(HASHES_PATH, 'w', encoding='utf-8') as f:
+        json.dump(hashes, f, sort_keys=True)
+    _recorded.clear()
+
+
+def _is_unchanged(path, size, digest, read_new):
+    """True if the file at path already holds contents with this size and hash."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    if stat.st_size != size:
+        return False
+
+    recorded = _load_hashes().get(str(Path(path).resolve()))
+    if recorded and recorded[0] == stat.st_size and recorded[1] == stat.st_mtime_ns:
+        return recorded[2] == digest
+
+    # No usable hash recorded: compare the bytes
+    with open(path, 'rb') as f:
+        return f.read() == read_new()
+
+
+def _record(path, digest):
+    stat = os.stat(path)
+    key = str(Path(path).resolve())
+    entry = [stat.st_size, stat.st_mtime_ns, digest]
+    with _lock:
+        _load_hashes()[key] = entry
+        _recorded[key] = entry
+
+
+def _count(written, size):
+    with _lock:
+        _counts['written' if written else 'skipped'] += 1
+    if written:
+        count('outputs_written')
+        count('output_bytes_written', size)
+    else:
+        count('outputs_unchanged')
+
+
+def _temp_path(path):
+    return path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+
+
+def write_bytes(path, data):
+    """
+    Write data to path unless the file already holds exactly these bytes.
+
+    Returns:
+        bool: True if the file was written, False if it was unchanged
+    """
+    path = Path(path)
+    digest = hashlib.sha256(data).hexdigest()
+    if _is_unchanged(path, len(data), digest, lambda: data):
+        _count(False, len(data))
+        return False
+
+    temp_path = _temp_path(path)
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    _record(path, digest)
+    _count(True, len(data))
+    return True
+
+
+def write_text(path, text, encoding='utf-8'):
+    """Write text to path unless unchanged (see write_bytes)."""
+    return write_bytes(path, text.encode(encoding))
+
+
+def write_html(path, html):
+    """Minify an HTML page and write it unless unchanged (see write_bytes)."""
+    data = minify(html).encode('utf-8')
+    with _lock:
+        _html_sizes[str(Path(path).resolve())] = [len(html.encode('utf-8')), len(data)]
+    return write_bytes(path, data)
+
+
+def html_sizes():
+    """HTML output path -> [bytes before, bytes after minification] for pages written so far."""
+    with _lock:
+        return dict(_html_sizes)
+
+
+def write_json(path, data, **options):
+    """Serialize data with json.dumps(**options) and write it unless unchanged."""
+    return write_text(path, json.dumps(data, **options))
+
+
+@contextmanager
+def open_output(path):
+    """
+    Stream an output file, keeping the existing file if nothing changed.
+
+    Yields a binary file object. Everything is written to a temporary file,
+    which replaces path on success, or is discarded if its contents match
+    the existing file (or an exception is raised).
+    """
+    path = Path(path)
+    temp_path = _temp_path(path)
+    digest = hashlib.sha256()
+    size = 0
+
+    class _HashingFile:
+        def __init__(self, f):
+            self.f = f
+
+        def write(self, data):
+            nonlocal size
+            digest.update(data)
+            size += len(data)
+            return self.f.write(data)
+
+    try:
+        with open(temp_path, 'wb') as f:
+            yield _HashingFile(f)
+    except BaseException:
+        temp_path.unlink()
+        raise
+
+    hexdigest = digest.hexdigest()
+    if _is_unchanged(path, size, hexdigest, temp_path.read_bytes):
+        temp_path.unlink()
+        _count(False, size)
+    else:
+        os.replace(temp_path, path)
+        _record(path, hexdigest)
+        _count(True, size)
+
+
+def begin_stage():
+    """Start counting written and skipped files for a new stage."""
+    with _lock:
+        _counts['written'] = 0
+        _counts['skipped'] = 0
+
+
+def take_worker_state():
+    """Return and reset this process's counts, new hashes and HTML sizes, for the parent."""
+    with _lock:
+        state = {'counts': dict(_counts), 'hashes': dict(_recorded), 'html_sizes': dict(_html_sizes)}
+        _counts['written'] = 0
+        _counts['skipped'] = 0
+        _recorded.clear()
+        _html_sizes.clear()
+    return state
+
+
+def merge_worker_state(state):
+    """Add the state returned by take_worker_state() in a worker process."""
+    with _lock:
+        for kind, count in state['counts'].items():
+            _counts[kind] += count
+        _load_hashes().update(state['hashes'])
+        _recorded.update(state['hashes'])
+        _html_sizes.update(state['html_sizes'])
+
+
+def stage_report():
+    """One-line summary of the files written and skipped in this stage."""
+    return f"Outputs: {_counts['written']} written, {_counts['skipped']} unchanged"
@@ -0,0 +1,155 @@
+"""
+Resumable, parallel OCR of scanned PDFs with ocrmypdf.
+
+Candidates are the PDFs check-pdf-text.py flags: pdftotext finds less than
+MIN_TEXT_LENGTH characters in them. Each one is run through ocrmypdf,
+several files at once, and the OCR'd copy is stored in .build-cache/ocr/
+under the SHA-256 of the original. Outputs are written to a temporary
+file and renamed into place when complete, so every finished file is a
+checkpoint: an interrupted run picks up where it stopped, and a PDF is
+only OCR'd again when its contents change.
+
+When publishing, AssetSync calls published_source() to use the OCR'd copy
+in place of the original.
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import asset_origins
+import pdf_text
+from build_config import CACHE_DIR
+from build_manifest import hash_file
+from build_profile import count
+
+
+OCR_DIR = CACHE_DIR / 'ocr'
+TIMEOUT = 30 * 60  # Seconds allowed per PDF
+
+# Options passed to ocrmypdf for every file. Parallelism comes from running
+# several files at once, so each ocrmypdf uses a single job.
+OCRMYPDF_ARGS = ['--skip-text', '--jobs', '1', '--output-type', 'pdf', '--quiet']
+
+
+def is_available():
+    """Check if ocrmypdf is available."""
+    return shutil.which('ocrmypdf') is not None
+
+
+def output_path(digest):
+    """Path of the OCR'd copy of the PDF with this content hash."""
+    return OCR_DIR / f'{digest}.pdf'
+
+
+def error_path(digest):
+    """Path recording why OCR of the PDF with this content hash failed."""
+    return OCR_DIR / f'{digest}.error'
+
+
+def find_candidates(paths, workers=None, hasher=hash_file):
+    """
+    Find the PDFs that need OCR.
+
+    Pass the source PDFs the sections publish (see
+    section_engine.source_pdfs()), not the files in docs/assets/: those may
+    be optimized copies (see pdf_optimize.py), or from an earlier build, and
+    OCR'd copies are looked up by the original's hash when publishing. OCR'd copies themselves are left
+    out even if OCR found little text (e.g. blank pages), so they are not
+    OCR'd over and over.
+
+    Args:
+        paths: PDF paths to check (text extraction is cached, see pdf_text)
+
+    Returns:
+        list[PdfText]: PDFs with little or no text
+    """
+    ocr_outputs = {hasher(path) for path in OCR_DIR.glob('*.pdf')}
+    results = pdf_text.extract_texts(paths, workers=workers, hasher=hasher)
+    return [result for result in results
+            if result.text is not None and not result.has_text and result.sha256 not in ocr_outputs]
+
+
+def _ocr_one(path, digest, timeout, retry_errors):
+    """Pool task: OCR one PDF unless its output (or failure) is already recorded."""
+    output = output_path(digest)
+    error = error_path(digest)
+    if output.exists():
+        return 'cached'
+    if error.exists() and not retry_errors:
+        return 'failed'
+
+    temp_path = output.with_name(f'.{output.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    count('pdfs_ocrd')
+    try:
+        result = subprocess.run(
+            ['ocrmypdf', *OCRMYPDF_ARGS, str(path), str(temp_path)],
+            capture_output=True,
+            timeout=timeout
+        )
+        message = None
+        if result.returncode != 0:
+            message = (result.stderr.decode('utf-8', errors='replace').strip() or
+                       f"ocrmypdf exited with status {result.returncode}")
+    except subprocess.TimeoutExpired:
+        message = f"timed out after {timeout}s"
+
+    if message is not None:
+        if temp_path.exists():
+            temp_path.unlink()
+        error.write_text(message, encoding='utf-8')
+        return 'failed'
+
+    os.replace(temp_path, output)
+    if error.exists():
+        error.unlink()
+    return 'done'
+
+
+def ocr_pdfs(candidates, workers=None, timeout=TIMEOUT, retry_errors=False, progress=None):
+    """
+    OCR PDFs in parallel, skipping any already done.
+
+    Args:
+        candidates: PdfText results from find_candidates()
+        workers: Number of ocrmypdf processes to run at once (default: CPUs)
+        timeout: Seconds allowed per PDF
+        retry_errors: OCR again PDFs whose last attempt failed
+        progress: Optional callback(done, total, candidate, status), called
+            for each PDF in order; status is 'done', 'cached' or 'failed'
+
+    Returns:
+        dict: Number of PDFs per status
+    """
+    OCR_DIR.mkdir(parents=True, exist_ok=True)
+    # Partial outputs left behind by an interrupted run
+    for temp_path in OCR_DIR.glob('.*.tmp'):
+        temp_path.unlink()
+    counts = {'done': 0, 'cached': 0, 'failed': 0}
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(_ocr_one, candidate.path, candidate.sha256, timeout, retry_errors)
+                   for candidate in candidates]
+        for done, (candidate, future) in enumerate(zip(candidates, futures), 1):
+            status = future.result()
+            counts[status] += 1
+            if progress:
+                progress(done, len(futures), candidate, status)
+    return counts
+
+
+def published_source(source):
+    """
+    Return the file to publish for source: its OCR'd copy if there is one.
+
+    Costs nothing until something has been OCR'd; after that each source is
+    hashed once per size and mtime (see asset_origins.file_hash).
+    """
+    if not OCR_DIR.is_dir() or not any(OCR_DIR.glob('*.pdf')):
+        return source
+
+    digest = asset_origins.file_hash(source)
+    output = output_path(digest)
+    return str(output) if output.exists() else source
@@ -0,0 +1,262 @@
+"""
+Linearized, optionally downsampled copies of the published PDFs.
+
+Every PDF is run through qpdf --linearize ("fast web view"), so browsers
+can show the first page while the rest is still downloading, instead of
+waiting for the whole scan. With a DPI set, Ghostscript first downsamples
+images above it; if that does not make the file smaller, the original is
+only linearized.
+
+Optimized copies are stored in .build-cache/optimized/ under the SHA-256 of
+the PDF they were made from and the DPI (if any), with a small JSON record
+of the sizes before and after. Like OCR (see pdf_ocr.py), finished files
+are checkpoints: a PDF is only optimized again when its contents change,
+and switching back to an earlier DPI reuses the copies made with it.
+
+When publishing, AssetSync calls published_source() to use the optimized
+copy in place of the original (or of its OCR'd copy). Only a build that
+optimizes PDFs does, and only with copies made with its own settings (see
+configure()).
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import asset_origins
+import pdf_ocr
+from build_config import CACHE_DIR
+from build_manifest import hash_file
+from build_profile import count
+
+
+OPTIMIZED_DIR = CACHE_DIR / 'optimized'
+TIMEOUT = 10 * 60  # Seconds allowed per PDF
+
+# Options passed to qpdf for every file. Exit status 3 means it succeeded
+# with warnings (common in scanner output).
+QPDF_ARGS = ['--linearize', '--object-streams=generate', '--compress-streams=y', '--recompress-flate']
+QPDF_WARNINGS = 3
+
+# Bilevel (black and white) scans become hard to read below this, whatever
+# DPI colour and greyscale images are downsampled to
+MIN_MONO_DPI = 300
+
+# Set by build-site.py through configure(): whether optimized copies are
+# published, and with which DPI they were made (None: only linearized)
+_options = {
+    'enabled': False,
+    'dpi': None,
+}
+
+
+def configure(enabled=None, dpi=None):
+    """
+    Set whether AssetSync publishes optimized copies, and which.
+
+    Args:
+        enabled: Publish optimized copies in place of the originals
+        dpi: The DPI the copies to publish were downsampled to (None: only
+            linearized)
+    """
+    if enabled is not None:
+        _options['enabled'] = enabled
+    _options['dpi'] = dpi
+
+
+def setting():
+    """The copies published, as a 'data:' input for section fingerprints."""
+    if not _options['enabled']:
+        return 'data:pdf-optimize:off'
+    return f"data:pdf-optimize:dpi={_options['dpi']}"
+
+
+def is_available():
+    """Check if qpdf is available."""
+    return shutil.which('qpdf') is not None
+
+
+def can_downsample():
+    """Check if Ghostscript is available."""
+    return shutil.which('gs') is not None
+
+
+def _name(digest, dpi):
+    """Cache file name (without suffix) of a PDF optimized with this DPI."""
+    return digest if dpi is None else f'{digest}-{dpi}dpi'
+
+
+def output_path(digest, dpi=None):
+    """Path of the optimized copy of the PDF with this content hash."""
+    return OPTIMIZED_DIR / f'{_name(digest, dpi)}.pdf'
+
+
+def record_path(digest, dpi=None):
+    """Path of the settings and sizes of the optimized copy."""
+    return OPTIMIZED_DIR / f'{_name(digest, dpi)}.json'
+
+
+def error_path(digest, dpi=None):
+    """Path recording why optimizing the PDF with this content hash failed."""
+    return OPTIMIZED_DIR / f'{_name(digest, dpi)}.error'
+
+
+def ghostscript_args(dpi):
+    """Ghostscript pdfwrite options that downsample images above dpi."""
+    mono_dpi = max(dpi, MIN_MONO_DPI)
+    return ['gs', '-sDEVICE=pdfwrite', '-dSAFER', '-dBATCH', '-dNOPAUSE', '-dQUIET',
+            '-dCompatibilityLevel=1.5', '-dDetectDuplicateImages=true',
+            '-dDownsampleColorImages=true', '-dColorImageDownsampleType=/Bicubic',
+            f'-dColorImageResolution={dpi}',
+            '-dDownsampleGrayImages=true', '-dGrayImageDownsampleType=/Bicubic',
+            f'-dGrayImageResolution={dpi}',
+            '-dDownsampleMonoImages=true', '-dMonoImageDownsampleType=/Subsample',
+            f'-dMonoImageResolution={mono_dpi}']
+
+
+def find_candidates(originals, hasher=hash_file):
+    """
+    Find the PDF each source PDF is optimized from.
+
+    That is the original, or its OCR'd copy if it has one: the file
+    published_source() is given when publishing.
+
+    Args:
+        originals: Source PDFs the sections publish, see
+            section_engine.source_pdfs()
+
+    Returns:
+        list: (original, source, sha256) of each PDF
+    """
+    candidates = []
+    for original in originals:
+        if Path(original).suffix.lower() != '.pdf':
+            continue
+        source = pdf_ocr.published_source(original)
+        candidates.append((original, source, hasher(source)))
+    return candidates
+
+
+def read_record(digest, dpi=None):
+    """The settings and sizes recorded for an optimized copy, or None."""
+    try:
+        with open(record_path(digest, dpi), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _run(args, timeout):
+    """Run a tool; return an error message, or None if it succeeded."""
+    try:
+        result = subprocess.run(args, capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return f"{args[0]} timed out after {timeout}s"
+    if result.returncode == 0 or (args[0] == 'qpdf' and result.returncode == QPDF_WARNINGS):
+        return None
+    return (result.stderr.decode('utf-8', errors='replace').strip() or
+            f"{args[0]} exited with status {result.returncode}")
+
+
+def _optimize_one(path, digest, dpi, timeout, retry_errors):
+    """Pool task: optimize one PDF unless done with these settings (or failed)."""
+    output = output_path(digest, dpi)
+    error = error_path(digest, dpi)
+    record = read_record(digest, dpi)
+    if output.exists() and record is not None and record['dpi'] == dpi:
+        return 'cached', record
+    if error.exists() and not retry_errors:
+        return 'failed', None
+
+    temp_name = f'.{digest}.{os.getpid()}.{threading.get_ident()}'
+    downsampled = OPTIMIZED_DIR / f'{temp_name}.gs.tmp'
+    temp_path = OPTIMIZED_DIR / f'{temp_name}.tmp'
+    count('pdfs_optimized')
+
+    source = path
+    if dpi is not None:
+        # A failed or larger downsample still leaves linearizing the original
+        message = _run(ghostscript_args(dpi) + [f'-sOutputFile={downsampled}', str(path)], timeout)
+        if message is None and downsampled.stat().st_size < os.stat(path).st_size:
+            source = downsampled
+    message = _run(['qpdf', *QPDF_ARGS, str(source), str(temp_path)], timeout)
+
+    if downsampled.exists():
+        downsampled.unlink()
+    if message is not None:
+        if temp_path.exists():
+            temp_path.unlink()
+        error.write_text(message, encoding='utf-8')
+        return 'failed', None
+
+    record = {'dpi': dpi, 'downsampled': source != path, 'source': str(path),
+              'source_size': os.stat(path).st_size, 'size': temp_path.stat().st_size}
+    os.replace(temp_path, output)
+    record_path(digest, dpi).write_text(json.dumps(record, sort_keys=True), encoding='utf-8')
+    if error.exists():
+        error.unlink()
+    return 'done', record
+
+
+def optimize_pdfs(candidates, dpi=None, workers=None, timeout=TIMEOUT, retry_errors=False, progress=None):
+    """
+    Optimize PDFs in parallel, skipping any already done with these settings.
+
+    Args:
+        candidates: (original, source, sha256) from find_candidates()
+        dpi: Downsample images above this resolution (needs Ghostscript);
+            None only linearizes
+        workers: Number of PDFs to optimize at once (default: CPUs)
+        timeout: Seconds allowed per tool run
+        retry_errors: Try again PDFs whose last attempt failed
+        progress: Optional callback(done, total, path, status, record), called
+            for each PDF in order; status is 'done', 'cached' or 'failed', and
+            record has the 'source_size' and 'size' (None if failed)
+
+    Returns:
+        dict: Number of PDFs per status, and the bytes before and after
+            ('source_bytes', 'bytes') of the PDFs not failed
+    """
+    OPTIMIZED_DIR.mkdir(parents=True, exist_ok=True)
+    # Partial outputs left behind by an interrupted run
+    for temp_path in OPTIMIZED_DIR.glob('.*.tmp'):
+        temp_path.unlink()
+    counts = {'done': 0, 'cached': 0, 'failed': 0, 'source_bytes': 0, 'bytes': 0}
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(_optimize_one, source, digest, dpi, timeout, retry_errors)
+                   for path, source, digest in candidates]
+        for done, ((path, source, digest), future) in enumerate(zip(candidates, futures), 1):
+            status, record = future.result()
+            counts[status] += 1
+            if record is not None:
+                counts['source_bytes'] += record['source_size']
+                counts['bytes'] += record['size']
+            if progress:
+                progress(done, len(futures), path, status, record)
+    return counts
+
+
+def published_source(source):
+    """
+    Return the file to publish for source: its optimized copy, if this build
+    optimizes PDFs and there is one made with its settings.
+
+    Costs nothing unless enabled; then each source is hashed once per size
+    and mtime (see asset_origins.file_hash).
+    """
+    if not _options['enabled'] or not OPTIMIZED_DIR.is_dir():
+        return source
+
+    output = output_path(asset_origins.file_hash(source), _options['dpi'])
+    return str(output) if output.exists() else source
+
+
+def format_savings(source_size, size):
+    """'10.2 MB → 3.1 MB (-70%)' for a report."""
+    change = size / source_size - 1 if source_size else 0
+    return f"{source_size / 1e6:.1f} MB → {size / 1e6:.1f} MB ({change:+.0%})"
@@ -0,0 +1,242 @@
+"""
+Cached, parallel PDF text extraction with pdftotext (from poppler-utils).
+
+Extracted text is cached in .build-cache/pdf-text/ under the SHA-256 of
+the PDF's contents, so a PDF is only extracted again when its contents
+change; renaming or re-copying it is free. Failed extractions are cached
+too (as <sha256>.error), so a broken file does not cost a 30 second
+timeout on every build.
+
+pdftotext runs as a separate process per PDF, so a thread pool is enough
+to keep every CPU busy.
+
+The build's 'pdf-text' stage records which text belongs to which published
+PDF in an index, so downstream stages can look it up with text_for() (or
+excerpt_for()): the landing pages show an excerpt of each document, and
+the search index makes the start of its text searchable.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from build_config import CACHE_DIR, DOCS_DIR
+from build_manifest import hash_file
+from build_profile import count
+
+
+TEXT_CACHE_DIR = CACHE_DIR / 'pdf-text'
+
+# Published PDF (relative to docs/) -> content hash and text length
+TEXT_INDEX_PATH = TEXT_CACHE_DIR / 'index.json'
+
+MIN_TEXT_LENGTH = 100  # Minimum characters to consider PDF as having text
+TIMEOUT = 30           # Seconds allowed per PDF
+
+
+@dataclass
+class PdfText:
+    """Result of extracting one PDF's text."""
+    path: str
+    sha256: str
+    text: str = None       # None if extraction failed
+    error: str = None
+    cached: bool = False   # True if read from the cache, not extracted
+
+    @property
+    def has_text(self):
+        """True if the PDF has enough text to be searchable (not a bare scan)."""
+        return self.text is not None and len(self.text.strip()) >= MIN_TEXT_LENGTH
+
+
+def is_available():
+    """Check if pdftotext is available."""
+    return shutil.which('pdftotext') is not None
+
+
+def run_pdftotext(pdf_path, timeout=TIMEOUT):
+    """
+    Extract text from one PDF with pdftotext.
+
+    Returns:
+        tuple: (text, None) on success, or (None, error message)
+    """
+    count('pdfs_extracted')
+    try:
+        result = subprocess.run(
+            ['pdftotext', str(pdf_path), '-'],
+            capture_output=True,
+            timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return None, f"timed out after {timeout}s"
+    except OSError as e:
+        return None, str(e)
+
+    if result.returncode != 0:
+        message = result.stderr.decode('utf-8', errors='replace').strip()
+        return None, message or f"pdftotext exited with status {result.returncode}"
+    return result.stdout.decode('utf-8', errors='replace'), None
+
+
+def _cache_paths(digest):
+    return TEXT_CACHE_DIR / f'{digest}.txt', TEXT_CACHE_DIR / f'{digest}.error'
+
+
+def read_cached(digest):
+    """Return (text, error) cached for a content hash, or None if not cached."""
+    text_path, error_path = _cache_paths(digest)
+    if text_path.exists():
+        return text_path.read_text(encoding='utf-8'), None
+    if error_path.exists():
+        return None, error_path.read_text(encoding='utf-8')
+    return None
+
+
+def _write_cached(digest, text, error):
+    """Store an extraction result, written atomically so pool threads never see half a file."""
+    text_path, error_path = _cache_paths(digest)
+    path, content = (text_path, text) if error is None else (error_path, error)
+    temp_path = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    temp_path.write_text(content, encoding='utf-8')
+    os.replace(temp_path, path)
+    if error is None and error_path.exists():
+        error_path.unlink()
+
+
+def _extract_one(path, hasher, timeout, retry_errors):
+    """Pool task: hash one PDF and extract its text unless already cached."""
+    digest = hasher(path)
+    if not digest:
+        return PdfText(str(path), '', error='file not found')
+
+    cached = read_cached(digest)
+    if cached is not None and not (retry_errors and cached[1] is not None):
+        return PdfText(str(path), digest, *cached, cached=True)
+
+    text, error = run_pdftotext(path, timeout)
+    _write_cached(digest, text, error)
+    return PdfText(str(path), digest, text, error)
+
+
+def extract_texts(paths, workers=None, hasher=hash_file, timeout=TIMEOUT,
+                  retry_errors=False, progress=None):
+    """
+    Extract the text of many PDFs, reusing cached results.
+
+    Args:
+        paths: PDF paths
+        workers: Number of pdftotext processes to run at once (default: CPUs)
+        hasher: Function returning a file's SHA-256 (e.g. BuildManifest.file_hash,
+            which skips re-reading unchanged files)
+        timeout: Seconds allowed per PDF
+        retry_errors: Extract again PDFs whose last extraction failed
+        progress: Optional callback(done, total, result), called for each PDF in order
+
+    Returns:
+        list[PdfText]: One result per path, in the order given
+    """
+    paths = [Path(path) for path in paths]
+    TEXT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(_extract_one, path, hasher, timeout, retry_errors)
+                   for path in paths]
+        results = []
+        for done, future in enumerate(futures, 1):
+            results.append(future.result())
+            if progress:
+                progress(done, len(futures), results[-1])
+    return results
+
+
+def extract_documents(documents, workers=None, hasher=hash_file, docs_dir=DOCS_DIR):
+    """
+    Extract the text of every published PDF in the registry and save the index.
+
+    Args:
+        documents: Registry entries (Document objects or dicts) with a file_path
+            relative to docs/
+        workers: Number of pdftotext processes to run at once
+        hasher: Function returning a file's SHA-256
+
+    Returns:
+        list[PdfText]: One result per distinct PDF
+    """
+    # Distinct PDFs, in registry order
+    file_paths = {}
+    for doc in documents:
+        file_path = doc['file_path'] if isinstance(doc, dict) else doc.file_path
+        if file_path and file_path.lower().endswith('.pdf'):
+            file_paths.setdefault(file_path, None)
+    file_paths = list(file_paths)
+
+    results = extract_texts([Path(docs_dir) / file_path for file_path in file_paths],
+                            workers=workers, hasher=hasher)
+
+    index = {}
+    for file_path, result in zip(file_paths, results):
+        index[file_path] = {
+            'sha256': result.sha256,
+            'chars': len(result.text.strip()) if result.text is not None else None,
+        }
+        if result.error:
+            index[file_path]['error'] = result.error
+
+    TEXT_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(TEXT_INDEX_PATH, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, sort_keys=True, ensure_ascii=False)
+    _index_cache.clear()
+
+    return results
+
+
+# TEXT_INDEX_PATH, loaded once per process by text_for()
+_index_cache = {}
+
+
+def text_for(file_path):
+    """
+    Return the extracted text of a published PDF, or None.
+
+    Args:
+        file_path: PDF path relative to docs/, as in the registry's file_path
+
+    Returns:
+        str or None: The text, or None if the PDF was not extracted (or failed)
+    """
+    if 'index' not in _index_cache:
+        index = {}
+        if TEXT_INDEX_PATH.exists():
+            with open(TEXT_INDEX_PATH, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        _index_cache['index'] = index
+
+    entry = _index_cache['index'].get(file_path)
+    if not entry or not entry['sha256']:
+        return None
+    cached = read_cached(entry['sha256'])
+    return cached[0] if cached else None
+
+
+def excerpt_for(file_path, max_length):
+    """
+    The start of a published PDF's text, with whitespace collapsed and cut
+    at a word boundary, or '' if it has too little text (e.g. a bare scan).
+
+    Args:
+        file_path: PDF path relative to docs/, or None for documents without one
+        max_length: Most characters to return (before '...')
+    """
+    text = text_for(file_path) if file_path else None
+    if text is None or len(text.strip()) < MIN_TEXT_LENGTH:
+        return ''
+    text = ' '.join(text.split())
+    if len(text) <= max_length:
+        return text
+    return text[:max_length].rsplit(' ', 1)[0] + '...'
@@ -0,0 +1,238 @@
+"""
+Declarative configuration of the CSV-backed section pages.
+
+section_engine.py builds every page in SECTION_PAGES the same way: read the
+CSV, turn each row into a Document, publish its PDF if it has one, and
+render the rows into the section's content template. Each entry has:
+
+- data_file, content_file, output: the CSV, its *-content.html template
+  (with a {rows} placeholder) and the page to write
+- meta_title, meta_description, canonical_url, page_title: as in
+  generate-static-pages.py
+- skip_lines: lines before the CSV header (page title, blurb, blank line)
+- columns: Document field -> CSV column
+- values: Document field -> value shared by every row
+- strip_title: strip whitespace around titles (changing this changes the
+  slugs of titles that have any, see slug_registry.py)
+- format_date: date_utils function for the displayed date
+- sort_by_date: order rows by date instead of keeping the CSV order
+- row: template for one table row. Placeholders are Document fields, plus
+  {title_upper}
+
+Sections that publish PDFs from their asset origin (see ASSET_ORIGINS in
+build_config.py) also have:
+
+- assets: folder under docs/assets/ to publish them to
+- pdf_name: the published file name for a title, also used to find the
+  source PDF (case-insensitively) unless source_name is given
+- source_name: the source PDF's name for a title, if named differently
+- match_file: CSV of title -> source PDF name or URL, for titles whose PDF
+  is named differently (or is only online)
+
+A row publishes a PDF if it has no URL column or its URL is 'PDF'.
+
+To add a section: add an entry here, its content template, and the section
+to document_schema.SECTIONS (and to ASSET_ORIGINS if it has PDFs).
+"""
+
+from date_utils import format_date_iso, format_date_month_year
+
+
+# Date, category pill, title link, description
+CATEGORY_ROW = """
+            <tr class="border-t border-t-[#d3dbe4]">
+              <td class="align-top px-4 py-2 w-[150px] text-[#58728d] text-sm font-normal leading-normal">
+                {date}
+              </td>
+              <td class="align-top px-4 py-2 w-60 text-sm font-normal leading-normal">
+                <button class="flex min-w-[84px] max-w-[480px] cursor-pointer items-center justify-center overflow-hidden rounded-full h-8 px-4 bg-[#e9edf1] text-[#101419] text-sm font-medium leading-normal w-full">
+                  <span class="truncate">{category}</span>
+                </button>
+              </td>
+              <td class="align-top px-4 py-2 w-[200px] text-[#101419] text-sm font-normal leading-normal">
+                <a href="./{document_url}" class="underline hover:text-blue-600">{title_upper}</a>
+              </td>
+              <td class="align-top px-4 py-2 w-[400px] text-[#58728d] text-sm font-normal leading-normal">
+                {description}
+              </td>
+            </tr>
+            """
+
+BLACKMAN_ROW = """
+            <tr class="border-t border-t-[#d3dbe4]">
+              <td class="align-top px-4 py-2 w-[150px] text-[#58728d] text-sm font-normal leading-normal">
+                {date}
+              </td>
+              <td class="align-top px-4 py-2 w-[400px] text-[#101419] text-sm font-normal leading-normal">
+                <a href="./{document_url}" class="underline hover:text-blue-600">{title_upper}</a>
+              </td>
+              <td class="align-top px-4 py-2 w-[400px] text-[#58728d] text-sm font-normal leading-normal">
+                {description}
+              </td>
+            </tr>
+            """
+
+OTOOLE_ROW = """
+            <tr class="border-t border-t-[#d3dbe4]">
+              <td class="align-top px-4 py-2 w-[150px] text-[#58728d] text-sm font-normal leading-normal">
+                {date}
+              </td>
+              <td class="align-top px-4 py-2 w-[200px] text-[#101419] text-sm font-normal leading-normal">
+                <a href="./{document_url}" class="underline hover:text-blue-600">{title_upper}</a>
+              </td>
+              <td class="align-top px-4 py-2 w-[600px] text-[#58728d] text-sm font-normal leading-normal">
+                {description}
+              </td>
+            </tr>
+            """
+
+TIMELINE_ROW = """
+            <tr class="border-t border-t-[#d3dbe4]">
+              <td class="align-top px-4 py-2 w-[150px] text-[#58728d] text-sm font-normal leading-normal">
+                {date}
+              </td>
+              <td class="align-top px-4 py-2 w-[600px] text-[#58728d] text-sm font-normal leading-normal">
+                {description}
+              </td>
+              <td class="align-top px-4 py-2 w-[200px] text-[#101419] text-sm font-normal leading-normal">
+                <a href="./{document_url}" class="underline hover:text-blue-600">{title_upper}</a>
+              </td>
+            </tr>
+            """
+
+PUBLICATION_ROW = """
+            <tr class="border-t border-t-[#d3dbe4]">
+              <td class="align-top px-4 py-2 w-[150px] text-[#58728d] text-sm font-normal leading-normal">
+                {date}
+              </td>
+              <td class="align-top px-4 py-2 w-[400px] text-[#101419] text-sm font-normal leading-normal">
+                <a href="./{document_url}" class="underline hover:text-blue-600">{title}</a>
+              </td>
+              <td class="align-top px-4 py-2 w-[400px] text-[#58728d] text-sm font-normal leading-normal">
+                {source}
+              </td>
+            </tr>
+            """
+
+
+def lowercase_pdf_name(title):
+    """"Title: Subtitle" -> "title- subtitle.pdf" (the CQC and SAVP folders)."""
+    return title.lower().replace(':', '-') + '.pdf'
+
+
+def cqc_source_name(title):
+    """CQC report PDFs are also named without double quotes."""
+    return lowercase_pdf_name(title).replace('"', '')
+
+
+def title_pdf_name(title):
+    """Court monitor reports are named after the document, as is."""
+    return title + '.pdf'
+
+
+# Section pages, in build (and registry) order
+SECTION_PAGES = {
+    # CSV exports of https://docs.google.com/spreadsheets/d/1pcJOwIyaASjyX2Zh4pot0DhCWqQpv4GUZTulBY4hcyk
+    # (:FixDoc run over both to fix smart quotes)
+    'cqc-reports': {
+        'data_file': '../data/cqc-reports.csv',
+        'content_file': 'cqc-reports-content.html',
+        'output': '../docs/cqc-reports.html',
+        'meta_title': 'Commission on Quality of Care - Reports',
+        'meta_description': 'Reports, investigations, and publications from Clarence J. Sundram\'s tenure as founding Chairman of the New York State Commission on Quality of Care for the Mentally Disabled.',
+        'canonical_url': 'cqc-reports.html',
+        'page_title': 'Commission on Quality of Care - Reports',
+        'columns': {'date': 'Date', 'category': 'Category', 'title': 'Title', 'description': 'Description'},
+        'strip_title': True,
+        'format_date': format_date_month_year,
+        'sort_by_date': True,
+        'assets': 'cqc',
+        'pdf_name': lowercase_pdf_name,
+        'source_name': cqc_source_name,
+        'match_file': '../data/cqc-reports-matching.csv',
+        'row': CATEGORY_ROW,
+    },
+    'savp': {
+        'data_file': '../data/savp.csv',
+        'content_file': 'savp-content.html',
+        'output': '../docs/special-advisor.html',
+        'meta_title': 'Special Advisor to the Governor',
+        'meta_description': 'Publications and presentations from Clarence J. Sundram\'s work as Special Advisor to the Governor on the Mentally Disabled.',
+        'canonical_url': 'special-advisor.html',
+        'page_title': 'Special Advisor to the Governor',
+        'skip_lines': 2,  # page title, blurb
+        'columns': {'date': 'Date', 'category': 'Type', 'title': 'Title', 'description': 'Description',
+                    'url': 'URL'},
+        'assets': 'savp',
+        'pdf_name': lowercase_pdf_name,
+        'row': CATEGORY_ROW,
+    },
+    'blackman': {
+        'data_file': '../data/blackman.csv',
+        'content_file': 'blackman-content.html',
+        'output': '../docs/blackman.html',
+        'meta_title': 'Blackman v. District of Columbia - Court Monitor Reports',
+        'meta_description': 'Court Monitor reports for Blackman v. District of Columbia by Clarence J. Sundram.',
+        'canonical_url': 'blackman.html',
+        'page_title': 'Blackman v. District of Columbia',
+        'skip_lines': 3,  # page title, blurb, blank
+        'columns': {'date': 'Date', 'title': 'Document', 'description': 'Description'},
+        'values': {'category': 'Court Monitor Report'},
+        'strip_title': True,
+        'assets': 'blackman',
+        'pdf_name': title_pdf_name,
+        'row': BLACKMAN_ROW,
+    },
+    'otoole': {
+        'data_file': '../data/otoole.csv',
+        'content_file': 'otoole-content.html',
+        'output': '../docs/otoole.html',
+        'meta_title': "O'Toole v. Cuomo - Court Monitor Reports",
+        'meta_description': "Court Monitor reports for O'Toole v. Cuomo by Clarence J. Sundram.",
+        'canonical_url': 'otoole.html',
+        'page_title': "O'Toole v. Cuomo",
+        'skip_lines': 3,  # page title, blurb, blank
+        'columns': {'date': 'Date', 'title': 'Document', 'description': 'Description'},
+        'values': {'category': 'Court Monitor Report'},
+        'assets': 'otoole',
+        'pdf_name': title_pdf_name,
+        'row': OTOOLE_ROW,
+    },
+    'otoole-timeline': {
+        'data_file': '../data/otoole-timeline.csv',
+        'content_file': 'otoole-timeline-content.html',
+        'output': '../docs/otoole-timeline.html',
+        'meta_title': "O'Toole v. Cuomo - Timeline",
+        'meta_description': "Timeline of events and actions in O'Toole v. Cuomo with related news coverage.",
+        'canonical_url': 'otoole-timeline.html',
+        'page_title': "O'Toole v. Cuomo - Timeline",
+        'columns': {'date': 'DATE', 'description': 'ACTION', 'title': 'News Coverage', 'url': 'URL'},
+        'values': {'category': 'Timeline Event'},
+        'row': TIMELINE_ROW,
+    },
+    'cqc-media': {
+        'data_file': '../data/CQC-Coverage.csv',
+        'content_file': 'cqc-media-content.html',
+        'output': '../docs/cqc-media.html',
+        'meta_title': 'Commission on Quality of Care - Media Coverage',
+        'meta_description': 'Media coverage and news articles about the work of the Commission on Quality of Care under Clarence J. Sundram.',
+        'canonical_url': 'cqc-media.html',
+        'page_title': 'Commission on Quality of Care - Media Coverage',
+        'columns': {'date': 'Date', 'category': 'Media', 'source': 'Media', 'title': 'Title',
+                    'description': 'Description', 'url': 'URL'},
+        'row': CATEGORY_ROW,
+    },
+    'cqc-publications': {
+        'data_file': '../data/CQC-Publications.csv',
+        'content_file': 'cqc-publications-content.html',
+        'output': '../docs/cqc-publications.html',
+        'meta_title': 'Commission on Quality of Care - Publications',
+        'meta_description': 'Published articles and papers by Clarence J. Sundram about the Commission on Quality of Care.',
+        'canonical_url': 'cqc-publications.html',
+        'page_title': 'Commission on Quality of Care - Publications',
+        'columns': {'date': 'Date', 'title': 'Title', 'source': 'Publication', 'url': 'URL'},
+        'values': {'category': 'Publication'},
+        'sort_by_date': True,
+        'row': PUBLICATION_ROW,
+    },
+}
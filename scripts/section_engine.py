@@ -0,0 +1,413 @@
+"""
+Builds the CSV-backed section pages described in section_config.py.
+
+For each section, build_section():
+1. Reads the CSV (skipping any lines before the header), sorting the rows
+   by date if configured
+2. Turns each row into a Document using the section's column mapping
+3. For rows with a PDF, finds the source PDF in the section's asset origin
+   (or in its matching CSV) and publishes it to docs/assets/<folder>/
+   (see asset_sync.py). Titles without a PDF are skipped, and the closest
+   file names are suggested (see title_matcher.py)
+4. Looks up each document's permanent slug (see slug_registry.py)
+5. Renders the first page of rows with the section's row template into
+   its content template and base-template.html, and writes all rows to a
+   compact JSON file (docs/sections/<section>.json). The controls in
+   section-table.html load it to page, sort and filter the table in the
+   browser, so page weight and DOM size no longer grow with the archive
+
+Templates, the source folder listings, parsed dates and the slug registry
+are loaded once per build and shared by every section. build_sections()
+runs several sections at once in threads: most of their time goes to
+reading CSVs and source PDFs and writing pages, so they overlap well, and
+there is no extra process to start or modules to import for each one.
+"""
+
+import csv
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
+
+import asset_origins
+import build_profile
+import slug_registry
+from asset_sync import AssetSync
+from build_config import CACHE_DIR, DOCS_DIR, SCRIPTS_DIR
+from date_utils import date_sort_key, format_date_iso, iso_date
+from document_schema import Document
+from output_writer import write_html, write_json, write_text
+from section_config import SECTION_PAGES
+from template_engine import Template, load_template, page_template
+from title_matcher import TitleIndex, suggestions_csv
+
+
+# Rows per page of a section table, unless the section sets page_size
+PAGE_SIZE = 50
+
+# Section tables' JSON files (see table_data)
+TABLES_DIR = DOCS_DIR / 'sections'
+TABLE_VERSION = 1
+
+# Filter, sort and paging controls above each section table
+TABLE_TEMPLATE = SCRIPTS_DIR / 'section-table.html'
+TABLE_SLOTS = {'data_url', 'page_size', 'filters', 'status', 'pager_class'}
+
+# Row template placeholders the browser derives instead of loading
+DERIVED_SLOTS = {'title_upper', 'document_url'}
+# Columns with few distinct values, stored once and referenced by index
+DICTIONARY_COLUMNS = {'category', 'source'}
+FILTER_LABELS = {'category': 'All categories', 'source': 'All sources'}
+SELECT_CLASS = 'h-8 rounded-lg border border-[#d3dbe4] bg-white px-2 text-sm text-[#101419]'
+
+# Section -> compiled row template
+_row_templates = {}
+
+
+def section_inputs(section):
+    """Files a section's page is built from (besides the scripts)."""
+    config = SECTION_PAGES[section]
+    inputs = [config['data_file']]
+    if 'match_file' in config:
+        inputs.append(config['match_file'])
+    inputs.append(config['content_file'])
+    return inputs
+
+
+def suggestions_path(section):
+    """CSV of ranked PDF suggestions for a section's unmatched titles."""
+    return CACHE_DIR / f'{section}-suggestions.csv'
+
+
+def read_rows(config):
+    """CSV rows of a section, after its preamble lines, in page order."""
+    with open(config['data_file'], newline='', encoding='utf-8') as csvfile:
+        for _ in range(config.get('skip_lines', 0)):
+            next(csvfile)
+        rows = list(csv.DictReader(csvfile))
+    if config.get('sort_by_date'):
+        rows.sort(key=lambda row: date_sort_key(row[config['columns']['date']]))
+    return rows
+
+
+def row_fields(config, row):
+    """A CSV row's Document fields, before its date is formatted and PDF found."""
+    fields = dict(config.get('values', {}))
+    fields.update((field, row[column]) for field, column in config['columns'].items())
+    if config.get('strip_title'):
+        fields['title'] = fields['title'].strip()
+    fields.setdefault('url', 'PDF')
+    return fields
+
+
+class PdfFinder:
+    """Finds the source PDFs (or links) for one section's titles."""
+
+    def __init__(self, section, config):
+        self.config = config
+        self.pdf_name = config['pdf_name']
+        self.source_name = config.get('source_name', self.pdf_name)
+        self.files = asset_origins.paths(section)
+        self.lowercase = {name.lower(): path for name, path in self.files.items()}
+
+        # Title -> source path or URL, from the matching CSV
+        self.matches = {}
+        # Titles in the matching CSV (found or not), so they aren't suggested
+        self.recorded = set()
+        if 'match_file' in config:
+            with open(config['match_file'], newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    # either we have a url, a filename, or a notation
+                    title, filename = row['title'], row['filename']
+                    self.recorded.add(title)
+                    if filename.startswith('http'):
+                        self.matches[title] = filename
+                    else:
+                        path = self.find_file(self.pdf_name(filename))
+                        if path is not None:
+                            self.matches[title] = path
+
+    def find_file(self, filename):
+        """Path of a source PDF, matching the name case-insensitively."""
+        return self.files.get(filename) or self.lowercase.get(filename.lower())
+
+    def find(self, title):
+        """Source path or URL for a title, or None."""
+        if title in self.matches:
+            return self.matches[title]
+        return self.find_file(self.source_name(title))
+
+    def suggest(self, section, titles, found, log):
+        """Log and save the closest unused PDFs for titles without one."""
+        used = {os.path.basename(path) for path in found}
+        index = TitleIndex(self.files)
+        suggestions = {title: index.suggest(title, exclude=used) for title in titles}
+
+        where = " or entry in the matching CSV" if 'match_file' in self.config else ""
+        log(f"⚠ {len(titles)} title(s) with no PDF{where}:")
+        for title, matches in suggestions.items():
+            best = f" (closest: {matches[0][0]}, {matches[0][1]:.2f})" if matches else ""
+            log(f"  {title}{best}")
+
+        path = suggestions_path(section)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_text(path, suggestions_csv(suggestions))
+        log(f"  Suggestions saved to {path}")
+
+
+def row_template(section):
+    """The section's row template, compiled once."""
+    template = _row_templates.get(section)
+    if template is None:
+        template = Template(SECTION_PAGES[section]['row'], f'{section} row')
+        _row_templates[section] = template
+    return template
+
+
+def table_path(section):
+    """JSON file with all of a section's table rows."""
+    return TABLES_DIR / f'{section}.json'
+
+
+def table_data(section, documents, iso_dates, filters):
+    """
+    Compact JSON-serializable table of a section's rows, for section-table.html.
+
+    Rows are arrays of the columns the row template and filters need, plus
+    the slug (the landing page URL is derived from it) and an ISO date to
+    sort and filter by. Category and source values are stored once in a
+    dictionary and referenced by index.
+    """
+    slots = row_template(section).slots - DERIVED_SLOTS
+    columns = sorted(slots | set(filters) | {'title', 'slug'})
+    dictionaries = {column: sorted({getattr(doc, column) for doc in documents})
+                    for column in columns if column in DICTIONARY_COLUMNS}
+    indexes = {column: {value: index for index, value in enumerate(values)}
+               for column, values in dictionaries.items()}
+
+    rows = []
+    for doc, sort_date in zip(documents, iso_dates):
+        row = [indexes[column][getattr(doc, column)] if column in indexes else getattr(doc, column)
+               for column in columns]
+        row.append(sort_date)
+        rows.append(row)
+
+    return {
+        'version': TABLE_VERSION,
+        'section': section,
+        'columns': columns + ['iso_date'],
+        'dictionaries': dictionaries,
+        'row': ' '.join(SECTION_PAGES[section]['row'].split()),
+        'rows': rows,
+    }
+
+
+def filter_fields(documents):
+    """Document fields worth filtering by: those with more than one value."""
+    fields = []
+    for field in ('category', 'source'):
+        values = {getattr(doc, field) for doc in documents}
+        if len(values) > 1 and not (field == 'source' and all(doc.source == doc.category for doc in documents)):
+            fields.append(field)
+    return fields
+
+
+def _select(field, label, options):
+    """A filter <select> with an "any" option first."""
+    html = [f'<select id="table-{field}" data-field="{field}" aria-label="{label}" class="{SELECT_CLASS}">',
+            f'<option value="">{label}</option>']
+    html.extend(f'<option value="{escape(value)}">{escape(value)}</option>' for value in options if value)
+    html.append('</select>')
+    return ''.join(html)
+
+
+def table_controls(section, data, filters, page_size):
+    """Filter, sort and paging controls for a section page (section-table.html)."""
+    total = len(data['rows'])
+    selects = [_select(field, FILTER_LABELS[field], data['dictionaries'][field]) for field in filters]
+
+    # Year range, from the ISO dates in each row's last column
+    years = sorted({row[-1][:4] for row in data['rows'] if row[-1]})
+    if len(years) > 1:
+        selects.append(_select('from', 'From', years))
+        selects.append(_select('to', 'To', reversed(years)))
+
+    status = f"Showing 1-{min(total, page_size)} of {total}" if total else "No entries"
+    return load_template(TABLE_TEMPLATE).require(TABLE_SLOTS).render(
+        data_url=f'sections/{section}.json',
+        page_size=str(page_size),
+        filters='\n            '.join(selects),
+        status=status,
+        pager_class='flex' if total > page_size else 'hidden',
+    )
+
+
+def build_section(section, log=print):
+    """
+    Generate a section's page and return its Document objects.
+
+    Args:
+        section: Key of SECTION_PAGES
+        log: Function to report progress with (print, or a list's append)
+
+    Returns:
+        list[Document]: The section's documents, in page order
+    """
+    config = SECTION_PAGES[section]
+    format_date = config.get('format_date', format_date_iso)
+
+    # Each row's Document fields (before PDFs are resolved) and ISO date
+    entries = []
+    for row in read_rows(config):
+        fields = row_fields(config, row)
+        sort_date = iso_date(fields['date'])
+        fields['date'] = format_date(fields['date'])
+        entries.append((fields, sort_date))
+
+    assets = None
+    if 'assets' in config:
+        finder = PdfFinder(section, config)
+        assets_destination = f"../docs/assets/{config['assets']}/"
+        os.makedirs(assets_destination, exist_ok=True)
+        assets = AssetSync(config['assets'], assets_destination)
+
+        unmatched = []
+        for fields, _ in entries:
+            if fields['url'] == 'PDF':
+                fields['url'] = finder.find(fields['title'])
+                if fields['url'] is None and fields['title'] not in finder.recorded:
+                    unmatched.append(fields['title'])
+        if unmatched:
+            found = [fields['url'] for fields, _ in entries if fields['url'] is not None]
+            finder.suggest(section, list(dict.fromkeys(unmatched)), found, log)
+
+        # Matches that are source PDFs (the others are links)
+        source_paths = set(finder.files.values())
+
+    documents = []
+    iso_dates = []
+    slugs = slug_registry.for_section(section)
+
+    for fields, sort_date in entries:
+        if fields['url'] is None:
+            log(f"no file or link for {fields['title']}, skipping")
+            continue
+
+        if assets is not None and fields['url'] in source_paths:
+            filename = config['pdf_name'](fields['title'])
+            assets.sync(fields['url'], filename)
+            fields['file_path'] = f"assets/{config['assets']}/{filename}"
+            fields['url'] = f"/{fields['file_path']}"
+
+        doc = Document(section=section, **fields)
+
+        # Look up (or assign) the document's permanent slug
+        slugs.assign(doc)
+
+        documents.append(doc)
+        iso_dates.append(sort_date)
+
+    if assets is not None:
+        assets.finish(log=log)
+
+    # The first page of rows goes in the HTML, all of them in the JSON
+    template = row_template(section)
+    page_size = config.get('page_size', PAGE_SIZE)
+    html_rows = [template.render(title_upper=doc.title.upper(), **vars(doc))
+                 for doc in documents[:page_size]]
+    filters = filter_fields(documents)
+    data = table_data(section, documents, iso_dates, filters)
+    TABLES_DIR.mkdir(parents=True, exist_ok=True)
+    write_json(table_path(section), data, ensure_ascii=False, separators=(',', ':'))
+
+    # Populate base template, with the content template in {content}
+    page = page_template(config['content_file'], slots={'rows', 'table_controls'})
+    html = page.render(
+        meta_title=config['meta_title'],
+        meta_description=config['meta_description'],
+        canonical_url=config['canonical_url'],
+        breadcrumb='',
+        page_title=config['page_title'],
+        rows="\n".join(html_rows),
+        table_controls=table_controls(section, data, filters, page_size),
+        path_prefix='./',
+    )
+
+    # Save result
+    if write_html(config['output'], html):
+        log(f"✅ HTML written to {config['output']}")
+    else:
+        log(f"⏭ {config['output']} unchanged")
+
+    return documents
+
+
+def _build_logged(section):
+    messages = []
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    documents = build_section(section, log=messages.append)
+    seconds = time.perf_counter() - started
+    # One profile row per section, within the build's 'sections' stage
+    build_profile.record(f"section:{section}", started, seconds, cpu=time.thread_time() - cpu_started,
+                         tid=threading.get_ident())
+    return documents, messages, seconds
+
+
+def source_pdfs(sections=SECTION_PAGES):
+    """
+    The source PDFs the sections' rows publish, found as build_section()
+    finds them, without building anything.
+
+    Lets OCR and PDF optimization (see pdf_ocr.py, pdf_optimize.py) run on
+    this build's PDFs before the sections publish them.
+
+    Returns:
+        list: Sorted paths of the source PDFs
+    """
+    pdfs = set()
+    for section in sections:
+        config = SECTION_PAGES[section]
+        if 'assets' not in config:
+            continue
+        finder = PdfFinder(section, config)
+        source_paths = set(finder.files.values())
+        for row in read_rows(config):
+            fields = row_fields(config, row)
+            if fields['url'] == 'PDF':
+                path = finder.find(fields['title'])
+                if path in source_paths and path.lower().endswith('.pdf'):
+                    pdfs.add(path)
+    return sorted(pdfs)
+
+
+def build_sections(sections, threads=None):
+    """
+    Build several sections at once.
+
+    Args:
+        sections: Keys of SECTION_PAGES
+        threads: Most sections to build at a time (default: all of them)
+
+    Yields:
+        (section, documents, messages, seconds) in the order given, as each
+        finishes. Messages are collected rather than printed, so the output
+        of sections running together doesn't interleave.
+    """
+    sections = list(sections)
+    if not sections:
+        return
+    with ThreadPoolExecutor(max_workers=threads or len(sections)) as executor:
+        futures = [executor.submit(_build_logged, section) for section in sections]
+        for section, future in zip(sections, futures):
+            yield (section, *future.result())
+
+
+def main(sections):
+    """Build the given sections and save any new slugs (for the wrapper scripts)."""
+    for section, documents, messages, seconds in build_sections(sections):
+        for message in messages:
+            print(message)
+        print(f"{section}: {len(documents)} documents in {seconds:.2f}s")
+    slug_registry.save()
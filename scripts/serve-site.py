@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Local development server for the CJS Archive site, with live reload.
+
+Serves docs/ over HTTP, watches the build's inputs, and when one changes
+regenerates only what depends on it:
+- a section's CSV or content template: that section's page, the landing
+  pages of its documents that changed, the registry and the section's
+  search index shard
+- a static page's content template, or generate-static-pages.py: the
+  static pages
+- anything else (base-template.html, section_config.py, shared helper
+  modules, the other generators): an incremental build-site.py run in a
+  fresh process
+
+Open pages reload themselves when a rebuild finishes (server-sent events).
+The sitemap is left alone between full builds.
+
+Usage:
+    python3 serve-site.py                  # http://localhost:8000
+    python3 serve-site.py --port 8080 --no-build
+"""
+
+import argparse
+import importlib
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from dataclasses import asdict
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import asset_origins
+import document_registry
+import minisearch_index
+import output_writer
+import section_config
+import section_engine
+import slug_registry
+from build_config import DATA_DIR, DOCS_DIR, SCRIPTS_DIR
+from template_engine import page_template
+
+
+RELOAD_PATH = '/__reload'
+RELOAD_SCRIPT = (f"<script>new EventSource('{RELOAD_PATH}')"
+                 f".onmessage = () => location.reload();</script>")
+
+# Seconds between checks of the watched files
+POLL_INTERVAL = 0.2
+
+
+def import_module(name, filepath):
+    """Import a module from a file path, re-reading it every time."""
+    spec = importlib.util.spec_from_file_location(name, filepath)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Reloads:
+    """Counts finished rebuilds and wakes up the browsers waiting for one."""
+
+    def __init__(self):
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout):
+        """Wait for a rebuild after generation; return the current generation."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout=timeout)
+            return self.generation
+
+
+reloads = Reloads()
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """Serves docs/, with the live-reload script added to every HTML page."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=str(DOCS_DIR), **kwargs)
+
+    def do_GET(self):
+        if self.path == RELOAD_PATH:
+            self.stream_reloads()
+            return
+
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            path = path / 'index.html'
+        status = 200
+        if not path.exists() and path.suffix in ('', '.html'):
+            path, status = DOCS_DIR / '404.html', 404
+        if path.suffix != '.html' or not path.exists():
+            super().do_GET()
+            return
+
+        html = path.read_text(encoding='utf-8')
+        if '</body>' in html:
+            html = html.replace('</body>', f'{RELOAD_SCRIPT}</body>', 1)
+        else:
+            html += RELOAD_SCRIPT
+        body = html.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_reloads(self):
+        """Send an event whenever a rebuild finishes, until the page goes away."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        generation = reloads.generation
+        try:
+            while True:
+                current = reloads.wait(generation, timeout=15)
+                # A comment line keeps idle connections open
+                self.wfile.write(b'data: reload\n\n' if current != generation else b': ping\n\n')
+                self.wfile.flush()
+                generation = current
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DevBuild:
+    """Maps changed input files to the stages that use them and reruns those."""
+
+    def __init__(self):
+        # Input file -> section
+        self.sections = {}
+        self.map_sections()
+
+        generate_static = import_module('generate_static_pages', 'generate-static-pages.py')
+        self.static = {self.key(path) for path in
+                       ['generate-static-pages.py'] + [page['content_file'] for page in generate_static.PAGES]}
+
+        # Section -> its registry entries, in build order
+        self.documents = {}
+
+    @staticmethod
+    def key(path):
+        return os.path.abspath(path)
+
+    def map_sections(self):
+        """Map each section's input files to the section."""
+        self.sections = {self.key(path): section for section in section_config.SECTION_PAGES
+                         for path in section_engine.section_inputs(section)}
+
+    def watched(self):
+        """Input file -> mtime for every file the build reads."""
+        paths = set(self.sections) | self.static
+        paths.update(str(path) for path in SCRIPTS_DIR.glob('*.py'))
+        paths.update(str(path) for path in SCRIPTS_DIR.glob('*.html'))
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                mtimes[path] = None
+        return mtimes
+
+    def load_documents(self):
+        """Read each section's documents from the registry."""
+        self.documents = {section: [] for section in section_config.SECTION_PAGES}
+        for doc in document_registry.iter_registry():
+            self.documents.setdefault(doc['section'], []).append(doc)
+
+    def full_build(self):
+        """Run build-site.py --incremental and reload its documents."""
+        subprocess.run([sys.executable, 'build-site.py', '--incremental'], check=True)
+        # Pick up edits to the section config (e.g. a new section)
+        importlib.reload(section_config)
+        importlib.reload(section_engine)
+        self.map_sections()
+        slug_registry.reload()
+        self.load_documents()
+
+    def rebuild(self, changed):
+        """Regenerate what the changed files feed into. Returns a summary."""
+        sections = sorted({self.sections[path] for path in changed if path in self.sections},
+                          key=list(section_config.SECTION_PAGES).index)
+        static = any(path in self.static for path in changed)
+        if any(path not in self.sections and path not in self.static for path in changed):
+            self.full_build()
+            return "full incremental build"
+
+        summary = []
+        output_writer.begin_stage()
+        if static:
+            import_module('generate_static_pages', 'generate-static-pages.py').main()
+            summary.append("static pages")
+
+        if sections:
+            # Rescan the source PDF folders, in case PDFs were added
+            asset_origins.configure()
+            # Sections whose documents changed
+            changed_sections = []
+            for name, section_documents, messages, seconds in section_engine.build_sections(sections):
+                for message in messages:
+                    print(f"  {message}")
+                documents = [asdict(doc) for doc in section_documents]
+                previous = {doc['document_url']: doc for doc in self.documents.get(name, [])}
+                changed_docs = [doc for doc in documents if previous.get(doc['document_url']) != doc]
+                if documents != self.documents.get(name):
+                    changed_sections.append(name)
+                self.documents[name] = documents
+
+                if changed_docs:
+                    generate_pages = import_module('generate_document_pages', 'generate-document-pages.py')
+                    template = page_template(page_title='', path_prefix='../')
+                    generate_pages.write_document_pages(changed_docs, template, DOCS_DIR / 'documents')
+                summary.append(f"{name} ({len(changed_docs)} landing page(s))")
+
+            if changed_sections:
+                all_documents = [doc for docs in self.documents.values() for doc in docs]
+                registry_path = document_registry.registry_path()
+                registry_format = 'jsonl' if registry_path.suffix == '.jsonl' else 'json'
+                output_writer.write_text(registry_path, document_registry.dumps(all_documents, registry_format))
+                import_module('build_search_index', 'build-search-index.py').update_sections(
+                    all_documents, changed_sections)
+                slug_registry.save()
+
+        output_writer.save_hashes()
+        return ', '.join(summary)
+
+    def watch(self, interval=POLL_INTERVAL):
+        """Poll the inputs forever, rebuilding after each batch of changes."""
+        mtimes = self.watched()
+        while True:
+            time.sleep(interval)
+            current = self.watched()
+            changed = {path for path in current.keys() | mtimes.keys()
+                       if current.get(path) != mtimes.get(path)}
+            if not changed:
+                continue
+
+            # Let an editor finish saving (or a batch of files settle)
+            time.sleep(interval)
+            mtimes = self.watched()
+            changed.update(path for path in mtimes if mtimes[path] != current.get(path))
+
+            names = ', '.join(sorted(os.path.relpath(path) for path in changed))
+            print(f"\n🔄 Changed: {names}")
+            started = time.perf_counter()
+            try:
+                summary = self.rebuild(changed)
+            except Exception:
+                traceback.print_exc()
+                print("❌ Rebuild failed; fix the error and save again")
+                continue
+            print(f"✅ Rebuilt {summary} in {time.perf_counter() - started:.2f}s")
+            reloads.notify()
+
+
+def main(port=8000, build=True, interval=POLL_INTERVAL):
+    """
+    Serve docs/ and rebuild on changes until interrupted.
+
+    Args:
+        port: Port to serve on (localhost only)
+        build: Run an incremental build first, so docs/ matches the inputs
+        interval: Seconds between checks of the watched files
+    """
+    dev_build = DevBuild()
+    # Compile the search tokenizer now rather than on the first rebuild
+    minisearch_index.tokenize('')
+    if build:
+        dev_build.full_build()
+    else:
+        dev_build.load_documents()
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), DevRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"\n🌐 Serving {DOCS_DIR} at http://localhost:{port}/ (Ctrl+C to stop)")
+    print(f"👀 Watching {os.path.relpath(DATA_DIR)} and {os.path.relpath(SCRIPTS_DIR)} for changes")
+
+    try:
+        dev_build.watch(interval)
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve docs/ locally and rebuild on changes.')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='port to serve on (default: 8000)')
+    parser.add_argument('--no-build', action='store_true',
+                        help='skip the incremental build at startup')
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL,
+                        help=f'seconds between checks for changes (default: {POLL_INTERVAL})')
+    args = parser.parse_args()
+    main(port=args.port, build=not args.no_build, interval=args.interval)
@@ -0,0 +1,143 @@
+"""
+Persistent slugs for document landing pages.
+
+A document's landing page URL (documents/{section}-{slug}.html) is assigned
+once and then kept in SLUGS_PATH, keyed by section, title and date. Later
+builds look documents up there instead of numbering duplicate slugs in row
+order, so reordering, inserting or deleting CSV rows never moves another
+document's page. Slugs of documents that disappear stay reserved, so their
+URLs are never handed to a different document.
+
+Each section script asks for_section() for its section's slugs and calls
+assign() for every document. New slugs that collide get the next numeric
+suffix from a per-section counter, rebuilt from the saved slugs at load, so
+numbering a run of identical titles does not rescan every suffix used so
+far, in this build or earlier ones.
+
+The first build without SLUGS_PATH takes its slugs from the existing
+document registry, keeping the URLs already published.
+"""
+
+import json
+import threading
+
+import document_registry
+from build_config import DATA_DIR
+from document_schema import generate_slug, get_document_url
+from output_writer import write_text
+
+
+SLUGS_PATH = DATA_DIR / 'slug-registry.json'
+
+# Section -> title -> date -> slugs, one per document with that title and date
+_slugs = None
+_changed = False
+_lock = threading.Lock()
+
+
+def _seed_from_registry():
+    """Slugs of the documents in the current document registry, if any."""
+    slugs = {}
+    try:
+        for doc in document_registry.iter_registry():
+            (slugs.setdefault(doc['section'], {})
+                  .setdefault(doc['title'], {})
+                  .setdefault(doc['date'], [])
+                  .append(doc['slug']))
+    except FileNotFoundError:
+        pass
+    return slugs
+
+
+def _load():
+    global _slugs, _changed
+    if _slugs is None:
+        if SLUGS_PATH.exists():
+            with open(SLUGS_PATH, 'r', encoding='utf-8') as f:
+                _slugs = json.load(f)
+        else:
+            _slugs = _seed_from_registry()
+            _changed = True
+    return _slugs
+
+
+def for_section(section):
+    """Slug assignment for one run of a section script."""
+    with _lock:
+        return SectionSlugs(section, _load().setdefault(section, {}))
+
+
+def reload():
+    """Forget the loaded slugs, so they are read again (after another process saved them)."""
+    global _slugs, _changed
+    with _lock:
+        _slugs = None
+        _changed = False
+
+
+def save():
+    """Persist any new slugs (the build, or a section script run alone, calls this at the end)."""
+    global _changed
+    if not _changed:
+        return
+    SLUGS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    write_text(SLUGS_PATH, json.dumps(_load(), indent=2, sort_keys=True, ensure_ascii=False) + '\n')
+    _changed = False
+
+
+class SectionSlugs:
+    """Looks up or assigns the slugs of one section's documents."""
+
+    def __init__(self, section, titles):
+        self.section = section
+        self.titles = titles
+        self.taken = {slug for dates in titles.values() for slugs in dates.values() for slug in slugs}
+        # Base slug -> next numeric suffix to try, after the highest one used
+        # so far (also by earlier builds), so a new collision takes it directly.
+        # Only suffixes added to a title's own slug count: "annual-report-1998"
+        # is the title "Annual Report 1998", not a collision of "annual-report".
+        self.next_suffix = {}
+        for title, dates in titles.items():
+            base = generate_slug(title)
+            for slugs in dates.values():
+                for slug in slugs:
+                    suffix = slug[len(base) + 1:]
+                    if slug.startswith(f'{base}-') and suffix.isdigit():
+                        self.next_suffix[base] = max(self.next_suffix.get(base, 2), int(suffix) + 1)
+        # (title, date) -> documents seen with it in this run
+        self.seen = {}
+
+    def assign(self, doc):
+        """
+        Set doc.slug and doc.document_url from the registry, assigning a new
+        slug if this document has none yet.
+
+        Documents with the same title and date are told apart by the order
+        they appear in.
+        """
+        global _changed
+        key = (doc.title, doc.date)
+        occurrence = self.seen.get(key, 0)
+        self.seen[key] = occurrence + 1
+
+        with _lock:
+            slugs = self.titles.setdefault(doc.title, {}).setdefault(doc.date, [])
+            if occurrence == len(slugs):
+                slugs.append(self._new_slug(generate_slug(doc.title)))
+                _changed = True
+            doc.slug = slugs[occurrence]
+        doc.document_url = get_document_url(self.section, doc.slug)
+        return doc.slug
+
+    def _new_slug(self, base):
+        """base, or base-N for the N after the highest already used in this section."""
+        slug = base
+        if slug in self.taken:
+            suffix = self.next_suffix.get(base, 2)
+            # Only skips suffixes taken by other titles (e.g. "report-2" itself)
+            while f"{base}-{suffix}" in self.taken:
+                suffix += 1
+            slug = f"{base}-{suffix}"
+            self.next_suffix[base] = suffix + 1
+        self.taken.add(slug)
+        return slug
@@ -0,0 +1,236 @@
+"""
+Synthetic archive data for benchmarking the build at scale.
+
+generate() writes CSVs with the same shapes as the ones in data/ (same
+columns, preamble lines, date formats and PDF-matching rules), at any
+number of documents, plus a small placeholder PDF for every row that links
+to one. Documents are spread over the sections in the proportions of the
+real archive. Titles and descriptions are drawn from the words of the real
+CSVs, so text and search index sizes grow the way they would with more
+real documents.
+
+Output is deterministic for a given document count and seed.
+"""
+
+import csv
+import random
+import re
+from datetime import date, timedelta
+from pathlib import Path
+
+from build_config import ASSET_ORIGINS, DATA_DIR
+from section_config import SECTION_PAGES
+
+
+# Documents per section in the real archive, used as proportions
+SECTION_SHARES = {
+    'cqc-reports': 98,
+    'savp': 20,
+    'blackman': 10,
+    'otoole': 18,
+    'otoole-timeline': 58,
+    'cqc-media': 84,
+    'cqc-publications': 26,
+}
+
+# CSV file names, as configured in section_config.py
+CSV_FILES = {section: Path(config['data_file']).name for section, config in SECTION_PAGES.items()}
+MATCHING_FILE = Path(SECTION_PAGES['cqc-reports']['match_file']).name
+
+# Sections that publish PDFs from an asset origin folder
+PDF_SECTIONS = tuple(ASSET_ORIGINS)
+
+# Real CSVs whose preamble lines (page title, blurb, blank) are reused
+PREAMBLE_LINES = {section: config['skip_lines'] for section, config in SECTION_PAGES.items()
+                  if config.get('skip_lines')}
+
+CQC_CATEGORIES = ['Policy', 'Quality of Care', 'Investigation', 'Fiscal', 'Annual Report']
+SAVP_TYPES = ['News story', 'Report', 'Testimony', 'Op-ed']
+MEDIA_TYPES = ['News story', 'Editorial', 'Interview', 'Letter']
+PUBLICATIONS = ['J. Intellectual and Dev. Disability', 'Mental Disability Law Reporter',
+                'Psychiatric Services', 'Hospital & Community Psychiatry']
+
+
+def section_counts(documents):
+    """Split a document count over the sections in SECTION_SHARES proportions."""
+    total = sum(SECTION_SHARES.values())
+    counts = {section: documents * share // total for section, share in SECTION_SHARES.items()}
+    # Hand the rounding remainder to the largest sections
+    for section in sorted(SECTION_SHARES, key=SECTION_SHARES.get, reverse=True):
+        if sum(counts.values()) == documents:
+            break
+        counts[section] += 1
+    return counts
+
+
+def load_vocabulary(data_dir=DATA_DIR):
+    """All words in the real CSVs, with repeats, so sampling follows their frequencies."""
+    words = []
+    for filename in sorted(set(CSV_FILES.values()) | {'CQC-Reports.csv'}):
+        path = data_dir / filename
+        if path.exists():
+            words.extend(re.findall(r"[A-Za-z]{2,}", path.read_text(encoding='utf-8')))
+    return words or ['archive', 'report', 'review', 'commission', 'care', 'quality']
+
+
+def placeholder_pdf(lines):
+    """A minimal valid one-page PDF showing the given lines of text."""
+    def escape(text):
+        return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    content = ['BT', '/F1 11 Tf', '14 TL', '72 720 Td']
+    content.extend(f'({escape(line)}) Tj T*' for line in lines)
+    content.append('ET')
+    stream = '\n'.join(content).encode('latin-1', errors='replace')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R '
+        b'/Resources << /Font << /F1 5 0 R >> >> >>',
+        b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    pdf = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b'%010d 00000 n \n' % offset
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+class _Writer:
+    """Random titles, descriptions, dates and PDFs for one generate() call."""
+
+    def __init__(self, seed, vocabulary):
+        self.random = random.Random(seed)
+        self.vocabulary = vocabulary
+        self.serial = 0
+
+    def words(self, low, high):
+        return [self.random.choice(self.vocabulary) for _ in range(self.random.randint(low, high))]
+
+    def title(self):
+        # The serial number keeps titles (and so PDF names and slugs) unique
+        self.serial += 1
+        return f"{' '.join(self.words(3, 9)).title()} {self.serial}"
+
+    def description(self):
+        return ' '.join(self.words(12, 45)).capitalize() + '.'
+
+    def date(self):
+        return date(1975, 1, 1) + timedelta(days=self.random.randrange(50 * 365))
+
+    def month_year(self):
+        # "Aug-85", but "Jun-2007": two-digit years up to 31 would read as days
+        day = self.date()
+        return day.strftime('%b-%y' if day.year < 2000 else '%b-%Y')
+
+    def numeric_date(self, year_digits=4):
+        day = self.date()
+        year = f"{day.year % 100:02d}" if year_digits == 2 else day.year
+        return f"{day.month}/{day.day}/{year}"
+
+    def url(self):
+        return f"https://example.org/{self.random.randrange(10 ** 9)}"
+
+    def pdf(self, path, title, description):
+        path.write_bytes(placeholder_pdf([title, description[:90], description[90:180]]))
+
+
+def _write_csv(path, header, rows, preamble=None):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if preamble:
+            f.write(preamble)
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _preamble(section, data_dir):
+    """The first lines of the real CSV (page title, blurb, ...), or blank lines."""
+    path = data_dir / CSV_FILES[section]
+    if not path.exists():
+        return ',,,,\n' * PREAMBLE_LINES[section]
+    with open(path, newline='', encoding='utf-8') as f:
+        return ''.join(f.readline() for _ in range(PREAMBLE_LINES[section]))
+
+
+def generate(root, documents, seed=0, data_dir=DATA_DIR):
+    """
+    Write a synthetic archive of about `documents` documents under root.
+
+    Writes root/data/*.csv, and the PDFs under root/sources/ in the layout of
+    the real archive (see ASSET_ORIGINS), so root/sources can be passed to
+    build-site.py --assets-root.
+
+    Returns:
+        dict: Section -> folder of its source PDFs, for the PDF sections
+    """
+    data = root / 'data'
+    data.mkdir(parents=True, exist_ok=True)
+    sources = {section: root / 'sources' / ASSET_ORIGINS[section] for section in PDF_SECTIONS}
+    for folder in sources.values():
+        folder.mkdir(parents=True, exist_ok=True)
+
+    writer = _Writer(seed, load_vocabulary(data_dir))
+    counts = section_counts(documents)
+
+    # CQC reports: "Mon-YY" dates; PDFs named after the cleaned, lowercased
+    # title (the matching CSV only lists exceptions)
+    rows = []
+    for _ in range(counts['cqc-reports']):
+        title, description = writer.title(), writer.description()
+        rows.append([writer.month_year(), writer.random.choice(CQC_CATEGORIES),
+                     title, description, ''])
+        key = title.lower().replace(':', '-').replace('"', '') + '.pdf'
+        writer.pdf(sources['cqc-reports'] / key, title, description)
+    _write_csv(data / CSV_FILES['cqc-reports'], ['Date', 'Category', 'Title', 'Description', 'URL'], rows)
+    _write_csv(data / MATCHING_FILE, ['title', 'filename'], [])
+
+    # Special Advisor: M/D/YY dates; URL is 'PDF' for a published PDF
+    rows = []
+    for _ in range(counts['savp']):
+        title, description = writer.title(), writer.description()
+        is_pdf = writer.random.random() < 0.6
+        rows.append([writer.numeric_date(2), writer.random.choice(SAVP_TYPES),
+                     title, description, 'PDF' if is_pdf else writer.url(), ''])
+        if is_pdf:
+            writer.pdf(sources['savp'] / (title.lower().replace(':', '-') + '.pdf'), title, description)
+    _write_csv(data / CSV_FILES['savp'], ['Date', 'Type', 'Title', 'Description', 'URL', ''], rows,
+               preamble=_preamble('savp', data_dir))
+
+    # Court monitor reports: M/D/YYYY dates; every row is "<Document>.pdf"
+    for section in ('blackman', 'otoole'):
+        rows = []
+        for _ in range(counts[section]):
+            title, description = writer.title(), writer.description()
+            rows.append([writer.numeric_date(), title, description, '', ''])
+            writer.pdf(sources[section] / f'{title}.pdf', title, description)
+        _write_csv(data / CSV_FILES[section], ['Date', 'Document', 'Description', 'URL', ''], rows,
+                   preamble=_preamble(section, data_dir))
+
+    # Timeline: MM/YYYY or M/D/YYYY dates, links only
+    rows = []
+    for _ in range(counts['otoole-timeline']):
+        stamp = writer.date().strftime('%m/%Y') if writer.random.random() < 0.3 else writer.numeric_date()
+        rows.append([stamp, writer.description(), writer.title(), writer.url(), ''])
+    _write_csv(data / CSV_FILES['otoole-timeline'], ['DATE', 'ACTION', 'News Coverage', 'URL', ''], rows)
+
+    # Media coverage and publications: links only
+    rows = [[writer.numeric_date(), writer.random.choice(MEDIA_TYPES),
+             writer.title(), writer.description(), writer.url()]
+            for _ in range(counts['cqc-media'])]
+    _write_csv(data / CSV_FILES['cqc-media'], ['Date', 'Media', 'Title', 'Description', 'URL'], rows)
+
+    rows = [[writer.date().strftime('%m/%d/%Y'), writer.title(), writer.random.choice(PUBLICATIONS),
+             writer.url()]
+            for _ in range(counts['cqc-publications'])]
+    _write_csv(data / CSV_FILES['cqc-publications'], ['Date', 'Title', 'Publication', 'URL'], rows)
+
+    return sources
@@ -0,0 +1,146 @@
+"""
+Minimal compiled templates for base-template.html and the *-content.html files.
+
+A template is parsed once into alternating literal and slot segments.
+Rendering joins the segments with the slot values in a single pass, instead
+of scanning and copying the whole page once per placeholder with chained
+str.replace calls.
+
+Placeholders are lowercase names in braces, e.g. {meta_title}. JavaScript
+template literals such as ${doc.url} are left alone.
+"""
+
+import os
+import re
+from pathlib import Path
+
+
+PLACEHOLDER = re.compile(r'(?<!\$)\{([a-z_]+)\}')
+
+BASE_TEMPLATE = Path(__file__).parent / 'base-template.html'
+
+# Placeholders every page fills in (see base-template.html)
+PAGE_SLOTS = frozenset({
+    'meta_title',
+    'meta_description',
+    'canonical_url',
+    'breadcrumb',
+    'page_title',
+    'content',
+    'path_prefix',
+})
+
+
+class Template:
+    """A template compiled into literal and slot segments."""
+
+    def __init__(self, text, name='<template>'):
+        self.name = name
+        # Alternating literal, slot name, literal, ..., literal
+        self.segments = PLACEHOLDER.split(text)
+
+    @classmethod
+    def _from_segments(cls, segments, name):
+        template = cls('', name)
+        template.segments = segments
+        return template
+
+    @property
+    def slots(self):
+        """Names of the placeholders still to be filled."""
+        return frozenset(self.segments[1::2])
+
+    def bind(self, **values):
+        """
+        Fill some placeholders now and return a new compiled template.
+
+        Values may be strings or other Templates; a Template value is
+        spliced in, so its own placeholders become part of the result.
+        """
+        name = ' + '.join([self.name] + [value.name for value in values.values()
+                                         if isinstance(value, Template)])
+        segments = ['']
+        for index, segment in enumerate(self.segments):
+            is_slot = index % 2 == 1
+            if is_slot and segment in values:
+                value = values[segment]
+                inner = value.segments if isinstance(value, Template) else [value]
+            elif is_slot:
+                inner = ['', segment, '']
+            else:
+                inner = [segment]
+
+            # Merge the first literal of inner into the current trailing literal
+            segments[-1] += inner[0]
+            segments.extend(inner[1:])
+
+        return Template._from_segments(segments, name)
+
+    def require(self, names):
+        """
+        Check at compile time that every placeholder will be filled.
+
+        Raises:
+            ValueError: If the template has placeholders outside `names`
+        """
+        unfilled = self.slots - set(names)
+        if unfilled:
+            placeholders = ', '.join(f'{{{name}}}' for name in sorted(unfilled))
+            raise ValueError(f"{self.name}: unfilled placeholders {placeholders}")
+        return self
+
+    def render(self, **values):
+        """
+        Render the template in one pass.
+
+        Raises:
+            KeyError: If a value is missing for one of the placeholders
+        """
+        segments = self.segments
+        parts = [segments[0]]
+        try:
+            for index in range(1, len(segments), 2):
+                parts.append(values[segments[index]])
+                parts.append(segments[index + 1])
+        except KeyError as e:
+            raise KeyError(f"{self.name}: no value for placeholder {{{e.args[0]}}}") from None
+        return ''.join(parts)
+
+
+# Compiled templates by path, reloaded when the file's mtime changes
+_cache = {}
+
+
+def load_template(path):
+    """Compile a template file, reusing the compiled version if unchanged."""
+    path = Path(path).resolve()
+    mtime = os.stat(path).st_mtime_ns
+    cached = _cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = (mtime, Template(f.read(), path.name))
+        _cache[path] = cached
+    return cached[1]
+
+
+def page_template(content_file=None, slots=(), **values):
+    """
+    Compile base-template.html, optionally with a content file bound in.
+
+    Args:
+        content_file: *-content.html file to place in {content}, if any
+        slots: Extra placeholders the caller will fill (e.g. 'rows')
+        **values: Placeholders to fill now (e.g. path_prefix='./')
+
+    Returns:
+        Template: Page template whose placeholders are all known
+
+    Raises:
+        ValueError: If the templates contain placeholders nobody fills
+    """
+    template = load_template(BASE_TEMPLATE)
+    if content_file is not None:
+        template = template.bind(content=load_template(content_file))
+    if values:
+        template = template.bind(**values)
+    return template.require(PAGE_SLOTS | set(slots))
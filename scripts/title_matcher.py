@@ -0,0 +1,107 @@
+"""
+Fuzzy matching of document titles to PDF file names.
+
+cqc-reports.py finds most PDFs by exact (lowercased) file name, with
+cqc-reports-matching.csv for the rest. For titles neither of those match,
+TitleIndex suggests the closest file names, so new entries for the matching
+CSV don't have to be found by hand.
+
+Titles and file names are compared on normalized text (lowercase ASCII
+words, with punctuation and the .pdf suffix dropped), scored by the Dice
+coefficient of their character trigrams. The index maps each trigram to the
+files containing it, and a title is only scored against files that share
+one of its rarer trigrams (prefix filtering), which is enough to find every
+file at or above the minimum score without comparing all pairs.
+"""
+
+import csv
+import io
+import math
+import re
+import unicodedata
+
+
+def normalize(text):
+    """Lowercase ASCII words of a title or file name, space separated."""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    if text.endswith('.pdf'):
+        text = text[:-len('.pdf')]
+    return ' '.join(re.findall(r'[a-z0-9]+', text))
+
+
+def trigrams(text):
+    """Character trigrams of normalized text, padded so word edges count."""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)} if text else set()
+
+
+class TitleIndex:
+    """Trigram index over a list of file names."""
+
+    def __init__(self, filenames):
+        self.filenames = list(filenames)
+        self.grams = [trigrams(normalize(name)) for name in self.filenames]
+        # Trigram -> indexes of the file names containing it
+        self.postings = {}
+        for number, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(number)
+
+    def suggest(self, title, limit=3, min_score=0.5, exclude=()):
+        """
+        Closest file names to a title.
+
+        Args:
+            title: Title to match
+            limit: Most suggestions to return
+            min_score: Lowest Dice score (0-1) to suggest
+            exclude: File names not to suggest (e.g. already matched)
+
+        Returns:
+            list[tuple[str, float]]: (file name, score), best first
+        """
+        grams = trigrams(normalize(title))
+        if not grams:
+            return []
+
+        # A file scoring at least min_score shares at least
+        # ceil(min_score * len(grams) / 2) trigrams with the title, so it
+        # shares at least one of the rarest len(grams) - that + 1
+        rare = sorted(grams, key=lambda gram: len(self.postings.get(gram, ())))
+        rare = rare[:len(grams) - math.ceil(min_score * len(grams) / 2) + 1]
+        candidates = set()
+        for gram in rare:
+            candidates.update(self.postings.get(gram, ()))
+
+        scored = []
+        for number in candidates:
+            name = self.filenames[number]
+            if name in exclude:
+                continue
+            score = 2 * len(grams & self.grams[number]) / (len(grams) + len(self.grams[number]))
+            if score >= min_score:
+                scored.append((score, name))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(name, round(score, 3)) for score, name in scored[:limit]]
+
+
+def suggestions_csv(suggestions):
+    """
+    CSV of ranked suggestions, starting with the matching CSV's columns.
+
+    Args:
+        suggestions: dict of title -> [(file name, score), ...]
+
+    Rows have title, filename (without .pdf, as in cqc-reports-matching.csv),
+    score and rank, so accepted rows can be pasted into the matching CSV
+    once the last two columns are dropped.
+    """
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(['title', 'filename', 'score', 'rank'])
+    for title, matches in suggestions.items():
+        for rank, (name, score) in enumerate(matches, 1):
+            if name.lower().endswith('.pdf'):
+                name = name[:-len('.pdf')]
+            writer.writerow([title, name, f'{score:.3f}', rank])
+    return output.getvalue()
@@ -0,0 +1,104 @@
+"""
+Process pool helpers for parallel build stages.
+
+Build scripts have hyphenated filenames and are loaded by path (see
+import_module in build-site.py), so their functions cannot be pickled by
+reference and sent to a worker process. run_batches() sends the script's
+path and the function name instead, and each worker loads the script once.
+
+Files written by workers through output_writer, and build_profile
+counters, are handed back to the parent as if the work had run there.
+"""
+
+import importlib.util
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import build_profile
+import output_writer
+
+
+# Scripts already loaded in this (worker) process, by path
+_loaded_scripts = {}
+
+
+def default_workers():
+    """Number of worker processes to use when none is configured."""
+    return os.cpu_count() or 1
+
+
+def batched(items, size):
+    """Split an iterable into lists of at most `size` items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _load_script(path):
+    """Import a build script by path, once per process."""
+    module = _loaded_scripts.get(path)
+    if module is None:
+        name = Path(path).stem.replace('-', '_')
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _loaded_scripts[path] = module
+    return module
+
+
+def _call_script_function(path, func_name, batch, args):
+    """Worker entry point: look up the function in its script and call it."""
+    func = getattr(_load_script(path), func_name)
+    # Start from zero: a forked worker inherits the parent's state
+    output_writer.take_worker_state()
+    build_profile.take_counters()
+    result = func(batch, *args)
+    return result, output_writer.take_worker_state(), build_profile.take_counters()
+
+
+def run_batches(func, batches, workers, *args):
+    """
+    Call func(batch, *args) for every batch and return the results in order.
+
+    With workers <= 1 everything runs in this process. Otherwise batches are
+    spread over a process pool; func must be a module-level function of a
+    build script, and batch/args must be picklable. At most two batches per
+    worker are in flight, so batches can come from a generator without all
+    of them being held in memory.
+
+    Args:
+        func: Function defined at module level in a build script
+        batches: Iterable of batches (lists of work items)
+        workers: Number of worker processes
+        *args: Extra arguments passed to every call
+
+    Returns:
+        list: One result per batch, in the order the batches were given
+    """
+    if workers <= 1:
+        return [func(batch, *args) for batch in batches]
+
+    def collect(future):
+        result, writer_state, counters = future.result()
+        output_writer.merge_worker_state(writer_state)
+        build_profile.merge_counters(counters)
+        results.append(result)
+
+    path = func.__code__.co_filename
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(_call_script_function, path, func.__name__, batch, args))
+            if len(pending) >= workers * 2:
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+    return results